@@ -1,8 +1,19 @@
+import json
 from fastapi import APIRouter, HTTPException
-from typing import Optional, List
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from typing import Any, Optional, List
 from pydantic import BaseModel
-from ..models.schemas import FactCheckRequest, FactCheckResponse
+from ..core.config import get_settings
+from ..models.schemas import (
+    FactCheckRequest, FactCheckResponse, FactCheckJob, JobStatus,
+    BatchFactCheckRequest, BatchFactCheckResponse, ExplanationResponse
+)
 from ..services.analysis_service import AnalysisService
+from ..services.document_session import DocumentSessionStore
+from ..services.job_manager import JobManager, JobQueueFullError
+from ..services.llm_cache import get_llm_cache, llm_cache_bypass
+from ..services.tokenizer import preload_tokenizer, tokenizer_stats
 
 router = APIRouter()
 
@@ -14,17 +25,40 @@ class Claim(BaseModel):
 class ClaimResponse(BaseModel):
     claims: List[Claim]
 
+class JobSubmissionResponse(BaseModel):
+    job_id: str
+    status: JobStatus
+
 # Initialize AnalysisService
 analysis_service = AnalysisService()
 
+# Initialize JobManager on top of the shared AnalysisService
+job_manager = JobManager(analysis_service)
+
+# Initialize the document sessions used for incremental re-checks
+document_sessions = DocumentSessionStore()
+
+# Load the tokenizer at import instead of on the first request; workers forked
+# from a preloading parent (gunicorn --preload) also share its memory
+if get_settings().TOKENIZER_PRELOAD:
+    preload_tokenizer()
+
 @router.post("/extract_claims", response_model=ClaimResponse)
-async def extract_claims(request: FactCheckRequest, use_deepseek: bool = True):
+async def extract_claims(
+    request: FactCheckRequest,
+    use_deepseek: bool = True,
+    no_cache: bool = False,
+    session_id: Optional[str] = None
+):
     """
     Extract claims from text or URL content.
     
     Args:
         request (FactCheckRequest): Request containing text or URL
         use_deepseek (bool): Whether to use DeepSeek API instead of OpenAI
+        no_cache (bool): Whether to bypass the LLM response cache
+        session_id (Optional[str]): Document session id; unchanged paragraphs of
+            a previously submitted draft are not extracted again
         
     Returns:
         ClaimResponse: List of extracted claims with uncommonness scores and tags
@@ -39,10 +73,9 @@ async def extract_claims(request: FactCheckRequest, use_deepseek: bool = True):
         # For now, we only handle text input
         # TODO: Add URL content extraction
         text = request.text or ""
-        if use_deepseek:
-            claims = await analysis_service.deepseek_service.extract_claims(text)
-        else:
-            claims = await analysis_service.claim_extractor.extract_claims(text)
+        session = document_sessions.get(session_id) if session_id else None
+        with llm_cache_bypass(no_cache):
+            claims = await analysis_service.extract_claims(text, use_deepseek=use_deepseek, session=session)
         
      
         
@@ -52,13 +85,21 @@ async def extract_claims(request: FactCheckRequest, use_deepseek: bool = True):
         raise HTTPException(status_code=500, detail=f"Error extracting claims: {str(e)}")
 
 @router.post("/check")
-async def check_facts(request: FactCheckRequest, use_deepseek: bool = False):
+async def check_facts(
+    request: FactCheckRequest,
+    use_deepseek: bool = False,
+    no_cache: bool = False,
+    session_id: Optional[str] = None
+):
     """
     Check facts from provided text or URL.
     
     Args:
         request (FactCheckRequest): Request containing text or URL
         use_deepseek (bool): Whether to use DeepSeek API instead of OpenAI
+        no_cache (bool): Whether to bypass the LLM response cache
+        session_id (Optional[str]): Document session id; only new or modified
+            paragraphs of a previously checked draft are checked again
     """
     if not request.text and not request.url:
         raise HTTPException(status_code=400, detail="Either text or URL must be provided")
@@ -68,12 +109,187 @@ async def check_facts(request: FactCheckRequest, use_deepseek: bool = False):
         # TODO: Add URL content extraction
         text = request.text or ""
         
-        # Get sources (this is a placeholder - you should implement proper source retrieval)
+        # No sources are provided up front: the analysis retrieves candidate sources
+        # per claim, within MAX_SOURCES_PER_CLAIM and SEARCH_BUDGET_PER_REQUEST
         sources = []
         
         # Analyze text using the specified service
-        result = await analysis_service.analyze_text(text, sources, use_deepseek=use_deepseek)
+        session = document_sessions.get(session_id) if session_id else None
+        with llm_cache_bypass(no_cache):
+            result = await analysis_service.analyze_text(text, sources, use_deepseek=use_deepseek, session=session)
         return result
         
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error checking facts: {str(e)}") 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error checking facts: {str(e)}")
+
+@router.post("/check/batch", response_model=BatchFactCheckResponse)
+async def check_facts_batch(request: BatchFactCheckRequest, use_deepseek: bool = False, no_cache: bool = False):
+    """
+    Check facts for many texts at once, verifying claims shared between texts only once.
+    
+    Args:
+        request (BatchFactCheckRequest): Request containing the texts to check
+        use_deepseek (bool): Whether to use DeepSeek API instead of OpenAI
+        no_cache (bool): Whether to bypass the LLM response cache
+        
+    Returns:
+        BatchFactCheckResponse: One result per text plus the claim deduplication ratio
+        
+    Raises:
+        HTTPException: If no texts or too many texts are provided
+    """
+    if not request.texts:
+        raise HTTPException(status_code=400, detail="At least one text must be provided")
+    max_documents = get_settings().BATCH_MAX_DOCUMENTS
+    if len(request.texts) > max_documents:
+        raise HTTPException(status_code=400, detail=f"At most {max_documents} texts can be checked per batch")
+    
+    try:
+        with llm_cache_bypass(no_cache):
+            return await analysis_service.analyze_batch(request.texts, use_deepseek=use_deepseek)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error checking facts: {str(e)}")
+
+@router.post("/check/{result_id}/explanation", response_model=ExplanationResponse)
+async def get_polished_explanation(result_id: str, no_cache: bool = False):
+    """
+    Get the LLM-polished explanation of an earlier fact-check result.
+    
+    Fact-check responses return a template explanation built from the claim
+    rationales right away; this call generates the polished version on demand.
+    
+    Args:
+        result_id (str): Result id returned with the fact-check response
+        no_cache (bool): Whether to bypass the LLM response cache
+        
+    Returns:
+        ExplanationResponse: The polished explanation, or the template one if polishing failed
+        
+    Raises:
+        HTTPException: If the result is unknown or no longer retained
+    """
+    with llm_cache_bypass(no_cache):
+        explanation = await analysis_service.polish_explanation(result_id)
+    if explanation is None:
+        raise HTTPException(status_code=404, detail="Result not found")
+    return explanation
+
+def _sse_event(event: str, data: Any) -> str:
+    """Format a single Server-Sent Event with a JSON payload."""
+    payload = json.dumps(jsonable_encoder(data), ensure_ascii=False)
+    return f"event: {event}\ndata: {payload}\n\n"
+
+@router.post("/check/stream")
+async def check_facts_stream(
+    request: FactCheckRequest,
+    use_deepseek: bool = False,
+    no_cache: bool = False,
+    session_id: Optional[str] = None
+):
+    """
+    Check facts from provided text or URL, streaming progressive results as Server-Sent Events.
+    
+    Events are emitted in this order:
+    - ``claims``: the extracted claims, as soon as extraction finishes
+    - ``claim``: one ClaimVerdict per claim, as soon as its evaluation completes
+    - ``result``: the final FactCheckResponse
+    
+    Args:
+        request (FactCheckRequest): Request containing text or URL
+        use_deepseek (bool): Whether to use DeepSeek API instead of OpenAI
+        no_cache (bool): Whether to bypass the LLM response cache
+        session_id (Optional[str]): Document session id; verdicts of unchanged
+            paragraphs are replayed immediately
+    """
+    if not request.text and not request.url:
+        raise HTTPException(status_code=400, detail="Either text or URL must be provided")
+    
+    # For now, we only handle text input
+    # TODO: Add URL content extraction
+    text = request.text or ""
+    session = document_sessions.get(session_id) if session_id else None
+    
+    async def event_stream():
+        try:
+            with llm_cache_bypass(no_cache):
+                async for event, data in analysis_service.analyze_text_stream(
+                    text, [], use_deepseek=use_deepseek, session=session
+                ):
+                    yield _sse_event(event, data)
+        except Exception as e:
+            yield _sse_event("error", {"detail": f"Error checking facts: {str(e)}"})
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.post("/jobs/check", response_model=JobSubmissionResponse, status_code=202)
+async def submit_check_job(request: FactCheckRequest, use_deepseek: bool = False, no_cache: bool = False):
+    """
+    Submit a fact-check as an asynchronous job.
+    
+    Args:
+        request (FactCheckRequest): Request containing text or URL
+        use_deepseek (bool): Whether to use DeepSeek API instead of OpenAI
+        no_cache (bool): Whether to bypass the LLM response cache
+        
+    Returns:
+        JobSubmissionResponse: Id and initial status of the queued job
+        
+    Raises:
+        HTTPException: If neither text nor URL is provided, or the job queue is full
+    """
+    if not request.text and not request.url:
+        raise HTTPException(status_code=400, detail="Either text or URL must be provided")
+    
+    # For now, we only handle text input
+    # TODO: Add URL content extraction
+    text = request.text or ""
+    
+    try:
+        job = job_manager.submit(text, use_deepseek=use_deepseek, no_cache=no_cache)
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    
+    return JobSubmissionResponse(job_id=job.job_id, status=job.status)
+
+@router.get("/jobs/{job_id}", response_model=FactCheckJob)
+async def get_check_job(job_id: str):
+    """
+    Get the status and partial results of a fact-check job.
+    
+    Args:
+        job_id (str): Job id returned when the job was submitted
+        
+    Returns:
+        FactCheckJob: Job status, extracted claims, claim verdicts so far and the final result
+        
+    Raises:
+        HTTPException: If the job is unknown or its result is no longer retained
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@router.get("/cache/stats")
+async def get_cache_stats():
+    """
+    Get the hit and miss counters of the LLM response cache.
+    
+    Returns:
+        dict: Cache counters and hit rate
+    """
+    return get_llm_cache().stats()
+
+@router.get("/tokenizer/stats")
+async def get_tokenizer_stats():
+    """
+    Get the load status of the shared tokenizer.
+    
+    Returns:
+        dict: Whether the dictionary is loaded, its load time and the dictionary cache in use
+    """
+    return tokenizer_stats()
@@ -2,11 +2,14 @@
 Configuration settings for the application.
 """
 
+import logging
 import os
-from typing import Optional
+from typing import Dict, Optional
 from pydantic_settings import BaseSettings
 from functools import lru_cache
 
+logger = logging.getLogger(__name__)
+
 class Settings(BaseSettings):
     """Application settings."""
     
@@ -21,6 +24,142 @@ class Settings(BaseSettings):
     # News API Settings
     NEWS_API_KEY: str = os.getenv("NEWS_API_KEY", "")
     
+    # Search Provider Settings
+    SEARCH_TIMEOUT_SECONDS: float = float(os.getenv("SEARCH_TIMEOUT_SECONDS", "5"))
+    SEARCH_MAX_RESULTS: int = int(os.getenv("SEARCH_MAX_RESULTS", "5"))
+    SEARCH_PROVIDER_TIMEOUTS: str = os.getenv("SEARCH_PROVIDER_TIMEOUTS", "google=5,wikipedia=4,news=5")
+    SEARCH_PROVIDER_MAX_RESULTS: str = os.getenv("SEARCH_PROVIDER_MAX_RESULTS", "google=5,wikipedia=3,news=5")
+    
+    # Academic Search Settings
+    ACADEMIC_SEARCH_TIMEOUT_SECONDS: float = float(os.getenv("ACADEMIC_SEARCH_TIMEOUT_SECONDS", "10"))
+    ACADEMIC_HTTP2_ENABLED: bool = os.getenv("ACADEMIC_HTTP2_ENABLED", "true").lower() == "true"
+    ACADEMIC_ENRICHMENT_ENABLED: bool = os.getenv("ACADEMIC_ENRICHMENT_ENABLED", "true").lower() == "true"
+    
+    # Analysis Settings
+    ANALYSIS_MAX_CONCURRENCY: int = int(os.getenv("ANALYSIS_MAX_CONCURRENCY", "8"))
+    
+    # Source Deduplication Settings
+    SOURCE_DEDUP_ENABLED: bool = os.getenv("SOURCE_DEDUP_ENABLED", "true").lower() == "true"
+    SOURCE_DEDUP_MAX_HAMMING: int = int(os.getenv("SOURCE_DEDUP_MAX_HAMMING", "6"))
+    SOURCE_DEDUP_SHINGLE_SIZE: int = int(os.getenv("SOURCE_DEDUP_SHINGLE_SIZE", "3"))
+    
+    # Source Pre-ranking Settings
+    PRERANK_ENABLED: bool = os.getenv("PRERANK_ENABLED", "true").lower() == "true"
+    PRERANK_TOP_K: int = int(os.getenv("PRERANK_TOP_K", "4"))
+    PRERANK_MIN_SIMILARITY: float = float(os.getenv("PRERANK_MIN_SIMILARITY", "0.05"))
+    PRERANK_MIN_SOURCES: int = int(os.getenv("PRERANK_MIN_SOURCES", "1"))
+    PRERANK_HASH_DIMENSIONS: int = int(os.getenv("PRERANK_HASH_DIMENSIONS", "8192"))
+    
+    # Claim Extraction Settings
+    CLAIM_EXTRACTION_CHUNK_TOKENS: int = int(os.getenv("CLAIM_EXTRACTION_CHUNK_TOKENS", "1500"))
+    CLAIM_EXTRACTION_OVERLAP_SENTENCES: int = int(os.getenv("CLAIM_EXTRACTION_OVERLAP_SENTENCES", "1"))
+    CLAIM_EXTRACTION_MAX_CONCURRENCY: int = int(os.getenv("CLAIM_EXTRACTION_MAX_CONCURRENCY", "4"))
+    CLAIM_EXTRACTION_OUTPUT_RATIO: float = float(os.getenv("CLAIM_EXTRACTION_OUTPUT_RATIO", "0.75"))
+    CLAIM_EXTRACTION_MIN_OUTPUT_TOKENS: int = int(os.getenv("CLAIM_EXTRACTION_MIN_OUTPUT_TOKENS", "500"))
+    CLAIM_EXTRACTION_MAX_OUTPUT_TOKENS: int = int(os.getenv("CLAIM_EXTRACTION_MAX_OUTPUT_TOKENS", "2000"))
+    CLAIM_EXTRACTION_SEAM_DEDUP_THRESHOLD: float = float(os.getenv("CLAIM_EXTRACTION_SEAM_DEDUP_THRESHOLD", "0.8"))
+    
+    # Claim Clustering Settings
+    CLAIM_CLUSTERING_ENABLED: bool = os.getenv("CLAIM_CLUSTERING_ENABLED", "true").lower() == "true"
+    CLAIM_CLUSTER_THRESHOLD: float = float(os.getenv("CLAIM_CLUSTER_THRESHOLD", "0.8"))
+    
+    # Batched Similarity Settings
+    SIMILARITY_BATCH_ENABLED: bool = os.getenv("SIMILARITY_BATCH_ENABLED", "true").lower() == "true"
+    SIMILARITY_BATCH_TOKEN_BUDGET: int = int(os.getenv("SIMILARITY_BATCH_TOKEN_BUDGET", "3000"))
+    SIMILARITY_BATCH_MAX_CLAIMS: int = int(os.getenv("SIMILARITY_BATCH_MAX_CLAIMS", "1"))
+    SIMILARITY_BATCH_TOKENS_PER_ENTRY: int = int(os.getenv("SIMILARITY_BATCH_TOKENS_PER_ENTRY", "120"))
+    
+    # Similarity Cascade Settings
+    SIMILARITY_CASCADE_ENABLED: bool = os.getenv("SIMILARITY_CASCADE_ENABLED", "true").lower() == "true"
+    SIMILARITY_CASCADE_SUPPORT_THRESHOLD: float = float(os.getenv("SIMILARITY_CASCADE_SUPPORT_THRESHOLD", "0.9"))
+    SIMILARITY_CASCADE_REJECT_THRESHOLD: float = float(os.getenv("SIMILARITY_CASCADE_REJECT_THRESHOLD", "0.1"))
+    
+    # Tokenizer Settings
+    JIEBA_CACHE_PATH: str = os.getenv("JIEBA_CACHE_PATH", "")
+    TOKENIZER_PRELOAD: bool = os.getenv("TOKENIZER_PRELOAD", "false").lower() == "true"
+    
+    # Token Cache Settings
+    TOKEN_CACHE_MAX_ENTRIES: int = int(os.getenv("TOKEN_CACHE_MAX_ENTRIES", "20000"))
+    TOKEN_CACHE_MAX_VOCABULARY: int = int(os.getenv("TOKEN_CACHE_MAX_VOCABULARY", "500000"))
+    
+    # Retrieval Settings
+    MAX_SOURCES_PER_CLAIM: int = int(os.getenv("MAX_SOURCES_PER_CLAIM", "8"))
+    SEARCH_BUDGET_PER_REQUEST: int = int(os.getenv("SEARCH_BUDGET_PER_REQUEST", "20"))
+    SEARCH_MAX_CONCURRENCY: int = int(os.getenv("SEARCH_MAX_CONCURRENCY", "4"))
+    SEARCH_MAX_QUERY_CHARS: int = int(os.getenv("SEARCH_MAX_QUERY_CHARS", "128"))
+    SEARCH_QUERY_MERGE_THRESHOLD: float = float(os.getenv("SEARCH_QUERY_MERGE_THRESHOLD", "0.8"))
+    
+    # Speculative Retrieval Settings
+    SPECULATIVE_RETRIEVAL_ENABLED: bool = os.getenv("SPECULATIVE_RETRIEVAL_ENABLED", "true").lower() == "true"
+    SPECULATIVE_MAX_QUERIES: int = int(os.getenv("SPECULATIVE_MAX_QUERIES", "8"))
+    SPECULATIVE_MATCH_THRESHOLD: float = float(os.getenv("SPECULATIVE_MATCH_THRESHOLD", "0.5"))
+    
+    # Early Claim Retrieval Settings
+    EARLY_CLAIM_RETRIEVAL_ENABLED: bool = os.getenv("EARLY_CLAIM_RETRIEVAL_ENABLED", "true").lower() == "true"
+    
+    # Early Exit Settings
+    EARLY_EXIT_ENABLED: bool = os.getenv("EARLY_EXIT_ENABLED", "true").lower() == "true"
+    EARLY_EXIT_WAVE_SIZE: int = int(os.getenv("EARLY_EXIT_WAVE_SIZE", "3"))
+    
+    # Explanation Settings
+    DEFERRED_EXPLANATION_ENABLED: bool = os.getenv("DEFERRED_EXPLANATION_ENABLED", "true").lower() == "true"
+    EXPLANATION_STORE_MAX_ENTRIES: int = int(os.getenv("EXPLANATION_STORE_MAX_ENTRIES", "10000"))
+    EXPLANATION_STORE_TTL_SECONDS: float = float(os.getenv("EXPLANATION_STORE_TTL_SECONDS", "3600"))
+    
+    # LLM Cache Settings
+    LLM_CACHE_ENABLED: bool = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+    LLM_CACHE_MAX_ENTRIES: int = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1024"))
+    LLM_CACHE_TTL_SECONDS: float = float(os.getenv("LLM_CACHE_TTL_SECONDS", "86400"))
+    LLM_CACHE_DB_PATH: str = os.getenv("LLM_CACHE_DB_PATH", "llm_cache.sqlite3")
+    LLM_CACHE_MAX_DISK_ENTRIES: int = int(os.getenv("LLM_CACHE_MAX_DISK_ENTRIES", "50000"))
+    
+    # Single-flight Settings
+    SINGLE_FLIGHT_ENABLED: bool = os.getenv("SINGLE_FLIGHT_ENABLED", "true").lower() == "true"
+    
+    # LLM Hedging Settings
+    LLM_HEDGE_ENABLED: bool = os.getenv("LLM_HEDGE_ENABLED", "false").lower() == "true"
+    LLM_HEDGE_TARGET: str = os.getenv("LLM_HEDGE_TARGET", "other")  # "other" provider or the "same" one
+    LLM_HEDGE_MODEL_MAP: str = os.getenv("LLM_HEDGE_MODEL_MAP", "")
+    LLM_HEDGE_PERCENTILE: float = float(os.getenv("LLM_HEDGE_PERCENTILE", "95"))
+    LLM_HEDGE_WINDOW: int = int(os.getenv("LLM_HEDGE_WINDOW", "200"))
+    LLM_HEDGE_MIN_SAMPLES: int = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+    LLM_HEDGE_INITIAL_DELAY_SECONDS: float = float(os.getenv("LLM_HEDGE_INITIAL_DELAY_SECONDS", "10"))
+    LLM_HEDGE_MIN_DELAY_SECONDS: float = float(os.getenv("LLM_HEDGE_MIN_DELAY_SECONDS", "1"))
+    LLM_HEDGE_BUDGET_RATIO: float = float(os.getenv("LLM_HEDGE_BUDGET_RATIO", "0.05"))
+    LLM_HEDGE_BUDGET_BURST: float = float(os.getenv("LLM_HEDGE_BUDGET_BURST", "5"))
+    
+    # Local Evidence Index Settings
+    LOCAL_INDEX_PATH: str = os.getenv("LOCAL_INDEX_PATH", "")
+    LOCAL_INDEX_MAX_RESULTS: int = int(os.getenv("LOCAL_INDEX_MAX_RESULTS", "5"))
+    LOCAL_INDEX_MAX_POSTINGS_PER_TERM: int = int(os.getenv("LOCAL_INDEX_MAX_POSTINGS_PER_TERM", "100000"))
+    LOCAL_INDEX_SKIP_NETWORK_MIN_RESULTS: int = int(os.getenv("LOCAL_INDEX_SKIP_NETWORK_MIN_RESULTS", "3"))
+    LOCAL_INDEX_SKIP_NETWORK_COVERAGE: float = float(os.getenv("LOCAL_INDEX_SKIP_NETWORK_COVERAGE", "0.8"))
+    LOCAL_INDEX_SKIP_NETWORK_MIN_SCORE: float = float(os.getenv("LOCAL_INDEX_SKIP_NETWORK_MIN_SCORE", "5.0"))
+    
+    # Search Cache Settings
+    SEARCH_CACHE_ENABLED: bool = os.getenv("SEARCH_CACHE_ENABLED", "true").lower() == "true"
+    SEARCH_CACHE_MAX_ENTRIES: int = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "4096"))
+    SEARCH_CACHE_TTL_SECONDS: float = float(os.getenv("SEARCH_CACHE_TTL_SECONDS", "3600"))
+    SEARCH_CACHE_PROVIDER_TTLS: str = os.getenv(
+        "SEARCH_CACHE_PROVIDER_TTLS",
+        "news=600,google=3600,wikipedia=86400,google_scholar=604800,semantic_scholar=604800"
+    )
+    SEARCH_CACHE_NEGATIVE_TTL_SECONDS: float = float(os.getenv("SEARCH_CACHE_NEGATIVE_TTL_SECONDS", "300"))
+    SEARCH_CACHE_STALE_SECONDS: float = float(os.getenv("SEARCH_CACHE_STALE_SECONDS", "3600"))
+    
+    # Document Session Settings
+    DOCUMENT_SESSION_TTL_SECONDS: float = float(os.getenv("DOCUMENT_SESSION_TTL_SECONDS", "7200"))
+    DOCUMENT_SESSION_MAX_SESSIONS: int = int(os.getenv("DOCUMENT_SESSION_MAX_SESSIONS", "1000"))
+    
+    # Batch Settings
+    BATCH_MAX_DOCUMENTS: int = int(os.getenv("BATCH_MAX_DOCUMENTS", "200"))
+    
+    # Job Settings
+    JOB_WORKER_CONCURRENCY: int = int(os.getenv("JOB_WORKER_CONCURRENCY", "2"))
+    JOB_QUEUE_SIZE: int = int(os.getenv("JOB_QUEUE_SIZE", "100"))
+    JOB_TTL_SECONDS: float = float(os.getenv("JOB_TTL_SECONDS", "900"))
+    JOB_RESULT_RETENTION_SECONDS: float = float(os.getenv("JOB_RESULT_RETENTION_SECONDS", "3600"))
+
     # API Settings
     API_V1_STR: str = "/api/v1"
     PROJECT_NAME: str = "FactGuard"
@@ -33,4 +172,26 @@ class Settings(BaseSettings):
 @lru_cache()
 def get_settings() -> Settings:
     """Get cached settings instance."""
-    return Settings() 
\ No newline at end of file
+    return Settings() 
+
+
+def parse_provider_values(spec: str) -> Dict[str, float]:
+    """
+    Parse per-provider settings such as TTLs or timeouts.
+
+    Args:
+        spec (str): Comma-separated ``provider=value`` pairs, e.g. ``news=600,wikipedia=86400``
+
+    Returns:
+        Dict[str, float]: Value per provider name
+    """
+    values = {}
+    for item in (spec or "").split(","):
+        name, _, value = item.partition("=")
+        if not name.strip() or not value.strip():
+            continue
+        try:
+            values[name.strip()] = float(value)
+        except ValueError:
+            logger.warning(f"Ignoring invalid provider setting: '{item}'")
+    return values
@@ -2,7 +2,7 @@
 Data models and schemas for the fact-checking service.
 """
 
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from pydantic import BaseModel, HttpUrl
 from enum import Enum
 
@@ -26,6 +26,7 @@ class Source(BaseModel):
     citations: Optional[int] = None
     abstract: Optional[str] = None
     contribution_score: Optional[float] = None  # Score indicating how much this source contributes to the overall confidence
+    duplicate_links: Optional[List[str]] = None  # Links of near-duplicate sources collapsed into this one
 
 class Discrepancy(BaseModel):
     """Represents a discrepancy found between a claim and a source"""
@@ -38,10 +39,58 @@ class FactCheckRequest(BaseModel):
     text: Optional[str] = None
     url: Optional[HttpUrl] = None
 
+class ClaimVerdict(BaseModel):
+    """Verification result for a single claim"""
+    claim: str
+    score: float  # Highest similarity among the supporting sources
+    is_supported: bool
+    sources: List[Source]
+    source_details: List[Dict[str, Any]] = []
+    rationale: Optional[str] = None  # Similarity analysis explanation of the best-scoring source
+
 class FactCheckResponse(BaseModel):
     """Response model for fact-checking endpoint"""
     is_fact: bool
     confidence: float
     explanation: str
     sources: List[Source]
-    academic_sources: List[Source] 
\ No newline at end of file
+    academic_sources: List[Source]
+    stats: Optional[Dict[str, float]] = None  # Per-request pipeline counters, e.g. skipped similarity calls
+    result_id: Optional[str] = None  # Key for fetching the polished explanation later
+
+class ExplanationResponse(BaseModel):
+    """Response model for the deferred explanation endpoint"""
+    result_id: str
+    explanation: str
+    polished: bool  # False when the LLM polish failed and the template explanation is returned
+
+class BatchFactCheckRequest(BaseModel):
+    """Request model for the batch fact-checking endpoint"""
+    texts: List[str]
+
+class BatchFactCheckResponse(BaseModel):
+    """Response model for the batch fact-checking endpoint"""
+    results: List[FactCheckResponse]  # One response per input text, in input order
+    total_claims: int  # Claims extracted across all texts
+    unique_claims: int  # Claims left after deduplication, each verified once
+    dedup_ratio: float  # Share of claims whose verification was saved by deduplication
+    stats: Optional[Dict[str, float]] = None
+
+class JobStatus(str, Enum):
+    """Lifecycle states of an asynchronous fact-check job"""
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    EXPIRED = "expired"
+
+class FactCheckJob(BaseModel):
+    """State and partial results of an asynchronous fact-check job"""
+    job_id: str
+    status: JobStatus
+    created_at: float
+    updated_at: float
+    claims: Optional[List[Dict[str, Any]]] = None  # Extracted claims, once available
+    claim_verdicts: List[ClaimVerdict] = []  # Verdicts of the claims evaluated so far
+    result: Optional[FactCheckResponse] = None
+    error: Optional[str] = None
@@ -3,12 +3,17 @@ Academic search service for finding scholarly sources.
 
 This module provides functionality to search academic papers and studies
 from various academic sources including Google Scholar and Semantic Scholar.
+All backends share one long-lived HTTP client and run concurrently, and
+Google Scholar hits are enriched with Semantic Scholar metadata in a
+single batch request.
 """
 
 import os
+import asyncio
 import logging
-from typing import List, Dict, Optional
-from models.schemas import Source, SourceType
+from typing import Awaitable, Callable, List, Dict, Optional
+from ..core.config import get_settings
+from ..models.schemas import Source, SourceType
 import httpx
 from bs4 import BeautifulSoup
 import re
@@ -17,184 +22,300 @@ import re
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+GOOGLE_SCHOLAR_URL = "https://scholar.google.com/scholar"
+SEMANTIC_SCHOLAR_SEARCH_URL = "https://api.semanticscholar.org/graph/v1/paper/search"
+SEMANTIC_SCHOLAR_BATCH_URL = "https://api.semanticscholar.org/graph/v1/paper/batch"
+SEMANTIC_SCHOLAR_BATCH_LIMIT = 500  # Maximum number of ids per batch request
+DOI_PATTERN = re.compile(r'10\.\d{4,9}/[^\s?#&"<>]+')
+
 class AcademicSearchService:
-    def __init__(self):
-        """Initialize the academic search service"""
+    def __init__(self, client: Optional[httpx.AsyncClient] = None):
+        """
+        Initialize the academic search service.
+
+        Args:
+            client (Optional[httpx.AsyncClient]): Shared HTTP client; a pooled
+                keepalive client (HTTP/2 when available) is created if not given
+        """
+        settings = get_settings()
         self.semantic_scholar_api_key = os.getenv("SEMANTIC_SCHOLAR_API_KEY")
+        self.timeout = settings.ACADEMIC_SEARCH_TIMEOUT_SECONDS
+        self.enrichment_enabled = settings.ACADEMIC_ENRICHMENT_ENABLED
         self.headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
         }
+        self.client = client or self._create_client(settings.ACADEMIC_HTTP2_ENABLED)
         logger.info("Initializing AcademicSearchService...")
 
-    def search_all_academic_sources(self, query: str) -> List[Source]:
+    def _create_client(self, http2: bool) -> httpx.AsyncClient:
+        """
+        Create the pooled HTTP client shared by all backends.
+
+        Args:
+            http2 (bool): Whether to negotiate HTTP/2
+
+        Returns:
+            httpx.AsyncClient: Client with keepalive connection pooling
+        """
+        options = dict(
+            headers=self.headers,
+            timeout=httpx.Timeout(self.timeout, connect=5.0),
+            limits=httpx.Limits(max_keepalive_connections=10, max_connections=20, keepalive_expiry=60.0),
+            follow_redirects=True
+        )
+        if http2:
+            try:
+                return httpx.AsyncClient(http2=True, **options)
+            except ImportError:
+                logger.warning("HTTP/2 support not installed (httpx[http2]), falling back to HTTP/1.1")
+        return httpx.AsyncClient(**options)
+
+    def providers(self) -> Dict[str, Callable[[str], Awaitable[List[Source]]]]:
         """
-        Search for academic sources across multiple platforms.
-        
+        Get the search function of each available academic backend.
+
+        Returns:
+            Dict[str, Callable[[str], Awaitable[List[Source]]]]: Search function keyed by provider name
+        """
+        providers = {"google_scholar": self._search_google_scholar}
+        if self.semantic_scholar_api_key:
+            providers["semantic_scholar"] = self._search_semantic_scholar
+        return providers
+
+    async def search_all_academic_sources(self, query: str) -> List[Source]:
+        """
+        Search for academic sources across multiple platforms concurrently.
+
         Args:
             query (str): The search query
-            
+
         Returns:
             List[Source]: List of academic sources found
         """
         logger.info(f"Searching academic sources for query: {query}")
         sources = []
-        
-        try:
-            # Search Google Scholar
-            scholar_sources = self._search_google_scholar(query)
-            sources.extend(scholar_sources)
-            logger.info(f"Found {len(scholar_sources)} sources from Google Scholar")
-            
-            # Search Semantic Scholar if API key is available
-            if self.semantic_scholar_api_key:
-                semantic_sources = self._search_semantic_scholar(query)
-                sources.extend(semantic_sources)
-                logger.info(f"Found {len(semantic_sources)} sources from Semantic Scholar")
-            
-        except Exception as e:
-            logger.error(f"Error in academic search: {str(e)}")
-        
+
+        providers = self.providers()
+        results = await asyncio.gather(
+            *[search(query) for search in providers.values()], return_exceptions=True
+        )
+        for name, result in zip(providers, results):
+            if isinstance(result, BaseException):
+                logger.error(f"Error in academic search ({name}): {str(result)}")
+                continue
+            sources.extend(result)
+            logger.info(f"Found {len(result)} sources from {name}")
+
         return sources
 
-    def _search_google_scholar(self, query: str) -> List[Source]:
+    async def close(self) -> None:
+        """Close the shared HTTP client."""
+        await self.client.aclose()
+
+    async def _search_google_scholar(self, query: str) -> List[Source]:
         """
         Search Google Scholar for academic papers.
-        
+
         Args:
             query (str): The search query
-            
+
         Returns:
-            List[Source]: List of academic sources from Google Scholar
+            List[Source]: List of academic sources from Google Scholar,
+                enriched with Semantic Scholar metadata
         """
         logger.info("Starting Google Scholar search")
         sources = []
-        
+
         try:
-            # Construct the Google Scholar URL
-            base_url = "https://scholar.google.com/scholar"
             params = {
                 "q": query,
                 "hl": "en",
                 "as_sdt": "0,5"
             }
-            
+
             # Make the request
-            with httpx.Client(headers=self.headers) as client:
-                response = client.get(base_url, params=params)
-                response.raise_for_status()
-                
-                # Parse the response
-                soup = BeautifulSoup(response.text, 'html.parser')
-                results = soup.find_all('div', class_='gs_r gs_or gs_scl')
-                
-                for result in results:
-                    try:
-                        # Extract title and link
-                        title_elem = result.find('h3', class_='gs_rt')
-                        if not title_elem:
-                            continue
-                            
-                        title = title_elem.get_text().strip()
-                        link = title_elem.find('a')
-                        if not link:
-                            continue
-                            
-                        url = link.get('href', '')
-                        if not url.startswith('http'):
-                            url = 'https://scholar.google.com' + url
-                        
-                        # Extract snippet
-                        snippet_elem = result.find('div', class_='gs_rs')
-                        snippet = snippet_elem.get_text().strip() if snippet_elem else ""
-                        
-                        # Extract authors and year
-                        authors_elem = result.find('div', class_='gs_a')
-                        authors_text = authors_elem.get_text().strip() if authors_elem else ""
-                        
-                        # Parse authors and year using regex
-                        authors_match = re.match(r'([^0-9]+)(\d{4})?', authors_text)
-                        if authors_match:
-                            authors = [author.strip() for author in authors_match.group(1).split(',')]
-                            year = int(authors_match.group(2)) if authors_match.group(2) else None
-                        else:
-                            authors = []
-                            year = None
-                        
-                        # Create source object
-                        source = Source(
-                            title=title,
-                            snippet=snippet,
-                            link=url,
-                            source_type=SourceType.ACADEMIC,
-                            authors=authors,
-                            year=year
-                        )
-                        
-                        sources.append(source)
-                        logger.debug(f"Added source: {title}")
-                        
-                    except Exception as e:
-                        logger.error(f"Error processing Google Scholar result: {str(e)}")
+            response = await self.client.get(GOOGLE_SCHOLAR_URL, params=params)
+            response.raise_for_status()
+
+            # Parse the response
+            soup = BeautifulSoup(response.text, 'html.parser')
+            results = soup.find_all('div', class_='gs_r gs_or gs_scl')
+
+            for result in results:
+                try:
+                    # Extract title and link
+                    title_elem = result.find('h3', class_='gs_rt')
+                    if not title_elem:
+                        continue
+
+                    title = title_elem.get_text().strip()
+                    link = title_elem.find('a')
+                    if not link:
                         continue
-                
+
+                    url = link.get('href', '')
+                    if not url.startswith('http'):
+                        url = 'https://scholar.google.com' + url
+
+                    # Extract snippet
+                    snippet_elem = result.find('div', class_='gs_rs')
+                    snippet = snippet_elem.get_text().strip() if snippet_elem else ""
+
+                    # Extract authors and year
+                    authors_elem = result.find('div', class_='gs_a')
+                    authors_text = authors_elem.get_text().strip() if authors_elem else ""
+
+                    # Parse authors and year using regex
+                    authors_match = re.match(r'([^0-9]+)(\d{4})?', authors_text)
+                    if authors_match:
+                        authors = [author.strip() for author in authors_match.group(1).split(',')]
+                        year = int(authors_match.group(2)) if authors_match.group(2) else None
+                    else:
+                        authors = []
+                        year = None
+
+                    # Create source object
+                    source = Source(
+                        title=title,
+                        snippet=snippet,
+                        link=url,
+                        source_type=SourceType.ACADEMIC,
+                        authors=authors,
+                        year=year
+                    )
+
+                    sources.append(source)
+                    logger.debug(f"Added source: {title}")
+
+                except Exception as e:
+                    logger.error(f"Error processing Google Scholar result: {str(e)}")
+                    continue
+
         except Exception as e:
             logger.error(f"Error in Google Scholar search: {str(e)}")
-        
+
+        if sources and self.enrichment_enabled:
+            await self._enrich_with_semantic_scholar(sources)
         return sources
 
-    def _search_semantic_scholar(self, query: str) -> List[Source]:
+    async def _search_semantic_scholar(self, query: str) -> List[Source]:
         """
         Search Semantic Scholar for academic papers.
-        
+
         Args:
             query (str): The search query
-            
+
         Returns:
             List[Source]: List of academic sources from Semantic Scholar
         """
         logger.info("Starting Semantic Scholar search")
         sources = []
-        
+
         try:
-            # Construct the Semantic Scholar API URL
-            base_url = "https://api.semanticscholar.org/graph/v1/paper/search"
             params = {
                 "query": query,
                 "limit": 10,
                 "fields": "paperId,title,abstract,authors,year,citationCount,url"
             }
-            
+
             # Make the request
-            with httpx.Client(headers={"x-api-key": self.semantic_scholar_api_key}) as client:
-                response = client.get(base_url, params=params)
-                response.raise_for_status()
-                
-                data = response.json()
-                
-                for paper in data.get("data", []):
-                    try:
-                        # Extract authors
-                        authors = [author.get("name", "") for author in paper.get("authors", [])]
-                        
-                        # Create source object
-                        source = Source(
-                            title=paper.get("title", ""),
-                            snippet=paper.get("abstract", ""),
-                            link=paper.get("url", ""),
-                            source_type=SourceType.ACADEMIC,
-                            authors=authors,
-                            year=paper.get("year"),
-                            citations=paper.get("citationCount")
-                        )
-                        
-                        sources.append(source)
-                        logger.debug(f"Added source: {paper.get('title')}")
-                        
-                    except Exception as e:
-                        logger.error(f"Error processing Semantic Scholar result: {str(e)}")
-                        continue
-                
+            response = await self.client.get(
+                SEMANTIC_SCHOLAR_SEARCH_URL, params=params, headers=self._semantic_scholar_headers()
+            )
+            response.raise_for_status()
+
+            data = response.json()
+
+            for paper in data.get("data", []):
+                try:
+                    # Extract authors
+                    authors = [author.get("name", "") for author in paper.get("authors", [])]
+
+                    # Create source object
+                    source = Source(
+                        title=paper.get("title", ""),
+                        snippet=paper.get("abstract") or "",
+                        link=paper.get("url", ""),
+                        source_type=SourceType.ACADEMIC,
+                        authors=authors,
+                        year=paper.get("year"),
+                        citations=paper.get("citationCount")
+                    )
+
+                    sources.append(source)
+                    logger.debug(f"Added source: {paper.get('title')}")
+
+                except Exception as e:
+                    logger.error(f"Error processing Semantic Scholar result: {str(e)}")
+                    continue
+
         except Exception as e:
             logger.error(f"Error in Semantic Scholar search: {str(e)}")
-        
-        return sources 
\ No newline at end of file
+
+        return sources
+
+    async def _enrich_with_semantic_scholar(self, sources: List[Source]) -> None:
+        """
+        Fill in citation counts and abstracts from Semantic Scholar's batch paper lookup.
+
+        Papers are identified by the DOI in their link, or by the link itself.
+        All papers are looked up in a single request; sources that cannot be
+        matched are left unchanged.
+
+        Args:
+            sources (List[Source]): Sources to enrich in place
+        """
+        lookups = [
+            (source, paper_id) for source, paper_id in ((source, self._paper_id(str(source.link))) for source in sources)
+            if paper_id is not None
+        ][:SEMANTIC_SCHOLAR_BATCH_LIMIT]
+        if not lookups:
+            return
+        try:
+            response = await self.client.post(
+                SEMANTIC_SCHOLAR_BATCH_URL,
+                params={"fields": "citationCount,abstract,year"},
+                json={"ids": [paper_id for _, paper_id in lookups]},
+                headers=self._semantic_scholar_headers()
+            )
+            response.raise_for_status()
+            papers = response.json()
+        except Exception as e:
+            logger.error(f"Error enriching Google Scholar results: {str(e)}")
+            return
+
+        enriched = 0
+        for (source, _), paper in zip(lookups, papers):
+            if not paper:
+                continue
+            if paper.get("citationCount") is not None:
+                source.citations = paper["citationCount"]
+            if paper.get("abstract"):
+                source.abstract = paper["abstract"]
+            if source.year is None and paper.get("year"):
+                source.year = paper["year"]
+            enriched += 1
+        logger.info(f"Enriched {enriched}/{len(sources)} Google Scholar results from Semantic Scholar")
+
+    def _semantic_scholar_headers(self) -> Dict[str, str]:
+        """Get the Semantic Scholar request headers, including the API key if configured."""
+        return {"x-api-key": self.semantic_scholar_api_key} if self.semantic_scholar_api_key else {}
+
+    @staticmethod
+    def _paper_id(link: str) -> Optional[str]:
+        """
+        Build the Semantic Scholar paper id of a link.
+
+        Args:
+            link (str): Paper link
+
+        Returns:
+            Optional[str]: ``DOI:<doi>`` if the link contains a DOI, ``URL:<link>``
+                for publisher links, or None for links back into Google Scholar
+        """
+        doi_match = DOI_PATTERN.search(link)
+        if doi_match:
+            return f"DOI:{doi_match.group(0).rstrip('.')}"
+        if "scholar.google." in link:
+            return None
+        return f"URL:{link}"
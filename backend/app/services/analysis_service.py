@@ -5,18 +5,38 @@ This module provides the core analysis functionality for fact-checking,
 including claim extraction, similarity calculation, and result generation.
 """
 
+import asyncio
+import hashlib
 import logging
 import os
 import httpx
 from openai import AsyncOpenAI
-from typing import List
-from ..models.schemas import Source, FactCheckResponse
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+from ..core.config import get_settings
+from ..models.schemas import (
+    Source, FactCheckResponse, ClaimVerdict, BatchFactCheckResponse, ExplanationResponse
+)
 
 from .claim_extractor import ClaimExtractor
 from .similarity_analyzer import SimilarityAnalyzer
-from .confidence_calculator import ConfidenceCalculator
+from .confidence_calculator import ConfidenceCalculator, SOURCE_TYPE_MULTIPLIERS, SUPPORT_THRESHOLD
 from .explanation_generator import ExplanationGenerator
+from .explanation_store import DeferredExplanation, DeferredExplanationStore
 from .deepseek_service import DeepSeekService
+from .evidence_retriever import create_evidence_retriever
+from .speculative_retriever import SpeculativeRetrieval
+from .claim_retrieval import ClaimRetrieval
+from .early_exit_policy import EarlyExitPolicy, SupportTally
+from .source_dedup import SourceDeduplicator
+from .source_prefilter import SourcePrefilter
+from .claim_clusterer import ClaimClusterer
+from .request_stats import record_stat, request_stats_scope, summarize_stats
+from .llm_cache import cached_client
+from .single_flight import coalesced_client
+from .hedged_client import hedged_client
+from .document_session import DocumentSession, paragraph_hash, split_paragraphs
+from .token_budget import estimate_tokens
+from .token_cache import get_token_cache
 
 logger = logging.getLogger(__name__)
 
@@ -33,206 +53,893 @@ class AnalysisService:
                 )
             )
             
-            # Initialize DeepSeek service
-            self.deepseek_service = DeepSeekService()
+            # Initialize DeepSeek service, hedging its slow calls on OpenAI
+            self.deepseek_service = DeepSeekService(backup_client=self.openai_client)
+            
+            # Route every chat completion through the shared response cache,
+            # coalescing identical in-flight requests on a miss and hedging
+            # slow calls on DeepSeek
+            self.llm_client = cached_client(coalesced_client(hedged_client(
+                self.openai_client, "openai", self.deepseek_service.api_client, "deepseek", "deepseek-chat"
+            )))
             
             # Initialize specialized services
-            self.claim_extractor = ClaimExtractor(self.openai_client)
-            self.similarity_analyzer = SimilarityAnalyzer(self.openai_client)
+            self.claim_extractor = ClaimExtractor(self.llm_client)
+            self.similarity_analyzer = SimilarityAnalyzer(self.llm_client)
             self.confidence_calculator = ConfidenceCalculator()
-            self.explanation_generator = ExplanationGenerator(self.openai_client)
+            self.early_exit_policy = EarlyExitPolicy()
+            self.claim_clusterer = ClaimClusterer()
+            self.source_deduplicator = SourceDeduplicator()
+            self.source_prefilter = SourcePrefilter()
+            self.explanation_generator = ExplanationGenerator(self.llm_client)
+            self.explanation_store = DeferredExplanationStore()
+            
+            # Initialize evidence retrieval (None when no search service is available)
+            self.evidence_retriever = create_evidence_retriever()
             
             logger.info("Initializing AnalysisService...")
         except Exception as e:
             logger.error(f"初始化 AnalysisService 失败: {str(e)}")
             raise
 
-    async def analyze_text(self, text: str, sources: List[Source], use_deepseek: bool = False) -> FactCheckResponse:
+    async def analyze_text(
+        self,
+        text: str,
+        sources: List[Source],
+        use_deepseek: bool = False,
+        session: Optional[DocumentSession] = None
+    ) -> FactCheckResponse:
         """
         Analyze text against sources using specialized services.
         
         Args:
             text (str): Text to analyze
-            sources (List[Source]): List of sources to check against
+            sources (List[Source]): List of sources to check against; when empty,
+                sources are retrieved for each claim if a search service is available
             use_deepseek (bool): Whether to use DeepSeek API instead of OpenAI
+            session (Optional[DocumentSession]): Document session whose cached claims
+                and verdicts are reused for unchanged paragraphs
             
         Returns:
-            FactCheckResponse: Analysis results including factuality and confidence
+            FactCheckResponse: Analysis results including factuality, confidence
+                and the pipeline counters recorded for this request
+        """
+        response = None
+        async for event, data in self.analyze_text_stream(text, sources, use_deepseek, session):
+            if event == "result":
+                response = data
+        return response
+
+    async def analyze_text_stream(
+        self,
+        text: str,
+        sources: List[Source],
+        use_deepseek: bool = False,
+        session: Optional[DocumentSession] = None
+    ) -> AsyncIterator[Tuple[str, Any]]:
         """
+        Analyze text against sources, yielding results as soon as they are available.
+        
+        Args:
+            text (str): Text to analyze
+            sources (List[Source]): List of sources to check against; when empty,
+                sources are retrieved for each claim if a search service is available
+            use_deepseek (bool): Whether to use DeepSeek API instead of OpenAI
+            session (Optional[DocumentSession]): Document session whose cached claims
+                and verdicts are reused for unchanged paragraphs
+            
+        Yields:
+            Tuple[str, Any]: ("claims", List[dict]) once the claims are extracted,
+                ("claim", ClaimVerdict) as each claim's evaluation completes, and
+                ("result", FactCheckResponse) last
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        
+        async def produce():
+            # The pipeline runs in its own task so that its statistics scope is
+            # opened and closed in one context, whatever the consumer does.
+            try:
+                with request_stats_scope() as stats:
+                    async for event, data in self._run_pipeline(text, sources, use_deepseek, session):
+                        if event == "result" and stats:
+                            data.stats = summarize_stats(stats)
+                        queue.put_nowait((event, data))
+            except Exception as e:
+                logger.error(f"分析过程中发生严重错误: {str(e)}")
+                queue.put_nowait(("result", self._empty_response("分析过程中发生错误，请稍后重试。")))
+            finally:
+                queue.put_nowait(None)
+        
+        producer = asyncio.create_task(produce())
+        try:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    break
+                yield item
+        finally:
+            producer.cancel()
+
+    async def _run_pipeline(
+        self,
+        text: str,
+        sources: List[Source],
+        use_deepseek: bool,
+        session: Optional[DocumentSession]
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """Run the analysis pipeline, yielding the events of analyze_text_stream."""
+        speculation = None
+        scoring_tasks: Dict[asyncio.Task, List[int]] = {}
         try:
             logger.info("开始使用" + ("DeepSeek" if use_deepseek else "GPT") + "进行全面分析")
             logger.info(f"收到 {len(sources)} 个来源进行分析")
             
-            if not sources:
+            if not sources and self.evidence_retriever is not None:
+                # Retrieve candidate sources per claim, within the request's search budget
+                speculation = SpeculativeRetrieval(ClaimRetrieval(self.evidence_retriever), self.claim_extractor)
+                if get_settings().SPECULATIVE_RETRIEVAL_ENABLED:
+                    # Start searching from cheap claim candidates while the extraction call runs
+                    if session is not None:
+                        # Only new or modified paragraphs can produce claims without a cached verdict
+                        paragraphs = session.changed_paragraphs(split_paragraphs(text), use_deepseek)
+                        speculation.start("\n".join(paragraphs))
+                    else:
+                        speculation.start(text)
+            elif not sources:
                 logger.warning("没有提供任何来源进行分析")
-                return FactCheckResponse(
-                    is_fact=False,
-                    confidence=0.0,
-                    explanation="没有提供任何来源进行验证。",
-                    sources=[],
-                    academic_sources=[]
-                )
+                yield "result", self._empty_response("没有提供任何来源进行验证。")
+                return
+            
+            # Start retrieving each claim's sources as soon as it has been streamed
+            on_claim = None
+            if speculation is not None and get_settings().EARLY_CLAIM_RETRIEVAL_ENABLED:
+                on_claim = lambda claim: speculation.add_claim(self._claim_text(claim))
             
             # Extract claims using appropriate service
             try:
-                if use_deepseek:
-                    claims = await self.deepseek_service.extract_claims(text)
-                else:
-                    claims = await self.claim_extractor.extract_claims(text)
+                claims = await self.extract_claims(text, use_deepseek, session, on_claim)
                 logger.info(f"提取出 {len(claims)} 个声明: {claims}")
             except Exception as e:
                 logger.error(f"提取声明时出错: {str(e)}")
-                return FactCheckResponse(
-                    is_fact=False,
-                    confidence=0.0,
-                    explanation="提取声明时发生错误，请稍后重试。",
-                    sources=[],
-                    academic_sources=[]
-                )
+                yield "result", self._empty_response("提取声明时发生错误，请稍后重试。")
+                return
             
             if not claims:
                 logger.warning("文本中没有找到可验证的声明")
-                return FactCheckResponse(
-                    is_fact=False,
-                    confidence=0.0,
-                    explanation="文本中没有找到可验证的声明。",
-                    sources=[],
-                    academic_sources=[]
-                )
+                yield "result", self._empty_response("文本中没有找到可验证的声明。")
+                return
+            
+            yield "claims", claims
+            
+            claim_texts = [self._claim_text(claim) for claim in claims]
+            verdicts: List[Optional[ClaimVerdict]] = [None] * len(claim_texts)
+            
+            # Reuse the verdicts of claims the document session has already verified
+            sources_key = self._sources_fingerprint(sources)
+            if session is not None:
+                session.retain_verdicts(claim_texts, use_deepseek)
+                for claim_index, claim_text in enumerate(claim_texts):
+                    verdict = session.get_verdict(claim_text, sources_key, use_deepseek)
+                    if verdict is not None:
+                        verdicts[claim_index] = verdict
+                        yield "claim", verdict
+                record_stat("claims_reused", sum(verdict is not None for verdict in verdicts))
+            pending = [claim_index for claim_index, verdict in enumerate(verdicts) if verdict is None]
+            
+            # Verify one representative per cluster of near-duplicate claims
+            clusters = [
+                [pending[member] for member in members]
+                for members in self.claim_clusterer.cluster([claim_texts[claim_index] for claim_index in pending])
+            ]
+            pending_texts = [claim_texts[members[0]] for members in clusters]
+            
+            if not pending:
+                candidate_sources = []
+            elif speculation is not None:
+                candidate_sources = await speculation.resolve(pending_texts)
+                if not any(candidate_sources) and len(pending) == len(claim_texts):
+                    logger.warning("没有检索到任何来源进行分析")
+                    yield "result", self._empty_response("没有检索到任何来源进行验证。")
+                    return
+            else:
+                candidate_sources = [sources] * len(pending_texts)
             
-            # Analyze each claim against sources
-            verified_sources = []
-            source_contributions = {}
-            claim_scores = {}
+            # Verify one representative per near-duplicate cluster and only forward
+            # the sources most similar to each claim to the LLM
+            candidate_sources = self.source_deduplicator.collapse(candidate_sources)
+            candidate_sources = self.source_prefilter.prerank(pending_texts, candidate_sources)
             
-            for claim in claims:
+            # Evaluate the whole claim × source matrix as a bounded concurrent fan-out,
+            # reporting each claim as soon as its group has been scored
+            scores, rationales, scoring_tasks = self._start_scoring(
+                pending_texts, candidate_sources, use_deepseek, SupportTally(len(claims))
+            )
+            
+            while scoring_tasks:
+                done, _ = await asyncio.wait(scoring_tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    pending_indices = scoring_tasks.pop(task)
+                    if task.exception() is not None:
+                        logger.error(f"评估声明时出错: {str(task.exception())}")
+                    for pending_index in pending_indices:
+                        verdict = self._build_verdict(
+                            pending_texts[pending_index], candidate_sources[pending_index],
+                            scores[pending_index], rationales[pending_index]
+                        )
+                        # Reuse the representative's verdict for the rest of its cluster
+                        for claim_index in clusters[pending_index]:
+                            verdicts[claim_index] = self._member_verdict(verdict, claim_texts[claim_index])
+                            if session is not None:
+                                session.set_verdict(verdicts[claim_index], sources_key, use_deepseek)
+                            yield "claim", verdicts[claim_index]
+            
+            yield "result", await self._build_response(text, claims, verdicts, use_deepseek)
+        except Exception as e:
+            logger.error(f"分析过程中发生严重错误: {str(e)}")
+            yield "result", self._empty_response("分析过程中发生错误，请稍后重试。")
+        finally:
+            if speculation is not None:
+                speculation.cancel()
+            for task in scoring_tasks:
+                task.cancel()
+    
+    async def extract_claims(
+        self,
+        text: str,
+        use_deepseek: bool = False,
+        session: Optional[DocumentSession] = None,
+        on_claim: Optional[Callable[[dict], None]] = None
+    ) -> List[dict]:
+        """
+        Extract claims from text, re-extracting only changed paragraphs when a session is given.
+        
+        Consecutive changed paragraphs are extracted together in token-budgeted
+        batches, so that pronouns can be resolved against neighbouring
+        paragraphs and each call pays the minimum output budget once; the
+        batches run under CLAIM_EXTRACTION_MAX_CONCURRENCY.
+        
+        Args:
+            text (str): Text to extract claims from
+            use_deepseek (bool): Whether to use DeepSeek API instead of OpenAI
+            session (Optional[DocumentSession]): Document session caching the claims of each paragraph
+            on_claim (Optional[Callable[[dict], None]]): Called with each newly extracted claim
+                as soon as it has been streamed (OpenAI extraction only)
+            
+        Returns:
+            List[dict]: Claims of the whole text, in document order
+        """
+        if session is None:
+            return await self._extract_claims(text, use_deepseek, on_claim)
+        
+        paragraphs = split_paragraphs(text)
+        changed = set(session.changed_paragraphs(paragraphs, use_deepseek))
+        batches = self._paragraph_batches(paragraphs, changed)
+        logger.info(
+            f"文档会话 {session.session_id}: {len(paragraphs)} 个段落中有 {len(changed)} 个需要重新提取，"
+            f"分 {len(batches)} 批提取"
+        )
+        record_stat("paragraphs", len(paragraphs))
+        record_stat("paragraphs_extracted", sum(len(batch) for batch in batches))
+        
+        semaphore = asyncio.Semaphore(max(1, get_settings().CLAIM_EXTRACTION_MAX_CONCURRENCY))
+        
+        async def extract(batch: List[str]) -> List[dict]:
+            async with semaphore:
+                return await self._extract_claims("\n\n".join(batch), use_deepseek, on_claim)
+        
+        extracted = await asyncio.gather(*[extract(batch) for batch in batches])
+        for batch, batch_claims in zip(batches, extracted):
+            for paragraph, paragraph_claims in zip(batch, self._assign_to_paragraphs(batch, batch_claims)):
+                session.set_paragraph_claims(paragraph, use_deepseek, paragraph_claims)
+        session.retain_paragraphs(paragraphs, use_deepseek)
+        
+        claims = []
+        for paragraph in paragraphs:
+            claims.extend(session.get_paragraph_claims(paragraph, use_deepseek) or [])
+        return claims
+    
+    @staticmethod
+    def _paragraph_batches(paragraphs: List[str], changed: set) -> List[List[str]]:
+        """
+        Group runs of consecutive changed paragraphs into batches within the extraction chunk budget.
+        
+        Args:
+            paragraphs (List[str]): Paragraphs of the draft, in document order
+            changed (set): Paragraphs that need extraction
+            
+        Returns:
+            List[List[str]]: Batches of consecutive paragraphs, each paragraph in one batch only
+        """
+        budget = max(1, get_settings().CLAIM_EXTRACTION_CHUNK_TOKENS)
+        batches: List[List[str]] = []
+        batch: List[str] = []
+        batch_tokens = 0
+        scheduled = set()
+        for paragraph in paragraphs:
+            key = paragraph_hash(paragraph)
+            if paragraph not in changed or key in scheduled:
+                # An unchanged paragraph ends the run
+                if batch:
+                    batches.append(batch)
+                batch, batch_tokens = [], 0
+                continue
+            scheduled.add(key)
+            tokens = estimate_tokens(paragraph)
+            if batch and batch_tokens + tokens > budget:
+                batches.append(batch)
+                batch, batch_tokens = [], 0
+            batch.append(paragraph)
+            batch_tokens += tokens
+        if batch:
+            batches.append(batch)
+        return batches
+    
+    def _assign_to_paragraphs(self, paragraphs: List[str], claims: List[dict]) -> List[List[dict]]:
+        """
+        Attribute the claims extracted from a batch to the paragraphs they came from.
+        
+        Each claim goes to the paragraph containing most of its tokens.
+        
+        Args:
+            paragraphs (List[str]): Paragraphs of the batch
+            claims (List[dict]): Claims extracted from the batch
+            
+        Returns:
+            List[List[dict]]: Claims of each paragraph, in extraction order
+        """
+        if len(paragraphs) == 1 or not claims:
+            return [claims] + [[] for _ in paragraphs[1:]]
+        coverage = get_token_cache().coverage_matrix([self._claim_text(claim) for claim in claims], paragraphs)
+        assigned: List[List[dict]] = [[] for _ in paragraphs]
+        for claim, row in zip(claims, coverage):
+            assigned[int(row.argmax())].append(claim)
+        return assigned
+    
+    async def _extract_claims(
+        self,
+        text: str,
+        use_deepseek: bool,
+        on_claim: Optional[Callable[[dict], None]] = None
+    ) -> List[dict]:
+        """Extract claims from text using the appropriate service."""
+        if use_deepseek:
+            return await self.deepseek_service.extract_claims(text)
+        return await self.claim_extractor.extract_claims(text, on_claim)
+    
+    async def analyze_batch(self, texts: List[str], use_deepseek: bool = False) -> BatchFactCheckResponse:
+        """
+        Analyze many texts at once, verifying each distinct claim only once.
+        
+        Claims are extracted from every text, clustered across the batch into
+        exact and near-duplicate groups, retrieved and verified once per
+        group, and the verdicts are scattered back into one response per text.
+        
+        Args:
+            texts (List[str]): Texts to analyze
+            use_deepseek (bool): Whether to use DeepSeek API instead of OpenAI
+            
+        Returns:
+            BatchFactCheckResponse: Per-text results and deduplication statistics
+        """
+        with request_stats_scope() as stats:
+            response = await self._analyze_batch(texts, use_deepseek)
+        if stats:
+            response.stats = summarize_stats(stats)
+        return response
+    
+    async def _analyze_batch(self, texts: List[str], use_deepseek: bool) -> BatchFactCheckResponse:
+        """Run the batch analysis for analyze_batch."""
+        logger.info(f"开始批量分析 {len(texts)} 篇文本")
+        semaphore = asyncio.Semaphore(max(1, get_settings().ANALYSIS_MAX_CONCURRENCY))
+        
+        async def extract(text: str) -> List:
+            async with semaphore:
                 try:
-                    logger.info(f"\n{'='*50}")
-                    logger.info(f"开始分析声明: {claim}")
-                    logger.info(f"{'='*50}")
-                    
-                    claim_similarity = 0
-                    claim_sources = []
-                    claim_source_scores = []
-                    
-                    for source in sources:
-                        logger.info(f"\n检查来源: {source.title}")
-                        try:
-                            if use_deepseek:
-                                analysis = await self.deepseek_service.check_factuality(claim, source.content)
-                                similarity = analysis.get("confidence", 0)
-                            else:
-                                analysis = await self.similarity_analyzer.analyze_similarity(claim, source)
-                                similarity = analysis["similarity_score"]
-                            
-                            logger.info(f"来源 '{source.title}' 的相似度得分: {similarity:.2f}")
-                            
-                            if similarity > 0.5:  # Threshold for considering a source as supporting
-                                # Calculate source contribution based on similarity and source type
-                                base_contribution = similarity
-                                if source.source_type == "academic":
-                                    base_contribution *= 1.2
-                                    logger.info(f"学术来源加成: 基础分数 {similarity:.2f} -> {base_contribution:.2f}")
-                                elif source.source_type == "government":
-                                    base_contribution *= 1.1
-                                    logger.info(f"政府来源加成: 基础分数 {similarity:.2f} -> {base_contribution:.2f}")
-                                
-                                # Update source contribution score
-                                if source.title not in source_contributions:
-                                    source_contributions[source.title] = 0
-                                source_contributions[source.title] = max(
-                                    source_contributions[source.title],
-                                    base_contribution
-                                )
-                                
-                                claim_similarity = max(claim_similarity, similarity)
-                                if source not in claim_sources:
-                                    claim_sources.append(source)
-                                    claim_source_scores.append({
-                                        "source": source.title,
-                                        "score": base_contribution,
-                                        "type": source.source_type
-                                    })
-                                    logger.info(f"添加支持来源: {source.title} (得分: {base_contribution:.2f})")
-                        except Exception as e:
-                            logger.error(f"分析来源 '{source.title}' 时出错: {str(e)}")
-                            continue
-                    
-                    if claim_sources:
-                        verified_sources.extend(claim_sources)
-                        claim_scores[claim] = {
-                            "total_score": claim_similarity,
-                            "source_count": len(claim_sources),
-                            "source_details": claim_source_scores
-                        }
-                        logger.info(f"\n声明 '{claim}' 的最终得分: {claim_similarity:.2f}")
-                        logger.info(f"支持来源数量: {len(claim_sources)}")
-                        logger.info("支持来源详情:")
-                        for source_detail in claim_source_scores:
-                            logger.info(f"- {source_detail['source']} ({source_detail['type']}): {source_detail['score']:.2f}")
-                    else:
-                        logger.warning(f"未找到支持声明 '{claim}' 的来源")
-                        claim_scores[claim] = {
-                            "total_score": 0,
-                            "source_count": 0,
-                            "source_details": []
-                        }
+                    return await self._extract_claims(text, use_deepseek)
                 except Exception as e:
-                    logger.error(f"处理声明 '{claim}' 时出错: {str(e)}")
-                    continue
-            
-            # Calculate confidence using specialized service
+                    logger.error(f"提取声明时出错: {str(e)}")
+                    return []
+        
+        document_claims = await asyncio.gather(*[extract(text) for text in texts])
+        
+        # Deduplicate claims across the batch, clustering near-duplicate wordings
+        claim_texts = [self._claim_text(claim) for claims in document_claims for claim in claims]
+        claim_documents = [document for document, claims in enumerate(document_claims) for _ in claims]
+        total_claims = len(claim_texts)
+        clusters = self.claim_clusterer.cluster(claim_texts, claim_documents)
+        unique_claims = [claim_texts[members[0]] for members in clusters]
+        unique_index = [0] * total_claims
+        for cluster_index, members in enumerate(clusters):
+            for claim_index in members:
+                unique_index[claim_index] = cluster_index
+        
+        dedup_ratio = 1 - len(unique_claims) / total_claims if total_claims else 0.0
+        logger.info(f"批量去重: {total_claims} 个声明中有 {len(unique_claims)} 个不重复 (去重率 {dedup_ratio:.1%})")
+        
+        # Retrieve and verify each unique claim once
+        verdicts: List[Optional[ClaimVerdict]] = [None] * len(unique_claims)
+        if unique_claims and self.evidence_retriever is not None:
+            budget = get_settings().SEARCH_BUDGET_PER_REQUEST * len(texts)
+            candidate_sources = await ClaimRetrieval(self.evidence_retriever, budget).retrieve(unique_claims)
+            candidate_sources = self.source_deduplicator.collapse(candidate_sources)
+            candidate_sources = self.source_prefilter.prerank(unique_claims, candidate_sources)
+            scores, rationales, scoring_tasks = self._start_scoring(unique_claims, candidate_sources, use_deepseek)
             try:
-                confidence = self.confidence_calculator.calculate_confidence(
-                    claims, verified_sources, claim_scores, source_contributions
-                )
-            except Exception as e:
-                logger.error(f"计算置信度时出错: {str(e)}")
-                confidence = 0.0
-            
-            # Log detailed scores
+                await asyncio.gather(*scoring_tasks, return_exceptions=True)
+            finally:
+                for task in scoring_tasks:
+                    task.cancel()
+            verdicts = [
+                self._build_verdict(claim, sources, claim_scores, claim_rationales)
+                for claim, sources, claim_scores, claim_rationales
+                in zip(unique_claims, candidate_sources, scores, rationales)
+            ]
+        
+        # Scatter the verdicts back into per-document responses
+        async def build(text: str, claims: List, offset: int) -> FactCheckResponse:
+            if not claims:
+                return self._empty_response("文本中没有找到可验证的声明。")
+            if self.evidence_retriever is None:
+                return self._empty_response("没有提供任何来源进行验证。")
+            claim_verdicts = [
+                self._member_verdict(verdicts[unique_index[offset + position]], claim_texts[offset + position])
+                for position in range(len(claims))
+            ]
             try:
-                self.confidence_calculator.log_claim_scores(claim_scores)
-                self.confidence_calculator.log_source_details(verified_sources)
+                return await self._build_response(text, claims, claim_verdicts, use_deepseek)
             except Exception as e:
-                logger.error(f"记录详细分数时出错: {str(e)}")
+                logger.error(f"分析过程中发生严重错误: {str(e)}")
+                return self._empty_response("分析过程中发生错误，请稍后重试。")
+        
+        offsets = [0]
+        for claims in document_claims:
+            offsets.append(offsets[-1] + len(claims))
+        results = await asyncio.gather(*[
+            build(text, claims, offset) for text, claims, offset in zip(texts, document_claims, offsets)
+        ])
+        
+        return BatchFactCheckResponse(
+            results=results,
+            total_claims=total_claims,
+            unique_claims=len(unique_claims),
+            dedup_ratio=dedup_ratio
+        )
+    
+    async def _build_response(
+        self,
+        text: str,
+        claims: List,
+        verdicts: List[ClaimVerdict],
+        use_deepseek: bool
+    ) -> FactCheckResponse:
+        """
+        Combine claim verdicts into the final response for one text.
+        
+        Args:
+            text (str): The analyzed text
+            claims (List): The extracted claims
+            verdicts (List[ClaimVerdict]): Verdict of each claim, in claim order
+            use_deepseek (bool): Whether to use DeepSeek API instead of OpenAI
+            
+        Returns:
+            FactCheckResponse: Confidence, explanation and supporting sources; with
+                deferred explanations, also the result id of the polished explanation
+        """
+        # Aggregate claim verdicts in claim order
+        verified_sources = []
+        source_contributions = {}
+        claim_scores = {}
+        
+        for verdict in verdicts:
+            # Copy the sources so that contribution scores stay per response
+            verified_sources.extend(source.model_copy() for source in verdict.sources)
+            claim_scores[verdict.claim] = {
+                "total_score": verdict.score,
+                "source_count": len(verdict.sources),
+                "source_details": verdict.source_details
+            }
+            for source_detail in verdict.source_details:
+                source_contributions[source_detail["source"]] = max(
+                    source_contributions.get(source_detail["source"], 0),
+                    source_detail["score"]
+                )
+        
+        # Calculate confidence using specialized service
+        try:
+            confidence = self.confidence_calculator.calculate_confidence(
+                claims, verified_sources, claim_scores, source_contributions
+            )
+        except Exception as e:
+            logger.error(f"计算置信度时出错: {str(e)}")
+            confidence = 0.0
+        
+        # Add contribution scores to sources
+        for source in verified_sources:
+            source.contribution_score = source_contributions.get(source.title, 0)
+        
+        # Log detailed scores
+        try:
+            self.confidence_calculator.log_claim_scores(claim_scores)
+            self.confidence_calculator.log_source_details(verified_sources)
+        except Exception as e:
+            logger.error(f"记录详细分数时出错: {str(e)}")
+        
+        # Build the explanation from the claim rationales, deferring the LLM polish,
+        # or generate it inline using the appropriate service
+        result_id = None
+        try:
+            if get_settings().DEFERRED_EXPLANATION_ENABLED:
+                explanation = self.explanation_generator.build_template_explanation(
+                    confidence, len(verified_sources), verdicts
+                )
+                result_id = self.explanation_store.add(DeferredExplanation(
+                    text, explanation, confidence, len(verified_sources), use_deepseek
+                ))
+            elif use_deepseek:
+                explanation = (await self.deepseek_service.check_factuality(text))["explanation"]
+            else:
+                explanation = await self.explanation_generator.generate_explanation(
+                    confidence, len(verified_sources)
+                )
+        except Exception as e:
+            logger.error(f"生成解释时出错: {str(e)}")
+            explanation = "分析过程中出现错误，无法生成详细解释。"
+        
+        logger.info(f"\n分析完成。最终置信度: {confidence:.2f}")
+        logger.info(f"已验证的来源数量: {len(verified_sources)}")
+        
+        return FactCheckResponse(
+            is_fact=confidence > 0.6,
+            confidence=confidence,
+            explanation=explanation,
+            sources=verified_sources,
+            academic_sources=[s for s in verified_sources if s.source_type == "academic"],
+            result_id=result_id
+        )
+    
+    async def polish_explanation(self, result_id: str) -> Optional[ExplanationResponse]:
+        """
+        Get the LLM-polished explanation of an earlier result.
+        
+        The polish is generated on the first request and shared by concurrent
+        and later requests for the same result.
+        
+        Args:
+            result_id (str): Result id returned with the fact-check response
             
-            # Add contribution scores to sources
-            for source in verified_sources:
-                source.contribution_score = source_contributions.get(source.title, 0)
+        Returns:
+            Optional[ExplanationResponse]: The polished explanation, the template
+                explanation if polishing failed, or None if the result is unknown or expired
+        """
+        entry = self.explanation_store.get(result_id)
+        if entry is None:
+            return None
+        
+        if entry.task is None:
+            entry.task = asyncio.create_task(self._polish(entry))
+        try:
+            explanation = await asyncio.shield(entry.task)
+            return ExplanationResponse(result_id=result_id, explanation=explanation, polished=True)
+        except Exception as e:
+            logger.error(f"润色解释时出错: {str(e)}")
+            entry.task = None
+            return ExplanationResponse(result_id=result_id, explanation=entry.template, polished=False)
+    
+    async def _polish(self, entry: DeferredExplanation) -> str:
+        """Polish a template explanation using the appropriate service."""
+        if entry.use_deepseek:
+            return (await self.deepseek_service.check_factuality(entry.text))["explanation"]
+        return await self.explanation_generator.polish_explanation(
+            entry.template, entry.confidence, entry.num_sources
+        )
+    
+    def _build_verdict(
+        self,
+        claim: str,
+        sources: List[Source],
+        similarities: List[Optional[float]],
+        rationales: List[Optional[str]]
+    ) -> ClaimVerdict:
+        """
+        Aggregate the pair scores of one claim into its verdict.
+        
+        Args:
+            claim (str): Claim text
+            sources (List[Source]): Candidate sources of the claim
+            similarities (List[Optional[float]]): Similarity per source, None for failed or skipped pairs
+            rationales (List[Optional[str]]): Similarity analysis explanation per source
             
-            # Generate explanation using appropriate service
+        Returns:
+            ClaimVerdict: The claim's score, supporting sources and the rationale
+                of its best-scoring source
+        """
+        logger.info(f"\n{'='*50}")
+        logger.info(f"汇总声明结果: {claim}")
+        logger.info(f"{'='*50}")
+        
+        claim_similarity = 0
+        claim_sources = []
+        claim_source_scores = []
+        best_similarity = None
+        rationale = None
+        
+        try:
+            for source, similarity, source_rationale in zip(sources, similarities, rationales):
+                if similarity is None:
+                    continue
+                if best_similarity is None or similarity > best_similarity:
+                    best_similarity, rationale = similarity, source_rationale
+                
+                if similarity > SUPPORT_THRESHOLD:  # Threshold for considering a source as supporting
+                    # Calculate source contribution based on similarity and source type
+                    base_contribution = similarity * SOURCE_TYPE_MULTIPLIERS.get(source.source_type, 1.0)
+                    if source.source_type == "academic":
+                        logger.info(f"学术来源加成: 基础分数 {similarity:.2f} -> {base_contribution:.2f}")
+                    elif source.source_type == "government":
+                        logger.info(f"政府来源加成: 基础分数 {similarity:.2f} -> {base_contribution:.2f}")
+                    
+                    claim_similarity = max(claim_similarity, similarity)
+                    if source not in claim_sources:
+                        claim_sources.append(source)
+                        claim_source_scores.append({
+                            "source": source.title,
+                            "score": base_contribution,
+                            "type": source.source_type,
+                            "explanation": source_rationale
+                        })
+                        logger.info(f"添加支持来源: {source.title} (得分: {base_contribution:.2f})")
+        except Exception as e:
+            logger.error(f"处理声明 '{claim}' 时出错: {str(e)}")
+            claim_similarity, claim_sources, claim_source_scores = 0, [], []
+        
+        if claim_sources:
+            logger.info(f"\n声明 '{claim}' 的最终得分: {claim_similarity:.2f}")
+            logger.info(f"支持来源数量: {len(claim_sources)}")
+            logger.info("支持来源详情:")
+            for source_detail in claim_source_scores:
+                logger.info(f"- {source_detail['source']} ({source_detail['type']}): {source_detail['score']:.2f}")
+        else:
+            logger.warning(f"未找到支持声明 '{claim}' 的来源")
+        
+        return ClaimVerdict(
+            claim=claim,
+            score=claim_similarity,
+            is_supported=bool(claim_sources),
+            sources=claim_sources,
+            source_details=claim_source_scores,
+            rationale=rationale
+        )
+    
+    @staticmethod
+    def _empty_response(explanation: str) -> FactCheckResponse:
+        """Build a negative response for a request that could not be analyzed."""
+        return FactCheckResponse(
+            is_fact=False,
+            confidence=0.0,
+            explanation=explanation,
+            sources=[],
+            academic_sources=[]
+        )
+    
+    def _start_scoring(
+        self,
+        claims: List[str],
+        claim_sources: List[List[Source]],
+        use_deepseek: bool,
+        tally: Optional[SupportTally] = None
+    ) -> Tuple[List[List[Optional[float]]], List[List[Optional[str]]], Dict[asyncio.Task, List[int]]]:
+        """
+        Start scoring every claim against each of its candidate sources.
+        
+        Args:
+            claims (List[str]): Claim texts to verify
+            claim_sources (List[List[Source]]): Candidate sources for each claim
+            use_deepseek (bool): Whether to use DeepSeek API instead of OpenAI
+            tally (Optional[SupportTally]): Supporters of the one document all claims
+                belong to, shared by the early-exit decisions; None for batches
+            
+        Returns:
+            Tuple[List[List[Optional[float]]], List[List[Optional[str]]], Dict[asyncio.Task, List[int]]]:
+                The score matrix the tasks fill in (None for failed or skipped pairs),
+                the matching matrix of similarity explanations, and the scoring tasks
+                mapped to the claim indices they cover
+        """
+        settings = get_settings()
+        semaphore = asyncio.Semaphore(max(1, settings.ANALYSIS_MAX_CONCURRENCY))
+        use_batch = settings.SIMILARITY_BATCH_ENABLED and not use_deepseek
+        group_size = max(1, settings.SIMILARITY_BATCH_MAX_CLAIMS) if use_batch else 1
+        
+        # Claims sharing the same source list can be packed into the same requests
+        shared: Dict[int, List[int]] = {}
+        for claim_index, sources in enumerate(claim_sources):
+            shared.setdefault(id(sources), []).append(claim_index)
+        claim_groups = [
+            indices[start:start + group_size]
+            for indices in shared.values()
+            for start in range(0, len(indices), group_size)
+        ]
+        
+        scores: List[List[Optional[float]]] = [[None] * len(sources) for sources in claim_sources]
+        rationales: List[List[Optional[str]]] = [[None] * len(sources) for sources in claim_sources]
+        tasks = {
+            asyncio.create_task(self._score_claim_group(
+                group, claims, claim_sources[group[0]], scores, rationales, use_batch, use_deepseek, semaphore, tally
+            )): group
+            for group in claim_groups
+        }
+        return scores, rationales, tasks
+    
+    async def _score_claim_group(
+        self,
+        claim_indices: List[int],
+        claims: List[str],
+        sources: List[Source],
+        scores: List[List[Optional[float]]],
+        rationales: List[List[Optional[str]]],
+        use_batch: bool,
+        use_deepseek: bool,
+        semaphore: asyncio.Semaphore,
+        tally: Optional[SupportTally] = None
+    ) -> None:
+        """
+        Score a group of claims sharing one source list, most promising sources first.
+        
+        Sources are evaluated in waves. After each wave, claims that the early-exit
+        policy considers settled stop issuing similarity calls.
+        
+        Args:
+            claim_indices (List[int]): Indices of the claims in this group
+            claims (List[str]): All claim texts
+            sources (List[Source]): Candidate sources shared by the group
+            scores (List[List[Optional[float]]]): Score matrix to fill in
+            rationales (List[List[Optional[str]]]): Similarity explanation matrix to fill in
+            use_batch (bool): Whether to use batched similarity requests
+            use_deepseek (bool): Whether to use DeepSeek API instead of OpenAI
+            semaphore (asyncio.Semaphore): Limits the number of in-flight requests
+            tally (Optional[SupportTally]): Supporters of the claims' document
+        """
+        policy = self.early_exit_policy
+        group_claims = [claims[i] for i in claim_indices]
+        
+        if not policy.enabled:
+            waves = [list(range(len(sources)))]
+        else:
+            order = policy.order_sources(group_claims, sources)
+            if use_batch:
+                ordered_sources = [sources[i] for i in order]
+                waves = [
+                    [order[i] for i in chunk]
+                    for chunk in self.similarity_analyzer.plan_source_chunks(group_claims, ordered_sources)
+                ]
+            else:
+                waves = [order[i:i + policy.wave_size] for i in range(0, len(order), policy.wave_size)]
+        
+        active = list(claim_indices)
+        best = {claim_index: 0.0 for claim_index in claim_indices}
+        supporters: Dict[int, List[Source]] = {claim_index: [] for claim_index in claim_indices}
+        evaluated = set()
+        evaluated_pairs = 0
+        issued_waves = 0
+        
+        for wave in waves:
+            wave_sources = [sources[i] for i in wave]
+            wave_scores = None
+            if use_batch:
+                try:
+                    matrix = await self.similarity_analyzer.analyze_similarity_batch(
+                        [claims[i] for i in active], wave_sources, semaphore
+                    )
+                    wave_scores = [
+                        [(analysis["similarity_score"], analysis["explanation"]) for analysis in row]
+                        for row in matrix
+                    ]
+                except Exception as e:
+                    logger.error(f"批量相似度分析失败，改为逐对分析: {str(e)}")
+            if wave_scores is None:
+                wave_scores = await asyncio.gather(*[
+                    asyncio.gather(*[
+                        self._evaluate_pair(claims[claim_index], source, use_deepseek, semaphore)
+                        for source in wave_sources
+                    ])
+                    for claim_index in active
+                ])
+            
+            for claim_index, row in zip(active, wave_scores):
+                for source_index, (similarity, rationale) in zip(wave, row):
+                    scores[claim_index][source_index] = similarity
+                    rationales[claim_index][source_index] = rationale
+                    if similarity is not None and similarity > SUPPORT_THRESHOLD:
+                        best[claim_index] = max(best[claim_index], similarity)
+                        if sources[source_index] not in supporters[claim_index]:
+                            supporters[claim_index].append(sources[source_index])
+                            if tally is not None:
+                                tally.add(sources[source_index])
+            evaluated.update(wave)
+            evaluated_pairs += len(active) * len(wave)
+            issued_waves += 1
+            
+            remaining = [source for source_index, source in enumerate(sources) if source_index not in evaluated]
+            active = [
+                claim_index for claim_index in active
+                if not policy.is_settled(best[claim_index], supporters[claim_index], remaining, tally)
+            ]
+            if not active:
+                break
+        
+        total_pairs = len(claim_indices) * len(sources)
+        skipped_pairs = total_pairs - evaluated_pairs
+        skipped_calls = len(waves) - issued_waves if use_batch else skipped_pairs
+        record_stat("similarity_pairs", total_pairs)
+        if skipped_pairs:
+            record_stat("similarity_pairs_skipped", skipped_pairs)
+            record_stat("similarity_calls_skipped", skipped_calls)
+            logger.info(f"声明已确定，提前结束评估: 跳过 {skipped_pairs} 个声明-来源对 ({skipped_calls} 次调用)")
+    
+    async def _evaluate_pair(
+        self,
+        claim: str,
+        source: Source,
+        use_deepseek: bool,
+        semaphore: asyncio.Semaphore
+    ) -> Tuple[Optional[float], Optional[str]]:
+        """
+        Score a single claim against a single source.
+        
+        Args:
+            claim (str): Claim text to verify
+            source (Source): Source to check against
+            use_deepseek (bool): Whether to use DeepSeek API instead of OpenAI
+            semaphore (asyncio.Semaphore): Limits the number of in-flight pair evaluations
+            
+        Returns:
+            Tuple[Optional[float], Optional[str]]: Similarity score and its explanation,
+                or (None, None) if the evaluation failed
+        """
+        async with semaphore:
+            logger.info(f"检查来源: {source.title} (声明: {claim})")
             try:
-                if use_deepseek:
-                    explanation = await self.deepseek_service.check_factuality(text)["explanation"]
+                # The lexical cascade of the OpenAI path also spares DeepSeek calls
+                local_analysis = self.similarity_analyzer.decide_locally(claim, source) if use_deepseek else None
+                if local_analysis is not None:
+                    analysis = local_analysis
+                    similarity = analysis["similarity_score"]
+                elif use_deepseek:
+                    analysis = await self.deepseek_service.check_factuality(claim, source.snippet)
+                    similarity = analysis.get("confidence", 0)
                 else:
-                    explanation = await self.explanation_generator.generate_explanation(
-                        confidence, len(verified_sources)
-                    )
+                    analysis = await self.similarity_analyzer.analyze_similarity(claim, source)
+                    similarity = analysis["similarity_score"]
+                
+                logger.info(f"来源 '{source.title}' 的相似度得分: {similarity:.2f}")
+                return similarity, analysis.get("explanation")
             except Exception as e:
-                logger.error(f"生成解释时出错: {str(e)}")
-                explanation = "分析过程中出现错误，无法生成详细解释。"
-            
-            logger.info(f"\n分析完成。最终置信度: {confidence:.2f}")
-            logger.info(f"已验证的来源数量: {len(verified_sources)}")
-            
-            return FactCheckResponse(
-                is_fact=confidence > 0.6,
-                confidence=confidence,
-                explanation=explanation,
-                sources=verified_sources,
-                academic_sources=[s for s in verified_sources if s.source_type == "academic"]
-            )
-        except Exception as e:
-            logger.error(f"分析过程中发生严重错误: {str(e)}")
-            return FactCheckResponse(
-                is_fact=False,
-                confidence=0.0,
-                explanation="分析过程中发生错误，请稍后重试。",
-                sources=[],
-                academic_sources=[]
-            )
+                logger.error(f"分析来源 '{source.title}' 时出错: {str(e)}")
+                return None, None
+    
+    @staticmethod
+    def _sources_fingerprint(sources: List[Source]) -> str:
+        """Identify a set of explicitly provided sources; empty when sources are retrieved."""
+        if not sources:
+            return ""
+        links = sorted(str(source.link) for source in sources)
+        return hashlib.sha256("\n".join(links).encode("utf-8")).hexdigest()
+    
+    @staticmethod
+    def _member_verdict(verdict: ClaimVerdict, claim: str) -> ClaimVerdict:
+        """Reuse a cluster representative's verdict for a member claim."""
+        if claim == verdict.claim:
+            return verdict
+        return verdict.model_copy(update={"claim": claim})
+    
+    @staticmethod
+    def _claim_text(claim) -> str:
+        """Return the text of a claim, which may be a plain string or an extractor dict."""
+        if isinstance(claim, dict):
+            return str(claim.get("claim", ""))
+        return str(claim)
             
     async def close(self):
         """Close all service connections."""
-        await self.deepseek_service.close() 
\ No newline at end of file
+        await self.deepseek_service.close()
+        if self.evidence_retriever is not None:
+            await self.evidence_retriever.close() 
\ No newline at end of file
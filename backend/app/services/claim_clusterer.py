@@ -0,0 +1,169 @@
+"""
+Near-duplicate claim clustering.
+
+This module groups claims that state the same fact in different words,
+such as the overlapping claims GPT returns for one document or the same
+claim extracted from several documents, so that only one representative
+per cluster is verified and its verdict is reused for the other members.
+Claims with the same canonical key always cluster; otherwise two claims
+cluster when the Jaccard similarity of their content words reaches
+CLAIM_CLUSTER_THRESHOLD and they state the same numbers and the same
+negations. Within a document, a pronoun may stand in for one word of a
+claim that names its subject.
+"""
+
+import logging
+import re
+from collections import Counter
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+from ..core.config import get_settings
+from .claim_normalizer import normalize_claim
+from .request_stats import record_stat
+from .token_cache import content_tokens
+
+logger = logging.getLogger(__name__)
+
+# Words that refer to something named elsewhere; a claim using one states the
+# same fact as a claim naming it
+PRONOUNS = frozenset(
+    "他 她 它 他们 她们 它们 我们 该 此 这些 那些 这个 那个 "
+    "he she they him her them his hers their theirs we us our these those".split()
+)
+# Words that flip a claim's meaning however similar the rest of its wording is.
+# English contractions are expanded by normalize_claim; the stems below are
+# what is left of those it does not recognize ("can", "don" and "won" are
+# words in their own right and are not listed)
+NEGATIONS = frozenset(
+    "不 没 没有 未 未能 非 无 无法 并非 并未 不是 不会 不能 不可能 从未 从不 绝非 尚未 "
+    "not no never nor cannot neither none nothing doesn didn isn aren wasn weren "
+    "hasn haven hadn couldn wouldn shouldn mustn needn".split()
+)
+# jieba often keeps a Chinese negation together with the verb it negates
+# ("未能", "无法", "没能"), so any word starting with one of these negates...
+NEGATION_PREFIXES = ("不", "未", "没", "无", "非")
+# ...except for these common words, which negate nothing
+NEGATION_PREFIX_EXCEPTIONS = frozenset(
+    "不断 不同 不仅 不但 不过 不少 不久 不论 无论 无数 无限 非常 非洲 没收".split()
+)
+_NUMBER_PATTERN = re.compile(r'\d+(?:\.\d+)?')
+
+
+def negation_words(tokens: Iterable[str]) -> Tuple[str, ...]:
+    """
+    Get the negations among a claim's content words.
+
+    Args:
+        tokens (Iterable[str]): Content words of a normalized claim
+
+    Returns:
+        Tuple[str, ...]: The distinct negating words, sorted
+    """
+    return tuple(sorted({
+        token for token in tokens
+        if token in NEGATIONS
+        or (token.startswith(NEGATION_PREFIXES) and token not in NEGATION_PREFIX_EXCEPTIONS)
+    }))
+
+
+class ClaimClusterer:
+    """Groups exact and near-duplicate claims under one representative each."""
+
+    def __init__(self):
+        """Initialize the clusterer from the application settings."""
+        settings = get_settings()
+        self.enabled = settings.CLAIM_CLUSTERING_ENABLED
+        self.threshold = settings.CLAIM_CLUSTER_THRESHOLD
+
+    def cluster(self, claims: List[str], documents: Optional[List[int]] = None) -> List[List[int]]:
+        """
+        Group claims into clusters of the same fact.
+
+        Claims are assigned greedily, those naming their subject before
+        those using pronouns: each claim joins the most similar earlier
+        representative it matches, or becomes a representative itself.
+        Candidate representatives are found through an inverted index over
+        their content words, so only claims sharing a word are compared.
+
+        A pronoun only stands in for a word of a representative from the
+        same document that uses no pronouns itself, and only if that
+        representative is the claim's one such match, so a claim using
+        pronouns never joins claims naming different subjects.
+
+        Args:
+            claims (List[str]): Claim texts
+            documents (Optional[List[int]]): Document of each claim, or None
+                if all claims come from the same document
+
+        Returns:
+            List[List[int]]: Indices of each cluster's claims, ordered by their
+                first occurrence. A cluster starts with its representative,
+                the member using the fewest pronouns
+        """
+        keys = [normalize_claim(claim) for claim in claims]
+        features = [self._features(key) if self.enabled else (frozenset(), 0, ()) for key in keys]
+        documents = documents or [0] * len(claims)
+        members: Dict[int, List[int]] = {}
+        exact: Dict[str, int] = {}
+        postings: Dict[str, List[int]] = {}
+
+        for index in sorted(range(len(claims)), key=lambda index: features[index][1]):
+            representative = exact.get(keys[index])
+            if representative is None and self.enabled:
+                representative = self._match(index, features, documents, postings)
+                if representative is None:
+                    for token in features[index][0]:
+                        postings.setdefault(token, []).append(index)
+            if representative is None:
+                representative = index
+            exact.setdefault(keys[index], representative)
+            members.setdefault(representative, []).append(index)
+
+        clusters = sorted(
+            ([representative] + sorted(set(indices) - {representative}) for representative, indices in members.items()),
+            key=min
+        )
+        clustered = len(claims) - len(clusters)
+        if clustered:
+            logger.info(f"Clustered {len(claims)} claims into {len(clusters)} distinct claims")
+        record_stat("claims_clustered", clustered)
+        return clusters
+
+    def _match(
+        self,
+        index: int,
+        features: List[Tuple[FrozenSet[str], int, Tuple]],
+        documents: List[int],
+        postings: Dict[str, List[int]]
+    ) -> Optional[int]:
+        """Find the most similar matching representative of a claim, or None."""
+        tokens, pronouns, signature = features[index]
+        overlaps = Counter(peer for token in tokens for peer in postings.get(token, ()))
+        best, best_similarity = None, 0.0
+        resolved = []
+        for peer, overlap in overlaps.items():
+            peer_tokens, peer_pronouns, peer_signature = features[peer]
+            if peer_signature != signature:
+                continue
+            union = len(tokens) + len(peer_tokens) - overlap
+            similarity = overlap / union
+            if similarity >= self.threshold:
+                if similarity > best_similarity:
+                    best, best_similarity = peer, similarity
+            elif pronouns and not peer_pronouns and documents[peer] == documents[index]:
+                # Each pronoun may account for one word only the representative has
+                if (overlap + min(pronouns, len(peer_tokens) - overlap)) / union >= self.threshold:
+                    resolved.append(peer)
+        if best is None and len(resolved) == 1:
+            return resolved[0]
+        return best
+
+    @staticmethod
+    def _features(key: str) -> Tuple[FrozenSet[str], int, Tuple]:
+        """Get a canonical claim's content words, its pronoun count and the numbers and negations it must share."""
+        words = content_tokens(key)
+        tokens = frozenset(token for token in words if token not in PRONOUNS)
+        signature = (
+            tuple(sorted(_NUMBER_PATTERN.findall(key))),
+            negation_words(tokens)
+        )
+        return tokens, sum(token in PRONOUNS for token in words), signature
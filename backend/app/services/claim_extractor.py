@@ -2,20 +2,29 @@
 Claim extractor for fact-checking.
 
 This module provides functionality to extract verifiable claims
-from text using GPT and basic text processing methods.
+from text using GPT and basic text processing methods. Long texts are
+split at sentence boundaries into overlapping, token-budgeted chunks that
+are extracted concurrently and merged without the claims duplicated
+across chunk seams. The streamed GPT output is parsed incrementally, so
+each claim is available the moment its JSON object closes.
 """
 
 import logging
-import json
 import re
-import jieba
-from typing import List
+from typing import Callable, List, Optional
 from openai import AsyncOpenAI
 import asyncio
 from ..core.config import get_settings
+from .claim_normalizer import normalize_claim
+from .json_stream import JsonArrayStreamParser
+from .token_budget import chunk_by_tokens, estimate_tokens
+from .token_cache import get_token_cache
+from .tokenizer import lcut
 
 logger = logging.getLogger(__name__)
 
+_NUMBER_PATTERN = re.compile(r'\d+(?:\.\d+)?')
+
 class ClaimExtractor:
     """Extracts verifiable claims from text."""
     
@@ -27,21 +36,21 @@ class ClaimExtractor:
             openai_client (AsyncOpenAI): OpenAI client instance
         """
         self.openai_client = openai_client
-        # Initialize jieba for Chinese text processing
-        jieba.initialize()
     
-    async def extract_claims(self, text: str) -> List[dict]:
+    async def extract_claims(self, text: str, on_claim: Optional[Callable[[dict], None]] = None) -> List[dict]:
         """
         Extract verifiable claims from text using GPT or fallback methods.
         
         Args:
             text (str): Text to extract claims from
+            on_claim (Optional[Callable[[dict], None]]): Called with each GPT claim
+                as soon as it has been streamed, before extraction finishes
             
         Returns:
             List[dict]: List of dictionaries containing claims, uncommonness scores, and tags
         """
         try:
-            results = await self._extract_with_gpt(text)
+            results = await self._extract_with_gpt(text, on_claim)
             # Add tags based on uncommonness scores
             for result in results:
                 if result['uncommonness'] <= 30:
@@ -55,20 +64,105 @@ class ClaimExtractor:
             return results
         except Exception as e:
             logger.error(f"Error in GPT claim extraction: {str(e)}")
-            basic_results = self._extract_with_basic_methods(text)
+            basic_results = self.extract_with_basic_methods(text)
             return [{"claim": claim, "uncommonness": 50, "tag": "存疑待考"} for claim in basic_results]
     
-    async def _extract_with_gpt(self, text: str) -> List[dict]:
+    async def _extract_with_gpt(self, text: str, on_claim: Optional[Callable[[dict], None]] = None) -> List[dict]:
+        """
+        Extract claims using GPT, splitting long texts into concurrently extracted chunks.
+        
+        Args:
+            text (str): Text to extract claims from
+            on_claim (Optional[Callable[[dict], None]]): Called with each claim as soon as it has been streamed
+            
+        Returns:
+            List[dict]: List of dictionaries containing claims and their uncommonness scores
+        """
+        settings = get_settings()
+        chunks = chunk_by_tokens(
+            text,
+            max(1, settings.CLAIM_EXTRACTION_CHUNK_TOKENS),
+            max(0, settings.CLAIM_EXTRACTION_OVERLAP_SENTENCES)
+        )
+        if len(chunks) == 1:
+            return await self._extract_chunk_with_gpt(text, on_claim)
+        
+        logger.info(f"Splitting text of ~{estimate_tokens(text)} tokens into {len(chunks)} chunks for claim extraction")
+        semaphore = asyncio.Semaphore(max(1, settings.CLAIM_EXTRACTION_MAX_CONCURRENCY))
+        
+        async def extract(chunk: str) -> List[dict]:
+            async with semaphore:
+                return await self._extract_chunk_with_gpt(chunk, on_claim)
+        
+        chunk_claims = await asyncio.gather(*[extract(chunk) for chunk in chunks])
+        return self._merge_chunk_claims(chunk_claims)
+    
+    def _merge_chunk_claims(self, chunk_claims: List[List[dict]]) -> List[dict]:
+        """
+        Merge the claims of consecutive chunks in text order.
+        
+        Exact duplicates (by normalized text) are dropped anywhere; claims whose
+        token Jaccard similarity with a claim of the previous chunk reaches
+        CLAIM_EXTRACTION_SEAM_DEDUP_THRESHOLD are dropped as copies extracted
+        from the overlapping sentences, unless their numbers differ.
+        
+        Args:
+            chunk_claims (List[List[dict]]): Claims extracted from each chunk
+            
+        Returns:
+            List[dict]: The merged claims
+        """
+        threshold = get_settings().CLAIM_EXTRACTION_SEAM_DEDUP_THRESHOLD
+        token_cache = get_token_cache()
+        
+        def similarity(left: str, right: str) -> float:
+            # Claims that differ in a number are different claims, however similar the wording
+            if _NUMBER_PATTERN.findall(left) != _NUMBER_PATTERN.findall(right):
+                return 0.0
+            overlap = token_cache.overlap(left, right)
+            union = token_cache.token_ids(left).size + token_cache.token_ids(right).size - overlap
+            return overlap / union if union else 0.0
+        
+        merged: List[dict] = []
+        seen = set()
+        previous: List[dict] = []
+        for claims in chunk_claims:
+            kept = []
+            for claim in claims:
+                key = normalize_claim(claim["claim"])
+                if key in seen or any(similarity(claim["claim"], other["claim"]) >= threshold for other in previous):
+                    continue
+                seen.add(key)
+                kept.append(claim)
+            merged.extend(kept)
+            previous = kept
+        
+        dropped = sum(len(claims) for claims in chunk_claims) - len(merged)
+        logger.info(f"Merged claims of {len(chunk_claims)} chunks into {len(merged)} claims ({dropped} duplicates dropped)")
+        return merged
+    
+    async def _extract_chunk_with_gpt(self, text: str, on_claim: Optional[Callable[[dict], None]] = None) -> List[dict]:
         """
-        Extract claims using GPT with streaming response.
+        Extract claims from one chunk using GPT with streaming response.
+        
+        The output budget is sized to the chunk. Claims are parsed as their
+        JSON objects close; if the stream is cut off, the completed claims
+        are kept. If GPT yields no claim, the chunk's claims come from basic
+        methods instead.
         
         Args:
             text (str): Text to extract claims from
+            on_claim (Optional[Callable[[dict], None]]): Called with each claim as soon as it has been streamed
             
         Returns:
             List[dict]: List of dictionaries containing claims and their uncommonness scores
         """
         settings = get_settings()
+        max_tokens = min(
+            settings.CLAIM_EXTRACTION_MAX_OUTPUT_TOKENS,
+            max(settings.CLAIM_EXTRACTION_MIN_OUTPUT_TOKENS,
+                int(estimate_tokens(text) * settings.CLAIM_EXTRACTION_OUTPUT_RATIO))
+        )
         prompt = f"""请分析以下文本并提取可以验证的关键事实声明。
         对于每个声明，请专注于具体的、可验证的陈述，而不是观点或一般性陈述。
         如果有代词请根据上下文进行替换，比如这类儿童需要替代为具体的人群。
@@ -84,114 +178,112 @@ class ClaimExtractor:
 
         请只返回JSON数组，不要包含其他文本。"""
 
+        messages = [
+            {
+                "role": "system",
+                "content": "你是一个事实核查助手。请从给定文本中提取可验证的事实声明，并评估每个声明的不常见程度。"
+            },
+            {"role": "user", "content": prompt}
+        ]
+        
+        claims: List[dict] = []
         try:
-            # 使用流式响应
-            response = await self.openai_client.chat.completions.create(
-                model=settings.OPENAI_MODEL_NAME,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "你是一个事实核查助手。请从给定文本中提取可验证的事实声明，并评估每个声明的不常见程度。"
-                    },
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3,
-                max_tokens=500,
-                stream=True  # 启用流式响应
-            )
-            
-            # 收集完整的响应内容
-            full_content = ""
-            is_complete = False
+            finish_reason = None
             max_retries = 3
-            retry_count = 0
-            
-            while not is_complete and retry_count < max_retries:
+            for attempt in range(max_retries):
+                # 使用流式响应，每个声明对象一闭合就解析出来
+                parser = JsonArrayStreamParser()
+                claims = []
                 try:
+                    response = await self.openai_client.chat.completions.create(
+                        model=settings.OPENAI_MODEL_NAME,
+                        messages=messages,
+                        temperature=0.3,
+                        max_tokens=max_tokens,
+                        stream=True  # 启用流式响应
+                    )
                     async for chunk in response:
-                        if chunk.choices[0].delta.content is not None:
-                            full_content += chunk.choices[0].delta.content
-                            logger.debug(f"Received chunk: {chunk.choices[0].delta.content}")
+                        if not chunk.choices:
+                            continue
+                        choice = chunk.choices[0]
+                        if choice.delta.content is not None:
+                            for element in parser.feed(choice.delta.content):
+                                claim = self._validate_claim(element)
+                                if claim is not None:
+                                    claims.append(claim)
+                                    if on_claim is not None:
+                                        on_claim(claim)
                         
                         # 检查是否是最后一个chunk
-                        if chunk.choices[0].finish_reason is not None:
-                            is_complete = True
-                            logger.debug("Stream completed successfully")
+                        if choice.finish_reason is not None:
+                            finish_reason = choice.finish_reason
                             break
-                            
+                    break
                 except asyncio.CancelledError:
                     logger.warning("Stream processing was cancelled")
                     raise
                 except Exception as e:
                     logger.error(f"Error during stream processing: {str(e)}")
-                    if retry_count < max_retries - 1:
-                        retry_count += 1
-                        logger.info(f"Retrying stream processing (attempt {retry_count + 1}/{max_retries})")
-                        # 重新创建流式响应
-                        response = await self.openai_client.chat.completions.create(
-                            model=settings.OPENAI_MODEL_NAME,
-                            messages=[
-                                {
-                                    "role": "system",
-                                    "content": "你是一个事实核查助手。请从给定文本中提取可验证的事实声明，并评估每个声明的不常见程度。"
-                                },
-                                {"role": "user", "content": prompt}
-                            ],
-                            temperature=0.3,
-                            max_tokens=500,
-                            stream=True
-                        )
-                        continue
-                    raise
+                    if claims or attempt == max_retries - 1:
+                        # 保留已经完整解析出的声明
+                        break
+                    logger.info(f"Retrying stream processing (attempt {attempt + 2}/{max_retries})")
             
-            if not is_complete:
-                logger.warning(f"Stream did not complete after {max_retries} attempts")
-                raise Exception("Failed to get complete response after maximum retries")
-                
-            logger.debug(f"GPT response content: {full_content}")
-            
-            try:
-                # 处理 markdown 代码块格式
-                if full_content.startswith('```'):
-                    # 移除开头的 ```json 和结尾的 ```
-                    full_content = full_content.replace('```json\n', '').replace('\n```', '')
-                
-                results = json.loads(full_content)
-                if not isinstance(results, list):
-                    raise ValueError("Response is not a JSON array")
-                
-                # 验证每个结果的结构
-                for result in results:
-                    if not isinstance(result, dict) or 'claim' not in result or 'uncommonness' not in result:
-                        raise ValueError("Each result must be a dict with 'claim' and 'uncommonness' fields")
-                    if not isinstance(result['uncommonness'], (int, float)) or not 0 <= result['uncommonness'] <= 100:
-                        raise ValueError("Uncommonness must be a number between 0 and 100")
-                
-                claims = results
-            except json.JSONDecodeError as e:
-                logger.error(f"JSON parsing error: {str(e)}")
-                # 如果解析失败，返回空列表
-                claims = []
+            if finish_reason != "stop" or not parser.finished:
+                logger.warning(
+                    f"Claim extraction stream ended early (finish_reason={finish_reason}), "
+                    f"keeping {len(claims)} completed claims"
+                )
+            if parser.invalid_elements:
+                logger.warning(f"Skipped {parser.invalid_elements} malformed claim objects")
             
             # 验证结果
             if not claims:
                 logger.warning("No claims extracted from GPT response")
-                return self._extract_with_basic_methods(text)
+                return self._basic_claims(text)
             
             logger.info(f"Extracted {len(claims)} key claims using GPT")
             return claims
             
         except asyncio.CancelledError:
             logger.warning("GPT claim extraction was cancelled")
-            return self._extract_with_basic_methods(text)
+            raise
         except Exception as e:
             logger.error(f"Error in GPT claim extraction: {str(e)}")
-            return self._extract_with_basic_methods(text)
+            return claims or self._basic_claims(text)
+    
+    @staticmethod
+    def _validate_claim(element) -> Optional[dict]:
+        """
+        Check the structure of one parsed claim object.
+        
+        Args:
+            element: Parsed element of the claims array
+            
+        Returns:
+            Optional[dict]: The claim, or None if it lacks a claim text or a valid uncommonness
+        """
+        if not isinstance(element, dict) or not isinstance(element.get("claim"), str) or not element["claim"].strip():
+            logger.warning(f"Skipping claim object without a claim: {element}")
+            return None
+        uncommonness = element.get("uncommonness")
+        if isinstance(uncommonness, bool) or not isinstance(uncommonness, (int, float)) or not 0 <= uncommonness <= 100:
+            logger.warning(f"Skipping claim with an invalid uncommonness: {element}")
+            return None
+        return element
     
-    def _extract_with_basic_methods(self, text: str) -> List[str]:
+    def _basic_claims(self, text: str) -> List[dict]:
+        """Extract claims with basic methods, shaped like GPT results with a neutral uncommonness."""
+        return [{"claim": claim, "uncommonness": 50} for claim in self.extract_with_basic_methods(text)]
+    
+    def extract_with_basic_methods(self, text: str) -> List[str]:
         """
         Extract claims using basic text processing methods.
         
+        Splits the text into sentences and drops short sentences and
+        questions. Also used to build cheap claim candidates before the
+        LLM extraction has finished.
+        
         Args:
             text (str): Text to extract claims from
             
@@ -205,7 +297,7 @@ class ClaimExtractor:
             # 过滤掉太短的句子和疑问句
             claims = [
                 s for s in sentences
-                if len(jieba.lcut(s)) > 3 and not s.endswith('?')
+                if len(lcut(s)) > 3 and not s.endswith('?')
             ]
         else:
             sentences = re.split(r'[.!?]', text)
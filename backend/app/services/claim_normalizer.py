@@ -0,0 +1,76 @@
+"""
+Claim normalization.
+
+This module maps differently formatted copies of the same claim to a
+single canonical key so that identical claims are only verified once.
+Full-width and half-width forms, number formatting and punctuation are
+canonicalized; differently worded claims are left to the claim clusterer.
+"""
+
+import re
+import unicodedata
+
+_WHITESPACE_PATTERN = re.compile(r'\s+')
+_THOUSANDS_SEPARATOR_PATTERN = re.compile(r'(?<=\d),(?=\d{3}(?!\d))')
+_TRAILING_ZEROS_PATTERN = re.compile(r'(?<![\d.])(\d+\.\d*?)0+(?!\.?\d)')
+_BARE_DECIMAL_POINT_PATTERN = re.compile(r'(?<=\d)\.(?!\d)')
+_CHINESE_PERCENT_PATTERN = re.compile(r'百分之(\d+(?:\.\d+)?)')
+_INNER_DECIMAL_POINT_PATTERN = re.compile(r'(?<=\d)\.(?=\d)')
+_DECIMAL_POINT_PLACEHOLDER = '\0'
+# Spaces next to CJK characters separate nothing
+_CJK = '\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af'
+_CJK_SPACE_PATTERN = re.compile(f' (?=[{_CJK}])|(?<=[{_CJK}]) ')
+# English negative contractions, also with the apostrophe already replaced by a space
+_CONTRACTION_PATTERN = re.compile(r"\b([a-z]+?)n['’]t\b")
+_SPLIT_CONTRACTION_PATTERN = re.compile(
+    r"\b(ca|wo|do|does|did|is|are|was|were|has|have|had|could|would|should|must|need)n t\b"
+)
+_IRREGULAR_CONTRACTIONS = {"ca": "can", "wo": "will", "sha": "shall", "ai": "is"}
+
+
+def normalize_claim(claim: str) -> str:
+    """
+    Normalize a claim into its deduplication key.
+
+    Applies Unicode NFKC normalization (which also folds full-width forms
+    into half-width ones) and lower-cases the text. Numbers are written
+    without thousands separators or trailing decimal zeros, and "百分之N"
+    as "N%". Negative contractions are expanded ("can't" becomes "can
+    not"), so that their negation survives as a word of its own. Punctuation other than decimal points and percent signs is
+    removed, whitespace is collapsed, and spaces next to CJK characters
+    are dropped.
+
+    Args:
+        claim (str): Claim text
+
+    Returns:
+        str: Normalized claim key
+    """
+    text = unicodedata.normalize("NFKC", claim or "").lower()
+    text = _expand_contractions(text)
+
+    # Numbers
+    text = _THOUSANDS_SEPARATOR_PATTERN.sub("", text)
+    text = _CHINESE_PERCENT_PATTERN.sub(r"\1%", text)
+    text = _TRAILING_ZEROS_PATTERN.sub(r"\1", text)
+    text = _BARE_DECIMAL_POINT_PATTERN.sub("", text)
+    text = _INNER_DECIMAL_POINT_PATTERN.sub(_DECIMAL_POINT_PLACEHOLDER, text)
+
+    # Punctuation and whitespace
+    text = "".join(
+        " " if unicodedata.category(char).startswith("P") and char != "%" else char
+        for char in text
+    )
+    text = text.replace(_DECIMAL_POINT_PLACEHOLDER, ".")
+    text = _WHITESPACE_PATTERN.sub(" ", text).strip()
+    return _CJK_SPACE_PATTERN.sub("", text)
+
+
+def _expand_contractions(text: str) -> str:
+    """Write English negative contractions ("doesn't", "won't") as the verb followed by "not"."""
+    def expand(match: re.Match) -> str:
+        stem = match.group(1)
+        return f"{_IRREGULAR_CONTRACTIONS.get(stem, stem)} not"
+
+    text = _CONTRACTION_PATTERN.sub(expand, text)
+    return _SPLIT_CONTRACTION_PATTERN.sub(expand, text)
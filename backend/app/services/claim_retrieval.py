@@ -0,0 +1,160 @@
+"""
+Per-claim evidence retrieval.
+
+This module turns extracted claims into search queries, merges
+near-identical queries so that one search serves several claims, and runs
+the searches with bounded parallelism under a per-request search budget,
+giving every claim its own capped list of candidate sources.
+"""
+
+import asyncio
+import logging
+import re
+from typing import List, Optional, Set, Tuple
+from ..core.config import get_settings
+from ..models.schemas import Source
+from .evidence_retriever import EvidenceRetriever
+from .request_stats import record_stat
+from .token_cache import content_tokens
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE_PATTERN = re.compile(r'\s+')
+_EDGE_PUNCTUATION = '。！？!?.，,；;：:、"\'“”‘’「」『』()（）[]【】 '
+
+class ClaimRetrieval:
+    """Budgeted, bounded-concurrency retrieval of candidate sources for one request."""
+
+    def __init__(self, retriever: EvidenceRetriever, budget: Optional[int] = None):
+        """
+        Initialize the retrieval stage.
+
+        Args:
+            retriever (EvidenceRetriever): Retriever used to run the searches
+            budget (Optional[int]): Maximum number of searches for the request;
+                defaults to SEARCH_BUDGET_PER_REQUEST
+        """
+        settings = get_settings()
+        self.retriever = retriever
+        self.budget = settings.SEARCH_BUDGET_PER_REQUEST if budget is None else budget
+        self.max_sources_per_claim = max(1, settings.MAX_SOURCES_PER_CLAIM)
+        self.max_query_chars = max(1, settings.SEARCH_MAX_QUERY_CHARS)
+        self.merge_threshold = settings.SEARCH_QUERY_MERGE_THRESHOLD
+        self.searches = 0
+        self._semaphore = asyncio.Semaphore(max(1, settings.SEARCH_MAX_CONCURRENCY))
+
+    @property
+    def remaining_budget(self) -> int:
+        """Number of searches the request may still issue."""
+        return max(0, self.budget - self.searches)
+
+    async def search(self, query: str) -> List[Source]:
+        """
+        Run one search if the request still has budget for it.
+
+        Args:
+            query (str): The search query
+
+        Returns:
+            List[Source]: Candidate sources, or an empty list once the budget is spent
+        """
+        if not query.strip():
+            return []
+        async with self._semaphore:
+            if self.searches >= self.budget:
+                record_stat("searches_over_budget")
+                logger.warning(f"Search budget of {self.budget} exhausted, skipping query: '{query}'")
+                return []
+            self.searches += 1
+            record_stat("searches")
+            return await self.retriever.search(query)
+
+    async def retrieve(self, claims: List[str]) -> List[List[Source]]:
+        """
+        Get candidate sources for each claim.
+
+        Claims whose queries are near-identical share one search and the
+        same source list.
+
+        Args:
+            claims (List[str]): Claim texts
+
+        Returns:
+            List[List[Source]]: Capped candidate sources for each claim, in claim order
+        """
+        groups = self.merge_queries([self.build_query(claim) for claim in claims])
+        merged = len(claims) - len(groups)
+        if merged:
+            record_stat("search_queries_merged", merged)
+            logger.info(f"Merged {len(claims)} claim queries into {len(groups)} searches")
+
+        results = await asyncio.gather(*[self.search(query) for query, _ in groups], return_exceptions=True)
+
+        claim_sources: List[List[Source]] = [[] for _ in claims]
+        for (query, claim_indices), result in zip(groups, results):
+            if isinstance(result, BaseException):
+                logger.error(f"Error retrieving sources for query '{query}': {str(result)}")
+                result = []
+            sources = self.cap(result)
+            for claim_index in claim_indices:
+                claim_sources[claim_index] = sources
+        return claim_sources
+
+    def cap(self, sources: List[Source]) -> List[Source]:
+        """
+        Limit a claim's candidate sources to MAX_SOURCES_PER_CLAIM.
+
+        Args:
+            sources (List[Source]): Candidate sources in retrieval order
+
+        Returns:
+            List[Source]: The first MAX_SOURCES_PER_CLAIM sources
+        """
+        return list(sources[:self.max_sources_per_claim])
+
+    def build_query(self, claim: str) -> str:
+        """
+        Turn a claim into a search query.
+
+        Args:
+            claim (str): Claim text
+
+        Returns:
+            str: The claim with whitespace collapsed, surrounding punctuation
+                stripped and its length capped at a word boundary
+        """
+        query = _WHITESPACE_PATTERN.sub(" ", claim or "").strip(_EDGE_PUNCTUATION)
+        if len(query) <= self.max_query_chars:
+            return query
+        truncated = query[:self.max_query_chars]
+        boundary = truncated.rfind(" ")
+        return truncated[:boundary] if boundary > self.max_query_chars // 2 else truncated
+
+    def merge_queries(self, queries: List[str]) -> List[Tuple[str, List[int]]]:
+        """
+        Group near-identical queries.
+
+        A query joins the first earlier group whose representative has a
+        token Jaccard similarity of at least SEARCH_QUERY_MERGE_THRESHOLD.
+
+        Args:
+            queries (List[str]): One query per claim
+
+        Returns:
+            List[Tuple[str, List[int]]]: Representative query and the claim indices it serves
+        """
+        groups: List[Tuple[str, List[int]]] = []
+        group_tokens: List[Set[str]] = []
+        for claim_index, query in enumerate(queries):
+            tokens = set(content_tokens(query))
+            for (representative, claim_indices), representative_tokens in zip(groups, group_tokens):
+                if query.lower() == representative.lower() or (
+                    tokens and representative_tokens
+                    and len(tokens & representative_tokens) / len(tokens | representative_tokens) >= self.merge_threshold
+                ):
+                    claim_indices.append(claim_index)
+                    break
+            else:
+                groups.append((query, [claim_index]))
+                group_tokens.append(tokens)
+        return groups
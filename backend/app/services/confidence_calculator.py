@@ -11,6 +11,22 @@ from ..models.schemas import Source
 
 logger = logging.getLogger(__name__)
 
+# Contribution multipliers applied to supporting sources of these types
+SOURCE_TYPE_MULTIPLIERS: Dict[str, float] = {
+    "academic": 1.2,
+    "government": 1.1,
+}
+
+# Similarity above which a source counts as supporting a claim
+SUPPORT_THRESHOLD = 0.5
+
+# Confidence bonus per supporting source of these types, per claim
+SOURCE_TYPE_BONUS: Dict[str, float] = {
+    "academic": 0.1,
+    "government": 0.05,
+}
+MAX_SOURCE_TYPE_BONUS = 0.2
+
 class ConfidenceCalculator:
     """Calculates confidence scores for fact-checking results."""
     
@@ -47,9 +63,8 @@ class ConfidenceCalculator:
         source_diversity = min(unique_sources / num_claims, 1.0)
         
         # Calculate source type bonus
-        academic_count = sum(1 for s in verified_sources if s.source_type == "academic")
-        gov_count = sum(1 for s in verified_sources if s.source_type == "government")
-        source_type_bonus = min((academic_count * 0.1 + gov_count * 0.05) / num_claims, 0.2)
+        type_bonus = sum(SOURCE_TYPE_BONUS.get(s.source_type, 0.0) for s in verified_sources)
+        source_type_bonus = min(type_bonus / num_claims, MAX_SOURCE_TYPE_BONUS)
         
         # Combine all factors for final confidence
         confidence = min(1.0, avg_similarity * (1 + source_diversity * 0.2 + source_type_bonus))
@@ -6,22 +6,34 @@ This module provides integration with the DeepSeek API for text analysis and fac
 
 import os
 import logging
-from typing import Dict, Any, List, AsyncGenerator
+from typing import Dict, Any, List, AsyncGenerator, Optional
 from openai import AsyncOpenAI
+from ..core.config import get_settings
+from .llm_cache import cached_client
+from .single_flight import coalesced_client
+from .hedged_client import hedged_client
 
 logger = logging.getLogger(__name__)
 
 class DeepSeekService:
-    def __init__(self):
-        """Initialize the DeepSeek service with API key."""
+    def __init__(self, backup_client: Optional[AsyncOpenAI] = None):
+        """
+        Initialize the DeepSeek service with API key.
+        
+        Args:
+            backup_client (Optional[AsyncOpenAI]): OpenAI client that slow calls are hedged on
+        """
         self.api_key = os.getenv("DEEPSEEK_API_KEY")
         if not self.api_key:
             raise ValueError("DEEPSEEK_API_KEY environment variable is not set")
         
-        self.client = AsyncOpenAI(
+        self.api_client = AsyncOpenAI(
             api_key=self.api_key,
             base_url="https://api.deepseek.com"
         )
+        self.client = cached_client(coalesced_client(hedged_client(
+            self.api_client, "deepseek", backup_client, "openai", get_settings().OPENAI_MODEL_NAME
+        )))
 
     async def analyze_text_stream(self, text: str, task: str = "fact_check") -> AsyncGenerator[str, None]:
         """
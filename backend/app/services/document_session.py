@@ -0,0 +1,161 @@
+"""
+Document sessions for incremental re-checking.
+
+This module keeps, per editing session, the claims extracted from each
+paragraph of the last submitted draft and the verdicts of those claims.
+When the draft is resubmitted, only new or modified paragraphs need to be
+extracted and verified again.
+"""
+
+import hashlib
+import logging
+import re
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+from ..core.config import get_settings
+from ..models.schemas import ClaimVerdict
+from .claim_normalizer import normalize_claim
+
+logger = logging.getLogger(__name__)
+
+_PARAGRAPH_SPLIT_PATTERN = re.compile(r'\n\s*\n|\r?\n')
+_WHITESPACE_PATTERN = re.compile(r'\s+')
+
+
+def split_paragraphs(text: str) -> List[str]:
+    """
+    Split a text into non-empty paragraphs.
+
+    Args:
+        text (str): Text to split
+
+    Returns:
+        List[str]: Stripped paragraphs in document order
+    """
+    return [paragraph.strip() for paragraph in _PARAGRAPH_SPLIT_PATTERN.split(text or "") if paragraph.strip()]
+
+
+def paragraph_hash(paragraph: str) -> str:
+    """
+    Hash a paragraph, ignoring differences in whitespace.
+
+    Args:
+        paragraph (str): Paragraph text
+
+    Returns:
+        str: SHA-256 hex digest of the whitespace-normalized paragraph
+    """
+    normalized = _WHITESPACE_PATTERN.sub(" ", paragraph).strip()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+class DocumentSession:
+    """Cached claims and verdicts of one document being edited."""
+
+    def __init__(self, session_id: str):
+        """
+        Initialize an empty session.
+
+        Args:
+            session_id (str): Client-chosen session id
+        """
+        self.session_id = session_id
+        self.updated_at = time.time()
+        self._paragraph_claims: Dict[Tuple[bool, str], List[dict]] = {}
+        self._verdicts: Dict[Tuple[bool, str, str], ClaimVerdict] = {}
+
+    def changed_paragraphs(self, paragraphs: List[str], use_deepseek: bool) -> List[str]:
+        """
+        Get the paragraphs whose claims are not cached yet.
+
+        Args:
+            paragraphs (List[str]): Paragraphs of the current draft
+            use_deepseek (bool): Which extractor the claims come from
+
+        Returns:
+            List[str]: New or modified paragraphs, in document order
+        """
+        return [
+            paragraph for paragraph in paragraphs
+            if (use_deepseek, paragraph_hash(paragraph)) not in self._paragraph_claims
+        ]
+
+    def get_paragraph_claims(self, paragraph: str, use_deepseek: bool) -> Optional[List[dict]]:
+        """Get the cached claims of a paragraph, if any."""
+        return self._paragraph_claims.get((use_deepseek, paragraph_hash(paragraph)))
+
+    def set_paragraph_claims(self, paragraph: str, use_deepseek: bool, claims: List[dict]) -> None:
+        """Cache the claims extracted from a paragraph."""
+        self._paragraph_claims[(use_deepseek, paragraph_hash(paragraph))] = claims
+        self.updated_at = time.time()
+
+    def retain_paragraphs(self, paragraphs: Iterable[str], use_deepseek: bool) -> None:
+        """Drop cached claims of paragraphs that are no longer in the draft."""
+        keep = {(use_deepseek, paragraph_hash(paragraph)) for paragraph in paragraphs}
+        for key in list(self._paragraph_claims):
+            if key[0] == use_deepseek and key not in keep:
+                del self._paragraph_claims[key]
+
+    def get_verdict(self, claim: str, sources_key: str, use_deepseek: bool) -> Optional[ClaimVerdict]:
+        """
+        Get the cached verdict of a claim.
+
+        Args:
+            claim (str): Claim text
+            sources_key (str): Fingerprint of the sources the claim was verified against
+            use_deepseek (bool): Which service verified the claim
+
+        Returns:
+            Optional[ClaimVerdict]: The cached verdict, or None
+        """
+        return self._verdicts.get((use_deepseek, sources_key, normalize_claim(claim)))
+
+    def set_verdict(self, verdict: ClaimVerdict, sources_key: str, use_deepseek: bool) -> None:
+        """Cache the verdict of a claim."""
+        self._verdicts[(use_deepseek, sources_key, normalize_claim(verdict.claim))] = verdict
+        self.updated_at = time.time()
+
+    def retain_verdicts(self, claims: Iterable[str], use_deepseek: bool) -> None:
+        """Drop cached verdicts of claims that are no longer in the draft."""
+        keep = {normalize_claim(claim) for claim in claims}
+        for key in list(self._verdicts):
+            if key[0] == use_deepseek and key[2] not in keep:
+                del self._verdicts[key]
+
+
+class DocumentSessionStore:
+    """In-memory store of document sessions with TTL and LRU eviction."""
+
+    def __init__(self):
+        """Initialize the store from the application settings."""
+        settings = get_settings()
+        self.ttl_seconds = settings.DOCUMENT_SESSION_TTL_SECONDS
+        self.max_sessions = max(1, settings.DOCUMENT_SESSION_MAX_SESSIONS)
+        self._sessions: "OrderedDict[str, DocumentSession]" = OrderedDict()
+
+    def get(self, session_id: str) -> DocumentSession:
+        """
+        Get a session, creating it if it does not exist or has expired.
+
+        Args:
+            session_id (str): Client-chosen session id
+
+        Returns:
+            DocumentSession: The session
+        """
+        now = time.time()
+        for expired_id in [sid for sid, s in self._sessions.items() if now - s.updated_at > self.ttl_seconds]:
+            del self._sessions[expired_id]
+
+        session = self._sessions.get(session_id)
+        if session is None:
+            session = DocumentSession(session_id)
+            self._sessions[session_id] = session
+            logger.info(f"Created document session {session_id}")
+        self._sessions.move_to_end(session_id)
+        session.updated_at = now
+
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+        return session
@@ -0,0 +1,129 @@
+"""
+Early-exit policy for per-claim source evaluation.
+
+A claim's score is the maximum similarity over its sources, so once a
+claim has a source scoring 1.0, further sources cannot move its score.
+The document confidence, however, also rewards the number of distinct
+supporting sources and academic/government supporters, up to a cap. This
+module orders sources by their expected value and decides when a claim is
+settled, i.e. when its remaining sources can change neither its score nor
+the document confidence, so that their similarity calls can be skipped.
+Skipping them only leaves the remaining supporters out of the response's
+source list.
+"""
+
+import logging
+from typing import List, Optional, Set
+from ..core.config import get_settings
+from ..models.schemas import Source
+from .confidence_calculator import MAX_SOURCE_TYPE_BONUS, SOURCE_TYPE_BONUS, SOURCE_TYPE_MULTIPLIERS
+from .token_cache import get_token_cache
+
+logger = logging.getLogger(__name__)
+
+class SupportTally:
+    """Supporting sources found so far for the claims of one document."""
+
+    def __init__(self, num_claims: int):
+        """
+        Initialize an empty tally.
+
+        Args:
+            num_claims (int): Number of claims of the document, as counted by the confidence calculator
+        """
+        self.num_claims = max(1, num_claims)
+        self.titles: Set[str] = set()
+        self.type_bonus = 0.0
+
+    def add(self, source: Source) -> None:
+        """Count a source that newly supports one of the document's claims."""
+        self.titles.add(source.title)
+        self.type_bonus += SOURCE_TYPE_BONUS.get(source.source_type, 0.0)
+
+    def caps_reached(self) -> bool:
+        """
+        Check whether the source diversity and source type bonuses are already at their caps.
+
+        Supporters are never removed, so once reached the caps stay reached.
+
+        Returns:
+            bool: True if no additional supporter can raise the document confidence
+        """
+        return (
+            len(self.titles) >= self.num_claims
+            and self.type_bonus >= MAX_SOURCE_TYPE_BONUS * self.num_claims
+        )
+
+
+class EarlyExitPolicy:
+    """Orders candidate sources and decides when a claim needs no more evaluation."""
+
+    def __init__(self):
+        """Initialize the policy from the application settings."""
+        settings = get_settings()
+        self.enabled = settings.EARLY_EXIT_ENABLED
+        self.wave_size = max(1, settings.EARLY_EXIT_WAVE_SIZE)
+
+    def order_sources(self, claims: List[str], sources: List[Source]) -> List[int]:
+        """
+        Order sources by the expected value of scoring them.
+
+        The expected value is the source-type prior (the same multipliers
+        used for contributions) scaled by how many claim tokens the snippet
+        contains.
+
+        Args:
+            claims (List[str]): Claims that will be scored against the sources
+            sources (List[Source]): Candidate sources
+
+        Returns:
+            List[int]: Source indices, most promising first
+        """
+        if not claims or not sources:
+            return list(range(len(sources)))
+        coverage = get_token_cache().coverage_matrix(claims, [source.snippet for source in sources]).max(axis=0)
+
+        def expected_value(index: int) -> float:
+            prior = SOURCE_TYPE_MULTIPLIERS.get(sources[index].source_type, 1.0)
+            return prior * (0.5 + float(coverage[index]))
+
+        return sorted(range(len(sources)), key=expected_value, reverse=True)
+
+    def is_settled(
+        self,
+        best_similarity: float,
+        supporters: List[Source],
+        remaining: List[Source],
+        tally: Optional[SupportTally] = None
+    ) -> bool:
+        """
+        Check whether a claim's remaining sources can be skipped.
+
+        A claim is settled once its best similarity is 1.0, the highest
+        score a source can get, and additional supporters cannot raise the
+        document confidence: either the document's diversity and type
+        bonuses are already capped, or no remaining source could become a
+        new distinct or academic/government supporter.
+
+        Args:
+            best_similarity (float): Highest supporting similarity found so far
+            supporters (List[Source]): Sources found to support the claim so far
+            remaining (List[Source]): Sources of the claim not evaluated yet
+            tally (Optional[SupportTally]): Supporters of the claim's document; None
+                when the claim's verdict feeds several documents
+
+        Returns:
+            bool: True if the remaining sources need not be evaluated
+        """
+        if not self.enabled or best_similarity < 1.0:
+            return False
+        if tally is not None and tally.caps_reached():
+            return True
+        titles = {source.title for source in supporters}
+        if tally is not None:
+            titles |= tally.titles
+        return all(
+            source.title in titles and source.source_type not in SOURCE_TYPE_BONUS
+            for source in remaining
+        )
+
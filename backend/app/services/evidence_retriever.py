@@ -0,0 +1,186 @@
+"""
+Evidence retriever for fact-checking.
+
+This module provides a single entry point for looking up candidate sources
+for a query across the local evidence index and the web and academic
+search services. Each network provider's results go through the shared
+search cache when it is enabled, identical in-flight provider searches are
+coalesced, and network search is skipped entirely when the local index
+already covers the query well.
+"""
+
+import asyncio
+import functools
+import logging
+from typing import Awaitable, Callable, List, Optional
+from ..core.config import get_settings
+from ..models.schemas import Source
+from .local_index import LocalEvidenceIndex
+from .request_stats import record_stat
+from .search_cache import SearchCache, get_search_cache
+from .single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+class EvidenceRetriever:
+    """Retrieves candidate sources for claims from the configured search services."""
+
+    def __init__(
+        self,
+        search_service=None,
+        academic_search_service=None,
+        cache: Optional[SearchCache] = None,
+        local_index: Optional[LocalEvidenceIndex] = None
+    ):
+        """
+        Initialize the evidence retriever.
+
+        Args:
+            search_service (Optional[SearchService]): Web, Wikipedia and news search service
+            academic_search_service (Optional[AcademicSearchService]): Academic search service
+            cache (Optional[SearchCache]): Cache of provider results; None disables caching
+            local_index (Optional[LocalEvidenceIndex]): Offline BM25 evidence index
+        """
+        settings = get_settings()
+        self.search_service = search_service
+        self.academic_search_service = academic_search_service
+        self.cache = cache
+        self.local_index = local_index
+        self.local_max_results = max(1, settings.LOCAL_INDEX_MAX_RESULTS)
+        self.skip_network_min_results = settings.LOCAL_INDEX_SKIP_NETWORK_MIN_RESULTS
+        self.skip_network_coverage = settings.LOCAL_INDEX_SKIP_NETWORK_COVERAGE
+        self.skip_network_min_score = settings.LOCAL_INDEX_SKIP_NETWORK_MIN_SCORE
+        self._flights = SingleFlight("searches") if settings.SINGLE_FLIGHT_ENABLED else None
+
+    @property
+    def available(self) -> bool:
+        """Whether at least one search service or the local index is configured."""
+        return (
+            self.search_service is not None
+            or self.academic_search_service is not None
+            or self.local_index is not None
+        )
+
+    async def search(self, query: str) -> List[Source]:
+        """
+        Search all configured services for a query.
+
+        The local index is searched first. If enough of its results contain
+        most of the query's content terms (LOCAL_INDEX_SKIP_NETWORK_COVERAGE)
+        and score at least LOCAL_INDEX_SKIP_NETWORK_MIN_SCORE, the network
+        providers are skipped; otherwise they are queried concurrently and
+        their results are merged as they arrive.
+
+        Args:
+            query (str): The search query
+
+        Returns:
+            List[Source]: Candidate sources, deduplicated by link
+        """
+        sources = []
+        seen_links = set()
+
+        if self.local_index is not None:
+            local_results = await asyncio.to_thread(self.local_index.search, query, self.local_max_results)
+            for source, _, _ in local_results:
+                if str(source.link) not in seen_links:
+                    seen_links.add(str(source.link))
+                    sources.append(source)
+            record_stat("local_index_results", len(local_results))
+            covered = sum(
+                coverage >= self.skip_network_coverage and score >= self.skip_network_min_score
+                for _, score, coverage in local_results
+            )
+            if self.skip_network_min_results > 0 and covered >= self.skip_network_min_results:
+                record_stat("network_searches_skipped")
+                logger.info(f"Local index covers query, skipping network search: '{query}'")
+                return sources
+
+        providers = {}
+        if self.search_service is not None:
+            providers.update(self.search_service.providers())
+        if self.academic_search_service is not None:
+            providers.update(self.academic_search_service.providers())
+
+        for next_result in asyncio.as_completed(
+            [self._search_provider(name, search, query) for name, search in providers.items()]
+        ):
+            try:
+                result = await next_result
+            except Exception as e:
+                logger.error(f"Error retrieving evidence for '{query}': {str(e)}")
+                continue
+            for source in result:
+                link = str(source.link)
+                if link in seen_links:
+                    continue
+                seen_links.add(link)
+                sources.append(source)
+
+        logger.info(f"Retrieved {len(sources)} candidate sources for query: '{query}'")
+        return sources
+
+    async def close(self) -> None:
+        """Close the HTTP clients of the search services and the local index."""
+        for service in (self.search_service, self.academic_search_service):
+            if service is not None and hasattr(service, "close"):
+                await service.close()
+        if self.local_index is not None:
+            self.local_index.close()
+
+    async def _search_provider(
+        self,
+        name: str,
+        search: Callable[[str], Awaitable[List[Source]]],
+        query: str
+    ) -> List[Source]:
+        """Search a single provider, going through the cache if one is configured."""
+        loader = search if self._flights is None else functools.partial(self._coalesced_search, name, search)
+        if self.cache is None:
+            return await loader(query)
+        return await self.cache.fetch(name, query, loader)
+
+    async def _coalesced_search(
+        self,
+        name: str,
+        search: Callable[[str], Awaitable[List[Source]]],
+        query: str
+    ) -> List[Source]:
+        """Search a single provider, sharing the search with concurrent identical requests."""
+        key = (name, " ".join(query.split()).lower())
+        return list(await self._flights.do(key, lambda: search(query)))
+
+
+def create_evidence_retriever() -> Optional[EvidenceRetriever]:
+    """
+    Build an evidence retriever from whichever search services can be initialized.
+
+    Returns:
+        Optional[EvidenceRetriever]: The retriever, or None if no search service is available
+    """
+    search_service = None
+    academic_search_service = None
+    local_index = None
+
+    settings = get_settings()
+    index_path = settings.LOCAL_INDEX_PATH
+    if index_path:
+        try:
+            local_index = LocalEvidenceIndex(index_path, settings.LOCAL_INDEX_MAX_POSTINGS_PER_TERM)
+        except Exception as e:
+            logger.warning(f"Local evidence index at {index_path} unavailable: {str(e)}")
+
+    try:
+        from .search_service import SearchService
+        search_service = SearchService()
+    except Exception as e:
+        logger.warning(f"SearchService unavailable, web search disabled: {str(e)}")
+
+    try:
+        from .academic_search_service import AcademicSearchService
+        academic_search_service = AcademicSearchService()
+    except Exception as e:
+        logger.warning(f"AcademicSearchService unavailable, academic search disabled: {str(e)}")
+
+    retriever = EvidenceRetriever(search_service, academic_search_service, get_search_cache(), local_index)
+    return retriever if retriever.available else None
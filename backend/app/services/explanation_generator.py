@@ -2,12 +2,15 @@
 Explanation generator for fact-checking results.
 
 This module provides functionality to generate human-readable explanations
-of fact-checking results using GPT or fallback to basic explanations.
+of fact-checking results, either from a deterministic template over the
+per-claim similarity rationales or using GPT, with basic explanations as
+the fallback.
 """
 
 import logging
-from typing import Dict
+from typing import Dict, List
 from openai import AsyncOpenAI
+from ..models.schemas import ClaimVerdict
 
 logger = logging.getLogger(__name__)
 
@@ -80,6 +83,68 @@ class ExplanationGenerator:
         
         return response.choices[0].message.content.strip()
     
+    def build_template_explanation(self, confidence: float, num_sources: int, verdicts: List[ClaimVerdict]) -> str:
+        """
+        Build an explanation from the per-claim rationales without calling GPT.
+        
+        Args:
+            confidence (float): Overall confidence score
+            num_sources (int): Number of supporting sources
+            verdicts (List[ClaimVerdict]): Verdict of each claim
+            
+        Returns:
+            str: Explanation in Chinese, one line per claim after the overall assessment
+        """
+        lines = [self._generate_basic_explanation(confidence, num_sources)]
+        for verdict in verdicts:
+            if verdict.is_supported:
+                line = f"- 声明“{verdict.claim}”得到{len(verdict.sources)}个来源支持（最高相似度{verdict.score:.2f}）"
+            else:
+                line = f"- 声明“{verdict.claim}”未找到支持来源"
+            if verdict.rationale:
+                line += f"：{verdict.rationale.strip()}"
+            lines.append(line + ("" if line.endswith("。") else "。"))
+        return "\n".join(lines)
+    
+    async def polish_explanation(self, template: str, confidence: float, num_sources: int) -> str:
+        """
+        Rewrite a template explanation into fluent prose using GPT.
+        
+        Args:
+            template (str): Explanation from build_template_explanation
+            confidence (float): Overall confidence score
+            num_sources (int): Number of supporting sources
+            
+        Returns:
+            str: GPT-polished explanation in Chinese
+        """
+        prompt = f"""请将以下事实核查结果说明改写为一段清晰简洁、自然易懂的中文说明。
+        请保留整体可靠性评估、置信度、支持来源数量以及各声明的核查依据，不要添加原文没有的信息。
+        
+        结果：
+        - 置信度：{confidence:.2f}
+        - 支持来源：{num_sources}
+        
+        原始说明：
+        {template}
+        
+        请只返回说明文本，不要包含其他格式。"""
+
+        response = await self.openai_client.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[
+                {
+                    "role": "system",
+                    "content": "你是一个事实核查助手。请用清晰简洁的中文生成事实核查结果说明。"
+                },
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.3,
+            max_tokens=500
+        )
+        
+        return response.choices[0].message.content.strip()
+    
     def _generate_basic_explanation(self, confidence: float, num_sources: int) -> str:
         """
         Generate basic explanation as fallback.
@@ -0,0 +1,91 @@
+"""
+Deferred explanations.
+
+Fact-check responses carry a template explanation built from the per-claim
+rationales. This module keeps what is needed to polish that explanation
+with an LLM, keyed by the response's result id, so that clients can fetch
+the polished version later instead of every request waiting for it.
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from typing import Optional
+from ..core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class DeferredExplanation:
+    """Inputs and, once generated, the polished explanation of one result."""
+
+    def __init__(self, text: str, template: str, confidence: float, num_sources: int, use_deepseek: bool):
+        """
+        Initialize a deferred explanation.
+
+        Args:
+            text (str): The analyzed text
+            template (str): Template explanation returned with the result
+            confidence (float): Overall confidence score
+            num_sources (int): Number of supporting sources
+            use_deepseek (bool): Whether to polish with DeepSeek instead of OpenAI
+        """
+        self.text = text
+        self.template = template
+        self.confidence = confidence
+        self.num_sources = num_sources
+        self.use_deepseek = use_deepseek
+        self.created_at = time.time()
+        self.task: Optional[asyncio.Task] = None  # Shared by concurrent requests for the polish
+
+
+class DeferredExplanationStore:
+    """In-memory store of deferred explanations, evicting the oldest entries first."""
+
+    def __init__(self):
+        """Initialize the store from the application settings."""
+        settings = get_settings()
+        self.ttl_seconds = settings.EXPLANATION_STORE_TTL_SECONDS
+        self.max_entries = max(1, settings.EXPLANATION_STORE_MAX_ENTRIES)
+        self._entries: "OrderedDict[str, DeferredExplanation]" = OrderedDict()
+
+    def add(self, explanation: DeferredExplanation) -> str:
+        """
+        Store a deferred explanation.
+
+        Args:
+            explanation (DeferredExplanation): Explanation inputs
+
+        Returns:
+            str: Result id under which the explanation can be fetched
+        """
+        self._purge_expired()
+        result_id = uuid.uuid4().hex
+        self._entries[result_id] = explanation
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return result_id
+
+    def get(self, result_id: str) -> Optional[DeferredExplanation]:
+        """
+        Look up a deferred explanation.
+
+        Args:
+            result_id (str): Result id returned with the fact-check response
+
+        Returns:
+            Optional[DeferredExplanation]: The explanation, or None if unknown or expired
+        """
+        self._purge_expired()
+        return self._entries.get(result_id)
+
+    def _purge_expired(self) -> None:
+        """Drop entries older than the TTL; entries are kept in creation order."""
+        now = time.time()
+        while self._entries:
+            result_id, explanation = next(iter(self._entries.items()))
+            if now - explanation.created_at <= self.ttl_seconds:
+                break
+            del self._entries[result_id]
@@ -0,0 +1,316 @@
+"""
+Hedged LLM requests.
+
+This module cuts the latency tail of chat completions by hedging: when a
+call has not answered within a percentile of the latencies recently seen
+for the same provider, model and mode, a duplicate request is sent to the
+other OpenAI-compatible provider (or, with LLM_HEDGE_TARGET=same, again to
+the same one). The first successful answer wins and the other call is
+cancelled. For streamed completions the answer is the first chunk.
+
+Hedges are paid for out of a process-wide token bucket that every request
+refills by LLM_HEDGE_BUDGET_RATIO, so at most that share of requests is
+duplicated in the long run.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from functools import lru_cache
+from types import SimpleNamespace
+from typing import Any, Dict, Optional, Tuple
+from ..core.config import get_settings
+from .request_stats import record_stat
+
+logger = logging.getLogger(__name__)
+
+
+def parse_model_map(spec: str) -> Dict[str, str]:
+    """
+    Parse the model used for a hedge of each primary model.
+
+    Args:
+        spec (str): Comma-separated ``primary=hedge`` pairs, e.g. ``gpt-4o-mini=deepseek-chat``
+
+    Returns:
+        Dict[str, str]: Hedge model per primary model
+    """
+    models = {}
+    for item in (spec or "").split(","):
+        primary, _, hedge = item.partition("=")
+        if not primary.strip() or not hedge.strip():
+            continue
+        models[primary.strip()] = hedge.strip()
+    return models
+
+
+class LatencyTracker:
+    """Rolling window of recent call latencies."""
+
+    def __init__(self, window: int):
+        """
+        Initialize the tracker.
+
+        Args:
+            window (int): Number of most recent latencies kept
+        """
+        self._samples: deque = deque(maxlen=max(1, window))
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, seconds: float) -> None:
+        """Add the latency of a call."""
+        self._samples.append(seconds)
+
+    def percentile(self, percentile: float) -> Optional[float]:
+        """
+        Get a percentile of the recent latencies.
+
+        Args:
+            percentile (float): Percentile between 0 and 100
+
+        Returns:
+            Optional[float]: The latency in seconds, or None without samples
+        """
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        rank = min(len(ordered) - 1, max(0, int(round(percentile / 100 * (len(ordered) - 1)))))
+        return ordered[rank]
+
+
+class HedgeBudget:
+    """Token bucket bounding the share of requests that may be hedged."""
+
+    def __init__(self, ratio: float, burst: float):
+        """
+        Initialize a full budget.
+
+        Args:
+            ratio (float): Tokens added per request; one hedge costs one token
+            burst (float): Maximum number of saved-up tokens
+        """
+        self.ratio = max(0.0, ratio)
+        self.burst = max(0.0, burst)
+        self._tokens = self.burst
+
+    def deposit(self) -> None:
+        """Credit the budget for one request."""
+        self._tokens = min(self.burst, self._tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        """
+        Pay for one hedge.
+
+        Returns:
+            bool: Whether the budget allowed the hedge
+        """
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+
+_trackers: Dict[Tuple[str, Optional[str], bool], LatencyTracker] = {}
+
+
+def get_latency_tracker(provider: str, model: Optional[str], stream: bool) -> LatencyTracker:
+    """Get the process-wide latency tracker of a provider, model and mode."""
+    key = (provider, model, stream)
+    if key not in _trackers:
+        _trackers[key] = LatencyTracker(get_settings().LLM_HEDGE_WINDOW)
+    return _trackers[key]
+
+
+@lru_cache()
+def get_hedge_budget() -> HedgeBudget:
+    """Get the process-wide hedge budget."""
+    settings = get_settings()
+    return HedgeBudget(settings.LLM_HEDGE_BUDGET_RATIO, settings.LLM_HEDGE_BUDGET_BURST)
+
+
+class _PrefetchedStream:
+    """Streamed completion whose first chunk has already been read."""
+
+    def __init__(self, stream, iterator, first_chunk):
+        self._stream = stream
+        self._iterator = iterator
+        self._first_chunk = first_chunk
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        if self._first_chunk is None:
+            return
+        yield self._first_chunk
+        async for chunk in self._iterator:
+            yield chunk
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+class HedgedChatClient:
+    """AsyncOpenAI-compatible client that hedges slow chat completions on a backup client."""
+
+    def __init__(self, client, name: str, backup, backup_name: str, backup_model: Optional[str] = None):
+        """
+        Initialize the hedged client.
+
+        Args:
+            client (AsyncOpenAI): Client every request is sent to first
+            name (str): Provider name of the client, used to track its latencies
+            backup (AsyncOpenAI): Client hedges are sent to; may be the client itself
+            backup_name (str): Provider name of the backup client
+            backup_model (Optional[str]): Model for hedges whose model is not in
+                LLM_HEDGE_MODEL_MAP; None keeps the request's model
+        """
+        settings = get_settings()
+        self._client = client
+        self.name = name
+        self.backup = backup
+        self.backup_name = backup_name
+        self.backup_model = backup_model
+        self.model_map = parse_model_map(settings.LLM_HEDGE_MODEL_MAP)
+        self.percentile = settings.LLM_HEDGE_PERCENTILE
+        self.min_samples = max(1, settings.LLM_HEDGE_MIN_SAMPLES)
+        self.initial_delay = settings.LLM_HEDGE_INITIAL_DELAY_SECONDS
+        self.min_delay = settings.LLM_HEDGE_MIN_DELAY_SECONDS
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    async def _create(self, **params):
+        """Run chat.completions.create, hedging it if it is slower than usual."""
+        stream = bool(params.get("stream"))
+        budget = get_hedge_budget()
+        budget.deposit()
+
+        primary = asyncio.ensure_future(self._timed_call(self._client, self.name, params))
+        calls = [primary]
+        winner = None
+        try:
+            delay = self.hedge_delay(get_latency_tracker(self.name, params.get("model"), stream))
+            done, _ = await asyncio.wait(calls, timeout=delay)
+            if done or not budget.withdraw():
+                winner = primary
+                return await primary
+
+            hedge_params = {**params, "model": self._hedge_model(params.get("model"))}
+            logger.info(
+                f"{self.name} call to {params.get('model')} has not answered in {delay:.1f}s, "
+                f"hedging on {self.backup_name} ({hedge_params['model']})"
+            )
+            record_stat("llm_hedges")
+            calls.append(asyncio.ensure_future(self._timed_call(self.backup, self.backup_name, hedge_params)))
+            winner = await self._first_success(calls)
+            if winner is not primary:
+                record_stat("llm_hedge_wins")
+            return winner.result()
+        finally:
+            for call in calls:
+                if not call.done():
+                    call.cancel()
+                elif call is not winner and not call.cancelled() and call.exception() is None:
+                    # A finished loser (or every finished call, if the caller was
+                    # cancelled) may hold an open streamed response
+                    await self._close(call.result())
+
+    def hedge_delay(self, tracker: LatencyTracker) -> float:
+        """
+        Get how long to wait for a call before hedging it.
+
+        Args:
+            tracker (LatencyTracker): Recent latencies of the call's provider, model and mode
+
+        Returns:
+            float: LLM_HEDGE_PERCENTILE of the recent latencies, or
+                LLM_HEDGE_INITIAL_DELAY_SECONDS until enough have been seen,
+                but at least LLM_HEDGE_MIN_DELAY_SECONDS
+        """
+        delay = tracker.percentile(self.percentile) if len(tracker) >= self.min_samples else None
+        return max(self.min_delay, self.initial_delay if delay is None else delay)
+
+    def _hedge_model(self, model: Optional[str]) -> Optional[str]:
+        """Map the model of a request onto the model its hedge uses."""
+        if model in self.model_map:
+            return self.model_map[model]
+        return self.backup_model or model
+
+    @staticmethod
+    async def _first_success(calls):
+        """Wait for the first call that succeeds, or for the last one to fail."""
+        pending = set(calls)
+        while True:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for call in done:
+                if call.exception() is None:
+                    return call
+                logger.warning(f"Hedged LLM call failed: {str(call.exception())}")
+            if not pending:
+                return next(iter(done))
+
+    @staticmethod
+    async def _close(response) -> None:
+        """Close a streamed response that is no longer needed."""
+        close = getattr(response, "close", None)
+        if close is None:
+            return
+        try:
+            await close()
+        except Exception as e:
+            logger.debug(f"Failed to close discarded LLM response: {str(e)}")
+    
+    @staticmethod
+    async def _timed_call(client, name: str, params: Dict[str, Any]):
+        """Run one call, recording its latency to the response or, when streaming, to the first chunk."""
+        stream = bool(params.get("stream"))
+        tracker = get_latency_tracker(name, params.get("model"), stream)
+        started = time.perf_counter()
+        response = None
+        try:
+            response = await client.chat.completions.create(**params)
+            if stream:
+                iterator = response.__aiter__()
+                try:
+                    first_chunk = await iterator.__anext__()
+                except StopAsyncIteration:
+                    first_chunk = None
+                response = _PrefetchedStream(response, iterator, first_chunk)
+            tracker.record(time.perf_counter() - started)
+            return response
+        except asyncio.CancelledError:
+            # A cancelled call took at least this long; leaving it out would
+            # bias the percentile towards the calls that were fast anyway
+            tracker.record(time.perf_counter() - started)
+            await HedgedChatClient._close(response)
+            raise
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+def hedged_client(client, name: str, backup=None, backup_name: str = "", backup_model: Optional[str] = None):
+    """
+    Wrap a client with hedged requests if hedging is enabled.
+
+    Args:
+        client (AsyncOpenAI): Client to wrap
+        name (str): Provider name of the client
+        backup (Optional[AsyncOpenAI]): Client of the other provider
+        backup_name (str): Provider name of the other client
+        backup_model (Optional[str]): Default model of the other provider
+
+    Returns:
+        The hedged client, or the original client when hedging is disabled or
+        there is no other provider to hedge on
+    """
+    settings = get_settings()
+    if not settings.LLM_HEDGE_ENABLED:
+        return client
+    if settings.LLM_HEDGE_TARGET == "same":
+        return HedgedChatClient(client, name, client, name)
+    if backup is None:
+        return client
+    return HedgedChatClient(client, name, backup, backup_name, backup_model)
@@ -0,0 +1,186 @@
+"""
+Asynchronous fact-check jobs.
+
+This module runs long fact-checks on an in-process asyncio worker pool so
+that clients can submit a job and poll for its status and partial results
+instead of holding an HTTP connection open for the whole analysis.
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from typing import Dict, List, Optional
+from ..core.config import get_settings
+from ..models.schemas import FactCheckJob, JobStatus
+from .analysis_service import AnalysisService
+from .llm_cache import llm_cache_bypass
+
+logger = logging.getLogger(__name__)
+
+_FINISHED_STATUSES = (JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.EXPIRED)
+
+class JobQueueFullError(Exception):
+    """Raised when a job is submitted while the job queue is full."""
+
+class JobManager:
+    """Queues fact-check jobs and runs them on a bounded pool of asyncio workers."""
+
+    def __init__(self, analysis_service: AnalysisService):
+        """
+        Initialize the job manager.
+
+        Args:
+            analysis_service (AnalysisService): Service used to run the fact-checks
+        """
+        settings = get_settings()
+        self.analysis_service = analysis_service
+        self.concurrency = max(1, settings.JOB_WORKER_CONCURRENCY)
+        self.job_ttl = settings.JOB_TTL_SECONDS
+        self.result_retention = settings.JOB_RESULT_RETENTION_SECONDS
+        self._queue_size = max(1, settings.JOB_QUEUE_SIZE)
+        self._queue: Optional[asyncio.Queue] = None
+        self._jobs: Dict[str, FactCheckJob] = {}
+        self._inputs: Dict[str, tuple] = {}
+        self._workers: List[asyncio.Task] = []
+
+    def submit(self, text: str, use_deepseek: bool = False, no_cache: bool = False) -> FactCheckJob:
+        """
+        Queue a fact-check job.
+
+        Must be called from a running event loop; the workers are started
+        on first use.
+
+        Args:
+            text (str): Text to fact-check
+            use_deepseek (bool): Whether to use DeepSeek API instead of OpenAI
+            no_cache (bool): Whether to bypass the LLM response cache
+
+        Returns:
+            FactCheckJob: The queued job
+
+        Raises:
+            JobQueueFullError: If the queue has no room for another job
+        """
+        self._purge_expired()
+        self._ensure_workers()
+
+        now = time.time()
+        job = FactCheckJob(job_id=uuid.uuid4().hex, status=JobStatus.QUEUED, created_at=now, updated_at=now)
+        try:
+            self._queue.put_nowait(job.job_id)
+        except asyncio.QueueFull:
+            raise JobQueueFullError(f"Job queue is full ({self._queue_size} jobs waiting)")
+
+        self._jobs[job.job_id] = job
+        self._inputs[job.job_id] = (text, use_deepseek, no_cache)
+        logger.info(f"Queued fact-check job {job.job_id} ({self._queue.qsize()} waiting)")
+        return job
+
+    def get(self, job_id: str) -> Optional[FactCheckJob]:
+        """
+        Look up a job by id.
+
+        Args:
+            job_id (str): Job id returned by submit
+
+        Returns:
+            Optional[FactCheckJob]: The job, or None if it is unknown or no longer retained
+        """
+        self._purge_expired()
+        return self._jobs.get(job_id)
+
+    async def shutdown(self) -> None:
+        """
+        Stop all workers and fail the jobs they will not finish.
+
+        Running jobs are cancelled, and they and the still queued jobs are
+        marked as failed, so that clients polling them stop waiting.
+        """
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+        for job_id, job in self._jobs.items():
+            if job.status not in _FINISHED_STATUSES:
+                self._inputs.pop(job_id, None)
+                self._finish(job, JobStatus.FAILED, error="Server shut down before the job finished")
+
+    def _ensure_workers(self) -> None:
+        """Create the queue and start the worker pool if not already running."""
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self._queue_size)
+        self._workers = [worker for worker in self._workers if not worker.done()]
+        while len(self._workers) < self.concurrency:
+            self._workers.append(asyncio.create_task(self._worker()))
+
+    async def _worker(self) -> None:
+        """Take jobs from the queue and run them one at a time."""
+        while True:
+            job_id = await self._queue.get()
+            try:
+                job = self._jobs.get(job_id)
+                if job is not None and job.status == JobStatus.QUEUED:
+                    await self._run(job)
+            except Exception as e:
+                logger.error(f"Unexpected error in job worker: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: FactCheckJob) -> None:
+        """
+        Run a job, recording partial results as the analysis progresses.
+
+        Args:
+            job (FactCheckJob): Job to run
+        """
+        text, use_deepseek, no_cache = self._inputs.pop(job.job_id, ("", False, False))
+        remaining = self.job_ttl - (time.time() - job.created_at)
+        if remaining <= 0:
+            self._finish(job, JobStatus.EXPIRED, error="Job expired before it could start")
+            return
+
+        self._update(job, status=JobStatus.RUNNING)
+        try:
+            with llm_cache_bypass(no_cache):
+                await asyncio.wait_for(self._consume(job, text, use_deepseek), timeout=remaining)
+        except asyncio.TimeoutError:
+            self._finish(job, JobStatus.EXPIRED, error=f"Job exceeded its time limit of {self.job_ttl:.0f}s")
+        except Exception as e:
+            logger.error(f"Fact-check job {job.job_id} failed: {str(e)}")
+            self._finish(job, JobStatus.FAILED, error=str(e))
+
+    async def _consume(self, job: FactCheckJob, text: str, use_deepseek: bool) -> None:
+        """Feed the events of a streamed analysis into a job."""
+        async for event, data in self.analysis_service.analyze_text_stream(text, [], use_deepseek=use_deepseek):
+            if event == "claims":
+                self._update(job, claims=data)
+            elif event == "claim":
+                self._update(job, claim_verdicts=job.claim_verdicts + [data])
+            elif event == "result":
+                job.result = data
+                self._finish(job, JobStatus.COMPLETED)
+
+    def _update(self, job: FactCheckJob, **fields) -> None:
+        """Set fields on a job and refresh its update time."""
+        for name, value in fields.items():
+            setattr(job, name, value)
+        job.updated_at = time.time()
+
+    def _finish(self, job: FactCheckJob, status: JobStatus, error: Optional[str] = None) -> None:
+        """Move a job to a final status."""
+        self._update(job, status=status, error=error)
+        logger.info(f"Fact-check job {job.job_id} finished with status {status.value}")
+
+    def _purge_expired(self) -> None:
+        """Drop finished jobs past their retention time and expire stale queued jobs."""
+        now = time.time()
+        for job_id, job in list(self._jobs.items()):
+            if job.status in _FINISHED_STATUSES:
+                if now - job.updated_at > self.result_retention:
+                    del self._jobs[job_id]
+                    self._inputs.pop(job_id, None)
+            elif job.status == JobStatus.QUEUED and now - job.created_at > self.job_ttl:
+                self._inputs.pop(job_id, None)
+                self._finish(job, JobStatus.EXPIRED, error="Job expired before it could start")
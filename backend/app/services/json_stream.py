@@ -0,0 +1,103 @@
+"""
+Incremental JSON array parsing.
+
+This module parses the elements of a top-level JSON array while the
+array is still being streamed, e.g. from a chat completion, so that
+each element can be used the moment it is complete. Anything before the
+opening bracket (such as a markdown code fence) is ignored, and when the
+stream is cut off, every element that was completed is kept.
+"""
+
+import json
+import logging
+from typing import Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+class JsonArrayStreamParser:
+    """Emits the elements of a streamed top-level JSON array as they close."""
+
+    def __init__(self):
+        """Initialize an empty parser."""
+        self._buffer = ""
+        self._position = 0
+        self._element_start: Optional[int] = None
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self.started = False
+        self.finished = False
+        self.invalid_elements = 0
+
+    def feed(self, text: str) -> List[Any]:
+        """
+        Consume the next piece of the stream.
+
+        Args:
+            text (str): Next piece of streamed text
+
+        Returns:
+            List[Any]: The array elements completed by this piece, in order
+        """
+        elements: List[Any] = []
+        if self.finished or not text:
+            return elements
+
+        buffer = self._buffer + text
+        position = self._position
+        while position < len(buffer) and not self.finished:
+            char = buffer[position]
+            if not self.started:
+                self.started = char == "["
+            elif self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+                self._mark_start(position)
+            elif char in "{[":
+                self._mark_start(position)
+                self._depth += 1
+            elif char in "}]":
+                if self._depth > 0:
+                    self._depth -= 1
+                    if self._depth == 0:
+                        self._emit(buffer, position + 1, elements)
+                elif char == "]":
+                    # The array itself closed; flush a trailing scalar element
+                    self._emit(buffer, position, elements)
+                    self.finished = True
+            elif char == "," and self._depth == 0:
+                self._emit(buffer, position, elements)
+            elif not char.isspace():
+                self._mark_start(position)
+            position += 1
+
+        # Keep only the text of the element still being parsed
+        consumed = self._element_start if self._element_start is not None else position
+        self._buffer = buffer[consumed:]
+        self._position = position - consumed
+        if self._element_start is not None:
+            self._element_start = 0
+        return elements
+
+    def _mark_start(self, position: int) -> None:
+        """Remember where the current element starts, if it has not started yet."""
+        if self._element_start is None:
+            self._element_start = position
+
+    def _emit(self, buffer: str, end: int, elements: List[Any]) -> None:
+        """Decode the element ending at a buffer position and reset for the next one."""
+        if self._element_start is None:
+            return
+        text = buffer[self._element_start:end]
+        self._element_start = None
+        try:
+            elements.append(json.loads(text))
+        except json.JSONDecodeError as e:
+            self.invalid_elements += 1
+            logger.debug(f"Skipping invalid streamed JSON element {text!r}: {str(e)}")
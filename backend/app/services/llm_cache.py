@@ -0,0 +1,327 @@
+"""
+LLM response cache.
+
+This module provides a content-addressed cache for chat completions. A
+response is keyed by a hash of the model, messages and sampling
+parameters, and stored in an in-memory LRU tier backed by an on-disk
+SQLite tier. Every service reaches the cache through CachedChatClient,
+a drop-in wrapper around an AsyncOpenAI client.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from types import SimpleNamespace
+from typing import Any, Dict, Iterator, Optional, Tuple
+from ..core.config import get_settings
+from .request_stats import record_stat
+
+logger = logging.getLogger(__name__)
+
+_bypass_cache: ContextVar[bool] = ContextVar("llm_cache_bypass", default=False)
+
+
+@contextmanager
+def llm_cache_bypass(enabled: bool = True) -> Iterator[None]:
+    """
+    Bypass the LLM cache for the current request.
+
+    Responses are neither read from nor written to the cache while the
+    bypass is active.
+
+    Args:
+        enabled (bool): Whether to bypass the cache
+    """
+    token = _bypass_cache.set(enabled)
+    try:
+        yield
+    finally:
+        _bypass_cache.reset(token)
+
+
+class LLMCache:
+    """Two-tier (memory LRU + SQLite) cache of chat completion contents."""
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: float,
+        db_path: Optional[str] = None,
+        max_disk_entries: int = 0
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries (int): Maximum number of entries kept in memory
+            ttl_seconds (float): Time after which an entry expires
+            db_path (Optional[str]): SQLite file for the disk tier; None disables it
+            max_disk_entries (int): Maximum number of entries kept on disk
+        """
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.max_disk_entries = max_disk_entries
+        self._memory: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0}
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+
+        if db_path:
+            try:
+                self._db = sqlite3.connect(db_path, check_same_thread=False)
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS llm_cache ("
+                    "key TEXT PRIMARY KEY, content TEXT NOT NULL, "
+                    "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+                )
+                self._db.execute("CREATE INDEX IF NOT EXISTS llm_cache_accessed ON llm_cache (accessed_at)")
+                self._db.commit()
+                logger.info(f"LLM cache disk tier opened at {db_path}")
+            except sqlite3.Error as e:
+                logger.error(f"Failed to open LLM cache database, using memory only: {str(e)}")
+                self._db = None
+
+    @staticmethod
+    def make_key(params: Dict[str, Any]) -> str:
+        """
+        Build the cache key of a chat completion request.
+
+        Args:
+            params (Dict[str, Any]): Keyword arguments of chat.completions.create
+
+        Returns:
+            str: SHA-256 hex digest of the model, messages and sampling parameters
+        """
+        keyed = {name: value for name, value in params.items() if name != "stream"}
+        payload = json.dumps(keyed, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached completion.
+
+        Args:
+            key (str): Cache key from make_key
+
+        Returns:
+            Optional[str]: The cached content, or None on a miss
+        """
+        now = time.time()
+        entry = self._memory.get(key)
+        if entry is not None:
+            content, created_at = entry
+            if now - created_at <= self.ttl_seconds:
+                self._memory.move_to_end(key)
+                self._counters["memory_hits"] += 1
+                return content
+            del self._memory[key]
+
+        if self._db is not None:
+            entry = await asyncio.to_thread(self._db_get, key, now)
+            if entry is not None:
+                content, created_at = entry
+                self._remember(key, content, created_at)
+                self._counters["disk_hits"] += 1
+                return content
+
+        self._counters["misses"] += 1
+        return None
+
+    async def set(self, key: str, content: str) -> None:
+        """
+        Store a completion in both tiers.
+
+        Args:
+            key (str): Cache key from make_key
+            content (str): Completion content
+        """
+        now = time.time()
+        self._remember(key, content, now)
+        self._counters["writes"] += 1
+        if self._db is not None:
+            await asyncio.to_thread(self._db_set, key, content, now)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the cache counters.
+
+        Returns:
+            Dict[str, Any]: Hit, miss and write counts, hit rate and memory size
+        """
+        lookups = self._counters["memory_hits"] + self._counters["disk_hits"] + self._counters["misses"]
+        hits = self._counters["memory_hits"] + self._counters["disk_hits"]
+        return {
+            **self._counters,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "memory_entries": len(self._memory),
+        }
+
+    def _remember(self, key: str, content: str, created_at: float) -> None:
+        """Insert an entry into the memory tier, evicting the least recently used ones."""
+        self._memory[key] = (content, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _db_get(self, key: str, now: float) -> Optional[Tuple[str, float]]:
+        """Read an entry from the disk tier, dropping it if it has expired."""
+        try:
+            with self._db_lock:
+                row = self._db.execute(
+                    "SELECT content, created_at FROM llm_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                if now - row[1] > self.ttl_seconds:
+                    self._db.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                    self._db.commit()
+                    return None
+                self._db.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+                self._db.commit()
+                return row[0], row[1]
+        except sqlite3.Error as e:
+            logger.error(f"LLM cache read failed: {str(e)}")
+            return None
+
+    def _db_set(self, key: str, content: str, now: float) -> None:
+        """Write an entry to the disk tier and enforce the TTL and size limits."""
+        try:
+            with self._db_lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, content, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                    (key, content, now, now)
+                )
+                self._db.execute("DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl_seconds,))
+                if self.max_disk_entries > 0:
+                    self._db.execute(
+                        "DELETE FROM llm_cache WHERE key IN ("
+                        "SELECT key FROM llm_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                        (self.max_disk_entries,)
+                    )
+                self._db.commit()
+        except sqlite3.Error as e:
+            logger.error(f"LLM cache write failed: {str(e)}")
+
+
+class _ReplayStream:
+    """Replays cached content in the shape of a streamed chat completion."""
+
+    def __init__(self, content: str):
+        self._content = content
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        yield SimpleNamespace(choices=[SimpleNamespace(
+            delta=SimpleNamespace(content=self._content), finish_reason=None
+        )])
+        yield SimpleNamespace(choices=[SimpleNamespace(
+            delta=SimpleNamespace(content=None), finish_reason="stop"
+        )])
+
+
+class _RecordingStream:
+    """Passes a streamed chat completion through and caches it once it completes."""
+
+    def __init__(self, stream, cache: LLMCache, key: str):
+        self._stream = stream
+        self._cache = cache
+        self._key = key
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        parts = []
+        async for chunk in self._stream:
+            if chunk.choices:
+                choice = chunk.choices[0]
+                if choice.delta.content is not None:
+                    parts.append(choice.delta.content)
+                if choice.finish_reason == "stop":
+                    await self._cache.set(self._key, "".join(parts))
+            yield chunk
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+class CachedChatClient:
+    """AsyncOpenAI-compatible client whose chat completions go through an LLMCache."""
+
+    def __init__(self, client, cache: LLMCache):
+        """
+        Initialize the cached client.
+
+        Args:
+            client (AsyncOpenAI): Client used on cache misses
+            cache (LLMCache): Shared response cache
+        """
+        self._client = client
+        self.cache = cache
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    async def _create(self, **params):
+        """Serve chat.completions.create from the cache, calling the wrapped client on a miss."""
+        if _bypass_cache.get():
+            return await self._client.chat.completions.create(**params)
+
+        key = self.cache.make_key(params)
+        content = await self.cache.get(key)
+        if content is not None:
+            record_stat("llm_cache_hits")
+            logger.debug(f"LLM cache hit for {params.get('model')}")
+            if params.get("stream"):
+                return _ReplayStream(content)
+            return SimpleNamespace(choices=[SimpleNamespace(
+                message=SimpleNamespace(content=content), finish_reason="stop"
+            )])
+
+        record_stat("llm_cache_misses")
+        response = await self._client.chat.completions.create(**params)
+        if params.get("stream"):
+            return _RecordingStream(response, self.cache, key)
+
+        choice = response.choices[0]
+        if choice.message.content and getattr(choice, "finish_reason", "stop") == "stop":
+            await self.cache.set(key, choice.message.content)
+        return response
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+@lru_cache()
+def get_llm_cache() -> LLMCache:
+    """Get the process-wide LLM cache instance."""
+    settings = get_settings()
+    return LLMCache(
+        max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+        ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+        db_path=settings.LLM_CACHE_DB_PATH or None,
+        max_disk_entries=settings.LLM_CACHE_MAX_DISK_ENTRIES
+    )
+
+
+def cached_client(client):
+    """
+    Wrap a client with the shared LLM cache if caching is enabled.
+
+    Args:
+        client (AsyncOpenAI): Client to wrap
+
+    Returns:
+        The cached client, or the original client when caching is disabled
+    """
+    if not get_settings().LLM_CACHE_ENABLED:
+        return client
+    return CachedChatClient(client, get_llm_cache())
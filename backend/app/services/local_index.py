@@ -0,0 +1,280 @@
+"""
+Local BM25 evidence index.
+
+This module provides an offline full-text search provider built from a
+JSONL corpus dump (e.g. Wikipedia abstracts or an archive of vetted
+articles). Each corpus line is a JSON object with a ``title``, a ``text``
+(or ``abstract``/``snippet``), a ``url`` (or ``link``) and an optional
+``source_type``.
+
+The index is a directory holding:
+- ``meta.json``: document count, average document length and BM25 parameters
+- ``vocab.json``: term -> [offset into the postings, document frequency]
+- ``postings.bin``: uint32 (doc id, term frequency) pairs grouped by term
+- ``doc_lengths.bin``: uint32 token count per document
+- ``docs.jsonl`` and ``doc_offsets.bin``: stored documents and their byte offsets
+
+The binary files are memory-mapped at query time. Build an index with:
+
+    python -m app.services.local_index build corpus.jsonl index_dir
+"""
+
+import argparse
+import heapq
+import json
+import logging
+import math
+import mmap
+import os
+import re
+import time
+from array import array
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+from ..models.schemas import Source, SourceType
+from .token_cache import STOPWORDS
+from .tokenizer import lcut
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 1
+_SOURCE_TYPES = {source_type.value for source_type in SourceType}
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Tokenize a text for indexing and querying.
+
+    Args:
+        text (str): Text to tokenize
+
+    Returns:
+        List[str]: Lower-cased jieba tokens, without punctuation and whitespace
+    """
+    return [token for token in lcut((text or "").lower()) if re.search(r'\w', token)]
+
+
+def build_index(corpus_path: str, index_dir: str, snippet_chars: int = 1000, k1: float = 1.2, b: float = 0.75) -> int:
+    """
+    Build a BM25 index from a JSONL corpus.
+
+    Args:
+        corpus_path (str): JSONL corpus, one document per line
+        index_dir (str): Directory to write the index to
+        snippet_chars (int): Maximum length of the stored document text
+        k1 (float): BM25 term frequency saturation
+        b (float): BM25 document length normalization
+
+    Returns:
+        int: Number of indexed documents
+    """
+    os.makedirs(index_dir, exist_ok=True)
+    postings: Dict[str, List[int]] = {}
+    doc_lengths = array('I')
+    doc_offsets = array('Q')
+    skipped = 0
+
+    with open(corpus_path, encoding="utf-8") as corpus, \
+            open(os.path.join(index_dir, "docs.jsonl"), "wb") as docs:
+        for line_number, line in enumerate(corpus, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                if not isinstance(record, dict):
+                    raise ValueError("not a JSON object")
+                title = str(record.get("title") or "").strip()
+                text = str(record.get("text") or record.get("abstract") or record.get("snippet") or "").strip()
+                link = str(record.get("url") or record.get("link") or "").strip()
+                if not (title and text and link.startswith("http")):
+                    raise ValueError("missing title, text or url")
+            except ValueError as e:
+                skipped += 1
+                logger.warning(f"Skipping corpus line {line_number}: {str(e)}")
+                continue
+
+            source_type = str(record.get("source_type") or SourceType.OTHER.value)
+            document = {
+                "title": title,
+                "snippet": text[:snippet_chars],
+                "link": link,
+                "source_type": source_type if source_type in _SOURCE_TYPES else SourceType.OTHER.value,
+            }
+            doc_id = len(doc_lengths)
+            doc_offsets.append(docs.tell())
+            docs.write(json.dumps(document, ensure_ascii=False).encode("utf-8") + b"\n")
+
+            tokens = tokenize(f"{title} {text}")
+            doc_lengths.append(len(tokens))
+            for term, frequency in Counter(tokens).items():
+                postings.setdefault(term, []).extend((doc_id, frequency))
+
+    vocab = {}
+    with open(os.path.join(index_dir, "postings.bin"), "wb") as postings_file:
+        offset = 0
+        for term in sorted(postings):
+            entries = array('I', postings[term])
+            entries.tofile(postings_file)
+            vocab[term] = [offset, len(entries) // 2]
+            offset += len(entries) // 2
+
+    with open(os.path.join(index_dir, "doc_lengths.bin"), "wb") as lengths_file:
+        doc_lengths.tofile(lengths_file)
+    with open(os.path.join(index_dir, "doc_offsets.bin"), "wb") as offsets_file:
+        doc_offsets.tofile(offsets_file)
+    with open(os.path.join(index_dir, "vocab.json"), "w", encoding="utf-8") as vocab_file:
+        json.dump(vocab, vocab_file, ensure_ascii=False, separators=(",", ":"))
+    with open(os.path.join(index_dir, "meta.json"), "w", encoding="utf-8") as meta_file:
+        json.dump({
+            "version": INDEX_VERSION,
+            "num_docs": len(doc_lengths),
+            "avg_doc_length": sum(doc_lengths) / len(doc_lengths) if doc_lengths else 0.0,
+            "k1": k1,
+            "b": b,
+        }, meta_file)
+
+    logger.info(f"Indexed {len(doc_lengths)} documents ({len(vocab)} terms, {skipped} lines skipped) into {index_dir}")
+    return len(doc_lengths)
+
+
+class LocalEvidenceIndex:
+    """Read-only BM25 index over memory-mapped postings."""
+
+    def __init__(self, index_dir: str, max_postings_per_term: int = 100000):
+        """
+        Open an index built by build_index.
+
+        Args:
+            index_dir (str): Index directory
+            max_postings_per_term (int): Longest postings list a query scans in full
+
+        Raises:
+            ValueError: If the index was built by an incompatible version
+        """
+        with open(os.path.join(index_dir, "meta.json"), encoding="utf-8") as meta_file:
+            meta = json.load(meta_file)
+        if meta.get("version") != INDEX_VERSION:
+            raise ValueError(f"Unsupported local index version: {meta.get('version')}")
+        with open(os.path.join(index_dir, "vocab.json"), encoding="utf-8") as vocab_file:
+            self._vocab: Dict[str, List[int]] = json.load(vocab_file)
+
+        self.num_docs = meta["num_docs"]
+        self.avg_doc_length = meta["avg_doc_length"] or 1.0
+        self.k1 = meta["k1"]
+        self.b = meta["b"]
+        self.max_postings_per_term = max(1, max_postings_per_term)
+
+        self._files = []
+        self._postings = self._map(os.path.join(index_dir, "postings.bin"), 'I')
+        self._doc_lengths = self._map(os.path.join(index_dir, "doc_lengths.bin"), 'I')
+        self._doc_offsets = self._map(os.path.join(index_dir, "doc_offsets.bin"), 'Q')
+        self._docs = self._map(os.path.join(index_dir, "docs.jsonl"), None)
+        logger.info(f"Opened local evidence index at {index_dir} ({self.num_docs} documents, {len(self._vocab)} terms)")
+
+    def search(self, query: str, limit: int = 5) -> List[Tuple[Source, float, float]]:
+        """
+        Rank documents against a query with BM25.
+
+        Stopwords are dropped from the query. Terms are processed from the
+        rarest to the most common; a term whose postings list is longer than
+        max_postings_per_term only adds to documents already matched by a
+        rarer term, found by binary search instead of scanning the list (or,
+        if no rarer term matched anything, to the documents in its first
+        max_postings_per_term postings). The search is CPU-bound; call it
+        from a worker thread in async code.
+
+        Args:
+            query (str): The search query
+            limit (int): Maximum number of results
+
+        Returns:
+            List[Tuple[Source, float, float]]: Source, BM25 score and the share
+                of the query's content terms (terms other than stopwords) the
+                document contains, best first
+        """
+        entries = [self._vocab.get(term) for term in set(tokenize(query)) if term not in STOPWORDS]
+        if not entries or not self.num_docs:
+            return []
+
+        scores: Dict[int, float] = {}
+        matched: Dict[int, int] = {}
+        for offset, doc_frequency in sorted((entry for entry in entries if entry), key=lambda entry: entry[1]):
+            idf = math.log(1 + (self.num_docs - doc_frequency + 0.5) / (doc_frequency + 0.5))
+            if doc_frequency <= self.max_postings_per_term or not scores:
+                end = offset + min(doc_frequency, self.max_postings_per_term)
+                positions = range(2 * offset, 2 * end, 2)
+            else:
+                positions = [
+                    position for position in (self._find(offset, doc_frequency, doc_id) for doc_id in list(scores))
+                    if position is not None
+                ]
+            for position in positions:
+                doc_id = self._postings[position]
+                frequency = self._postings[position + 1]
+                length_norm = 1 - self.b + self.b * self._doc_lengths[doc_id] / self.avg_doc_length
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + self.k1 * length_norm)
+                matched[doc_id] = matched.get(doc_id, 0) + 1
+
+        top = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        return [(self._load_document(doc_id), score, matched[doc_id] / len(entries)) for doc_id, score in top]
+
+    def close(self) -> None:
+        """Unmap and close the index files."""
+        for view in (self._postings, self._doc_lengths, self._doc_offsets):
+            if isinstance(view, memoryview):
+                view.release()
+        for mapped, handle in self._files:
+            mapped.close()
+            handle.close()
+        self._files = []
+
+    def _map(self, path: str, typecode: Optional[str]):
+        """Memory-map a file, viewed as an array of the given type code."""
+        handle = open(path, "rb")
+        if os.path.getsize(path) == 0:
+            handle.close()
+            return array(typecode) if typecode else b""
+        mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        self._files.append((mapped, handle))
+        return memoryview(mapped).cast(typecode) if typecode else mapped
+
+    def _find(self, offset: int, doc_frequency: int, doc_id: int) -> Optional[int]:
+        """Binary-search a term's postings, sorted by doc id, for a document's posting position."""
+        low, high = offset, offset + doc_frequency
+        while low < high:
+            middle = (low + high) // 2
+            if self._postings[2 * middle] < doc_id:
+                low = middle + 1
+            else:
+                high = middle
+        if low < offset + doc_frequency and self._postings[2 * low] == doc_id:
+            return 2 * low
+        return None
+
+    def _load_document(self, doc_id: int) -> Source:
+        """Read a stored document and turn it into a Source."""
+        start = self._doc_offsets[doc_id]
+        end = self._docs.find(b"\n", start)
+        return Source.model_validate(json.loads(self._docs[start:end if end != -1 else None]))
+
+
+def main() -> None:
+    """Command-line entry point for building the local index."""
+    parser = argparse.ArgumentParser(description="Local BM25 evidence index")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    build = subcommands.add_parser("build", help="Build an index from a JSONL corpus")
+    build.add_argument("corpus", help="JSONL corpus with title, text and url fields")
+    build.add_argument("index_dir", help="Directory to write the index to")
+    build.add_argument("--snippet-chars", type=int, default=1000, help="Maximum stored text length per document")
+    build.add_argument("--k1", type=float, default=1.2, help="BM25 k1 parameter")
+    build.add_argument("--b", type=float, default=0.75, help="BM25 b parameter")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    started = time.time()
+    count = build_index(args.corpus, args.index_dir, args.snippet_chars, args.k1, args.b)
+    logger.info(f"Built index of {count} documents in {time.time() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Per-request statistics.
+
+This module provides counters scoped to a single request. Services record
+into whichever scope is active for the current asyncio context, so the
+counters follow a request across every task it spawns.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+
+_current_stats: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_stats", default=None)
+
+
+@contextmanager
+def request_stats_scope() -> Iterator[Dict[str, float]]:
+    """
+    Open a statistics scope for the current request.
+
+    Yields:
+        Dict[str, float]: The counters recorded while the scope is active
+    """
+    stats: Dict[str, float] = {}
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+def record_stat(name: str, amount: float = 1) -> None:
+    """
+    Add to a counter of the active request, if any.
+
+    Args:
+        name (str): Counter name
+        amount (float): Amount to add
+    """
+    stats = _current_stats.get()
+    if stats is not None:
+        stats[name] = stats.get(name, 0) + amount
+
+
+def summarize_stats(stats: Dict[str, float]) -> Dict[str, float]:
+    """
+    Copy a request's counters and add the rates derived from them.
+
+    Args:
+        stats (Dict[str, float]): Counters of a finished request
+
+    Returns:
+        Dict[str, float]: The counters plus similarity_escalation_rate, the share
+            of cascade-scored claim-source pairs that needed an LLM call
+    """
+    summary = dict(stats)
+    cascaded = stats.get("similarity_pairs_local", 0) + stats.get("similarity_pairs_escalated", 0)
+    if cascaded:
+        summary["similarity_escalation_rate"] = stats.get("similarity_pairs_escalated", 0) / cascaded
+    return summary
@@ -0,0 +1,224 @@
+"""
+Search result cache.
+
+This module caches the results of each search provider per query. Every
+provider has its own TTL (news goes stale quickly, encyclopedic and
+academic results do not), empty results are cached for a short negative
+TTL while failures are not cached at all, and an expired entry is still served for a grace
+period while a refresh runs in the background (stale-while-revalidate).
+Results are stored as zlib-compressed compact JSON.
+"""
+
+import asyncio
+import json
+import logging
+import re
+import time
+import zlib
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+from ..core.config import get_settings, parse_provider_values
+from ..models.schemas import Source
+from .request_stats import record_stat
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE_PATTERN = re.compile(r'\s+')
+
+
+def serialize_sources(sources: List[Source]) -> bytes:
+    """
+    Serialize sources into the compact cached form.
+
+    Args:
+        sources (List[Source]): Sources to serialize
+
+    Returns:
+        bytes: zlib-compressed JSON without unset fields
+    """
+    payload = [source.model_dump(mode="json", exclude_none=True) for source in sources]
+    return zlib.compress(json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+
+
+def deserialize_sources(data: bytes) -> List[Source]:
+    """
+    Deserialize sources from the compact cached form.
+
+    Args:
+        data (bytes): Output of serialize_sources
+
+    Returns:
+        List[Source]: The cached sources
+    """
+    return [Source.model_validate(item) for item in json.loads(zlib.decompress(data).decode("utf-8"))]
+
+
+class _CacheEntry:
+    """A cached provider result."""
+
+    __slots__ = ("data", "stored_at", "ttl", "negative")
+
+    def __init__(self, data: bytes, stored_at: float, ttl: float, negative: bool):
+        self.data = data
+        self.stored_at = stored_at
+        self.ttl = ttl
+        self.negative = negative
+
+
+class SearchCache:
+    """In-memory LRU cache of search provider results with stale-while-revalidate."""
+
+    def __init__(
+        self,
+        max_entries: int,
+        default_ttl: float,
+        provider_ttls: Optional[Dict[str, float]] = None,
+        negative_ttl: float = 300,
+        stale_seconds: float = 0
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries (int): Maximum number of cached (provider, query) results
+            default_ttl (float): TTL of providers without their own TTL
+            provider_ttls (Optional[Dict[str, float]]): TTL per provider name
+            negative_ttl (float): TTL of empty results
+            stale_seconds (float): How long after expiry an entry is still served
+                while it is refreshed in the background
+        """
+        self.max_entries = max(1, max_entries)
+        self.default_ttl = default_ttl
+        self.provider_ttls = provider_ttls or {}
+        self.negative_ttl = negative_ttl
+        self.stale_seconds = stale_seconds
+        self._entries: "OrderedDict[Tuple[str, str], _CacheEntry]" = OrderedDict()
+        self._refreshing: Set[Tuple[str, str]] = set()
+        self._refresh_tasks: Set[asyncio.Task] = set()
+        self._counters = {"hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0, "failures": 0}
+
+    async def fetch(
+        self,
+        provider: str,
+        query: str,
+        loader: Callable[[str], Awaitable[List[Source]]]
+    ) -> List[Source]:
+        """
+        Get a provider's results for a query, loading them on a miss.
+
+        Args:
+            provider (str): Provider name, used for the TTL and the cache key
+            query (str): The search query
+            loader (Callable[[str], Awaitable[List[Source]]]): Runs the provider search
+
+        Returns:
+            List[Source]: The provider's results; empty, and not cached, if the provider failed
+        """
+        key = (provider, self._normalize_query(query))
+        entry = self._entries.get(key)
+        now = time.time()
+
+        if entry is not None:
+            age = now - entry.stored_at
+            if age <= entry.ttl:
+                self._entries.move_to_end(key)
+                self._counters["hits"] += 1
+                record_stat("search_cache_hits")
+                return deserialize_sources(entry.data)
+            if age <= entry.ttl + self.stale_seconds:
+                self._entries.move_to_end(key)
+                self._counters["stale_hits"] += 1
+                record_stat("search_cache_stale_hits")
+                self._schedule_refresh(key, query, loader)
+                return deserialize_sources(entry.data)
+            del self._entries[key]
+
+        self._counters["misses"] += 1
+        record_stat("search_cache_misses")
+        try:
+            sources = await loader(query)
+        except Exception as e:
+            # A failure says nothing about the query; the next request retries it
+            self._counters["failures"] += 1
+            logger.error(f"{provider} search failed for '{query}': {str(e)}")
+            return []
+        self._store(key, sources)
+        return sources
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Get the cache counters.
+
+        Returns:
+            Dict[str, float]: Hit, stale hit, miss, refresh and failure counts and the entry count
+        """
+        return {**self._counters, "entries": len(self._entries)}
+
+    def _schedule_refresh(
+        self,
+        key: Tuple[str, str],
+        query: str,
+        loader: Callable[[str], Awaitable[List[Source]]]
+    ) -> None:
+        """Refresh a stale entry in the background, at most once at a time per key."""
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+        task = asyncio.create_task(self._refresh(key, query, loader))
+        self._refresh_tasks.add(task)
+        task.add_done_callback(self._refresh_tasks.discard)
+
+    async def _refresh(
+        self,
+        key: Tuple[str, str],
+        query: str,
+        loader: Callable[[str], Awaitable[List[Source]]]
+    ) -> None:
+        """Reload a stale entry, keeping the stale results if the provider fails."""
+        try:
+            sources = await loader(query)
+            self._counters["refreshes"] += 1
+            # An empty refresh must not replace results that were found before;
+            # the stale entry then ages out of the grace period as usual
+            entry = self._entries.get(key)
+            if sources or entry is None or entry.negative:
+                self._store(key, sources)
+        except Exception as e:
+            self._counters["failures"] += 1
+            logger.error(f"Background refresh of {key[0]} results for '{query}' failed: {str(e)}")
+        finally:
+            self._refreshing.discard(key)
+
+    def _store(self, key: Tuple[str, str], sources: List[Source]) -> None:
+        """Cache a provider's results, evicting the least recently used entries."""
+        ttl = self.provider_ttls.get(key[0], self.default_ttl) if sources else self.negative_ttl
+        self._entries[key] = _CacheEntry(serialize_sources(sources), time.time(), ttl, not sources)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    @staticmethod
+    def _normalize_query(query: str) -> str:
+        """Map queries differing only in case or whitespace to the same key."""
+        return _WHITESPACE_PATTERN.sub(" ", query or "").strip().lower()
+
+
+@lru_cache()
+def get_search_cache() -> Optional[SearchCache]:
+    """
+    Get the process-wide search cache instance.
+
+    Returns:
+        Optional[SearchCache]: The cache, or None when search caching is disabled
+    """
+    settings = get_settings()
+    if not settings.SEARCH_CACHE_ENABLED:
+        return None
+    return SearchCache(
+        max_entries=settings.SEARCH_CACHE_MAX_ENTRIES,
+        default_ttl=settings.SEARCH_CACHE_TTL_SECONDS,
+        provider_ttls=parse_provider_values(settings.SEARCH_CACHE_PROVIDER_TTLS),
+        negative_ttl=settings.SEARCH_CACHE_NEGATIVE_TTL_SECONDS,
+        stale_seconds=settings.SEARCH_CACHE_STALE_SECONDS
+    )
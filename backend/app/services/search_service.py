@@ -1,9 +1,8 @@
-from typing import List, Dict
-import os
-from googleapiclient.discovery import build
-import wikipediaapi
-from newsapi import NewsApiClient
-from ..models.schemas import Source
+from typing import Awaitable, Callable, List, Dict, Optional
+import asyncio
+import httpx
+from ..core.config import get_settings, parse_provider_values
+from ..models.schemas import Source, SourceType
 import logging
 
 # Configure logging
@@ -13,127 +12,195 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+GOOGLE_SEARCH_URL = "https://www.googleapis.com/customsearch/v1"
+WIKIPEDIA_API_URL = "https://en.wikipedia.org/w/api.php"
+NEWS_API_URL = "https://newsapi.org/v2/everything"
+USER_AGENT = "FactGuard/1.0 (https://github.com/yourusername/fact-guard; your@email.com)"
+
+class SearchProviderError(Exception):
+    """Raised when a search provider fails or times out, as opposed to finding nothing."""
+
 class SearchService:
-    def __init__(self):
+    def __init__(self, client: Optional[httpx.AsyncClient] = None):
+        """
+        Initialize the search service.
+
+        Args:
+            client (Optional[httpx.AsyncClient]): Shared HTTP client; one is created if not given
+        """
         logger.info("Initializing SearchService...")
-        try:
-            self.google_service = build("customsearch", "v1", developerKey=os.getenv("GOOGLE_API_KEY"))
-            logger.info("Google Custom Search API initialized successfully")
-            
-            self.wiki_wiki = wikipediaapi.Wikipedia(
-                language='en',
-                user_agent='FactGuard/1.0 (https://github.com/yourusername/fact-guard; your@email.com)'
-            )
-            logger.info("Wikipedia API initialized successfully")
-            
-            self.newsapi = NewsApiClient(api_key=os.getenv("NEWS_API_KEY"))
-            logger.info("News API initialized successfully")
-        except Exception as e:
-            logger.error(f"Error initializing search services: {str(e)}")
-            raise
+        settings = get_settings()
+        self.google_api_key = settings.GOOGLE_API_KEY
+        self.google_cse_id = settings.GOOGLE_CSE_ID
+        self.news_api_key = settings.NEWS_API_KEY
+        self.default_timeout = settings.SEARCH_TIMEOUT_SECONDS
+        self.default_max_results = settings.SEARCH_MAX_RESULTS
+        self.timeouts = parse_provider_values(settings.SEARCH_PROVIDER_TIMEOUTS)
+        self.max_results = {
+            name: int(value) for name, value in parse_provider_values(settings.SEARCH_PROVIDER_MAX_RESULTS).items()
+        }
+        self.client = client or httpx.AsyncClient(
+            headers={"User-Agent": USER_AGENT},
+            timeout=httpx.Timeout(self.default_timeout, connect=5.0),
+            limits=httpx.Limits(max_keepalive_connections=10, max_connections=20)
+        )
+
+        if not (self.google_api_key and self.google_cse_id):
+            logger.warning("GOOGLE_API_KEY or GOOGLE_CSE_ID not set, Google search disabled")
+        if not self.news_api_key:
+            logger.warning("NEWS_API_KEY not set, news search disabled")
 
-    def search_google(self, query: str, num_results: int = 5) -> List[Source]:
+    async def search_google(self, query: str) -> List[Source]:
         """Search Google for relevant information"""
         logger.info(f"Starting Google search for query: '{query}'")
-        try:
-            result = self.google_service.cse().list(
-                q=query,
-                cx=os.getenv("GOOGLE_CSE_ID"),
-                num=num_results
-            ).execute()
-            
-            sources = [
+        num_results = self._max_results("google")
+
+        async def search() -> List[Source]:
+            response = await self.client.get(GOOGLE_SEARCH_URL, params={
+                "key": self.google_api_key,
+                "cx": self.google_cse_id,
+                "q": query,
+                "num": min(num_results, 10)
+            })
+            response.raise_for_status()
+            return [
                 Source(
                     title=item["title"],
                     link=item["link"],
-                    snippet=item["snippet"],
-                    source_type="google"
+                    snippet=item.get("snippet", ""),
+                    source_type=SourceType.OTHER
                 )
-                for item in result.get("items", [])
+                for item in response.json().get("items", [])
             ]
-            logger.info(f"Google search completed. Found {len(sources)} results")
-            return sources
-        except Exception as e:
-            logger.error(f"Google search error: {str(e)}")
-            return []
 
-    def search_wikipedia(self, query: str) -> List[Source]:
+        return await self._run_provider("google", search())
+
+    async def search_wikipedia(self, query: str) -> List[Source]:
         """Search Wikipedia for relevant information"""
         logger.info(f"Starting Wikipedia search for query: '{query}'")
-        try:
-            page = self.wiki_wiki.page(query)
-            if page.exists():
-                logger.info(f"Found Wikipedia page: '{page.title}'")
-                sources = [Source(
-                    title=page.title,
-                    link=page.fullurl,
-                    snippet=page.summary,
-                    source_type="wikipedia"
-                )]
-                logger.info("Wikipedia search completed successfully")
-                return sources
-            logger.warning(f"No Wikipedia page found for query: '{query}'")
-            return []
-        except Exception as e:
-            logger.error(f"Wikipedia search error: {str(e)}")
-            return []
+        num_results = self._max_results("wikipedia")
+
+        async def search() -> List[Source]:
+            # Search and fetch the intro extracts of the matching pages in one request
+            response = await self.client.get(WIKIPEDIA_API_URL, params={
+                "action": "query",
+                "format": "json",
+                "generator": "search",
+                "gsrsearch": query,
+                "gsrlimit": num_results,
+                "prop": "extracts|info",
+                "exintro": 1,
+                "explaintext": 1,
+                "exlimit": num_results,
+                "inprop": "url"
+            })
+            response.raise_for_status()
+            pages = sorted(
+                response.json().get("query", {}).get("pages", {}).values(),
+                key=lambda page: page.get("index", 0)
+            )
+            return [
+                Source(
+                    title=page["title"],
+                    link=page["fullurl"],
+                    snippet=page["extract"],
+                    source_type=SourceType.OTHER
+                )
+                for page in pages
+                if page.get("extract") and page.get("fullurl")
+            ]
 
-    def search_news(self, query: str) -> List[Source]:
+        return await self._run_provider("wikipedia", search())
+
+    async def search_news(self, query: str) -> List[Source]:
         """Search news articles for relevant information"""
         logger.info(f"Starting news search for query: '{query}'")
-        try:
-            news = self.newsapi.get_everything(
-                q=query,
-                language='en',
-                sort_by='relevancy',
-                page_size=5
+        page_size = self._max_results("news")
+
+        async def search() -> List[Source]:
+            response = await self.client.get(
+                NEWS_API_URL,
+                params={"q": query, "language": "en", "sortBy": "relevancy", "pageSize": page_size},
+                headers={"X-Api-Key": self.news_api_key}
             )
-            sources = [
+            response.raise_for_status()
+            return [
                 Source(
                     title=article["title"],
                     link=article["url"],
                     snippet=article["description"],
-                    source_type="news"
+                    source_type=SourceType.NEWS
                 )
-                for article in news.get("articles", [])
-                if article["description"]
+                for article in response.json().get("articles", [])
+                if article.get("description")
             ]
-            logger.info(f"News search completed. Found {len(sources)} articles")
-            return sources
-        except Exception as e:
-            logger.error(f"News search error: {str(e)}")
-            return []
 
-    def search_all_sources(self, query: str) -> List[Source]:
-        """Search across all available sources"""
+        return await self._run_provider("news", search())
+
+    def providers(self) -> Dict[str, Callable[[str], Awaitable[List[Source]]]]:
+        """Get the search function of each configured provider, keyed by provider name"""
+        providers = {}
+        if self.google_api_key and self.google_cse_id:
+            providers["google"] = self.search_google
+        providers["wikipedia"] = self.search_wikipedia
+        if self.news_api_key:
+            providers["news"] = self.search_news
+        return providers
+
+    async def search_all_sources(self, query: str) -> List[Source]:
+        """Search across all available sources concurrently, merging results as they arrive"""
         logger.info(f"Starting comprehensive search across all sources for query: '{query}'")
-        
-        # Search Google
-        logger.info("Initiating Google search...")
-        google_results = self.search_google(query)
-        logger.debug(f"Google search returned {len(google_results)} results")
-        
-        # Search Wikipedia
-        logger.info("Initiating Wikipedia search...")
-        wiki_results = self.search_wikipedia(query)
-        logger.debug(f"Wikipedia search returned {len(wiki_results)} results")
-        
-        # Search News
-        logger.info("Initiating News search...")
-        news_results = self.search_news(query)
-        logger.debug(f"News search returned {len(news_results)} results")
-        
-        # Combine results
-        all_results = google_results + wiki_results + news_results
+
+        all_results = []
+        for next_results in asyncio.as_completed([search(query) for search in self.providers().values()]):
+            try:
+                all_results.extend(await next_results)
+            except SearchProviderError:
+                continue
         logger.info(f"Search completed. Total results: {len(all_results)}")
-        
+
         # Log source type breakdown
         source_types = {}
         for source in all_results:
             source_types[source.source_type] = source_types.get(source.source_type, 0) + 1
-        
+
         logger.info("Source type breakdown:")
         for source_type, count in source_types.items():
             logger.info(f"- {source_type}: {count} sources")
-        
-        return all_results 
\ No newline at end of file
+
+        return all_results
+
+    async def close(self) -> None:
+        """Close the shared HTTP client"""
+        await self.client.aclose()
+
+    def _max_results(self, provider: str) -> int:
+        """Get the result cap of a provider"""
+        return max(1, self.max_results.get(provider, self.default_max_results))
+
+    async def _run_provider(self, provider: str, search: Awaitable[List[Source]]) -> List[Source]:
+        """
+        Run a provider search under its timeout and result cap.
+
+        Args:
+            provider (str): Provider name
+            search (Awaitable[List[Source]]): The provider request
+
+        Returns:
+            List[Source]: The capped results
+
+        Raises:
+            SearchProviderError: If the provider failed or timed out, so that the
+                failure is not mistaken for (and cached as) an empty result
+        """
+        timeout = self.timeouts.get(provider, self.default_timeout)
+        try:
+            sources = (await asyncio.wait_for(search, timeout=timeout))[:self._max_results(provider)]
+        except asyncio.TimeoutError as e:
+            logger.warning(f"{provider} search timed out after {timeout:.1f}s")
+            raise SearchProviderError(f"{provider} search timed out after {timeout:.1f}s") from e
+        except Exception as e:
+            logger.error(f"{provider} search error: {str(e)}")
+            raise SearchProviderError(f"{provider} search error: {str(e)}") from e
+        logger.info(f"{provider} search completed. Found {len(sources)} results")
+        return sources
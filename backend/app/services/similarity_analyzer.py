@@ -2,22 +2,39 @@
 Similarity analyzer for fact-checking.
 
 This module provides functionality to analyze similarity between claims
-and sources using GPT and basic text comparison methods.
+and sources using GPT and basic text comparison methods. A cheap lexical
+scorer runs first: pairs it scores as clearly supported or clearly
+unrelated are decided locally, and only the ambiguous middle band is
+escalated to GPT. Tokens come from the shared token cache, so each claim
+and source is tokenized once and the overlaps of a whole claim × source
+matrix are computed in one batched operation.
 """
 
+import asyncio
 import logging
-import jieba
 import json
 import re
-from typing import Dict
+import numpy as np
+from typing import Dict, List, Optional, Set, Tuple
 from openai import AsyncOpenAI
+from ..core.config import get_settings
 from ..models.schemas import Source
+from .claim_clusterer import _NUMBER_PATTERN, negation_words
+from .claim_normalizer import normalize_claim
+from .request_stats import record_stat
+from .token_budget import estimate_tokens, truncate_to_tokens
+from .token_cache import content_tokens, get_token_cache
 
 logger = logging.getLogger(__name__)
 
 class SimilarityAnalyzer:
     """Analyzes similarity between claims and sources."""
     
+    # Estimated size of the batched prompt without claims and snippets
+    _BATCH_PROMPT_TOKENS = 400
+    # Smallest snippet budget used when the claims alone exhaust the budget
+    _MIN_SNIPPET_TOKENS = 200
+    
     def __init__(self, openai_client: AsyncOpenAI):
         """
         Initialize the similarity analyzer.
@@ -26,12 +43,16 @@ class SimilarityAnalyzer:
             openai_client (AsyncOpenAI): OpenAI client instance
         """
         self.openai_client = openai_client
-        # Initialize jieba for Chinese text processing
-        jieba.initialize()
+        self.token_cache = get_token_cache()
+        settings = get_settings()
+        self.cascade_enabled = settings.SIMILARITY_CASCADE_ENABLED
+        self.cascade_support_threshold = settings.SIMILARITY_CASCADE_SUPPORT_THRESHOLD
+        self.cascade_reject_threshold = settings.SIMILARITY_CASCADE_REJECT_THRESHOLD
     
     async def analyze_similarity(self, claim: str, source: Source) -> Dict:
         """
-        Analyze similarity between a claim and a source using GPT.
+        Analyze similarity between a claim and a source, escalating to GPT
+        only if the lexical scorer cannot decide the pair.
         
         Args:
             claim (str): The claim to verify
@@ -40,12 +61,98 @@ class SimilarityAnalyzer:
         Returns:
             Dict: Analysis results including similarity score and explanation
         """
+        analysis = self.decide_locally(claim, source)
+        if analysis is not None:
+            return analysis
         try:
             return await self._analyze_with_gpt(claim, source)
         except Exception as e:
             logger.error(f"Error in GPT similarity analysis: {str(e)}")
             return self._analyze_with_basic_methods(claim, source)
     
+    def lexical_score(self, claim: str, source: Source) -> float:
+        """
+        Score a pair by the share of the claim's content tokens found in the source.
+        
+        Args:
+            claim (str): The claim to verify
+            source (Source): The source to check against
+            
+        Returns:
+            float: Token coverage between 0 and 1
+        """
+        claim_ids = self.token_cache.token_ids(claim)
+        if not claim_ids.size:
+            return 0.0
+        return self.token_cache.overlap(claim, source.snippet) / claim_ids.size
+    
+    def lexical_scores(self, claims: List[str], sources: List[Source]) -> np.ndarray:
+        """
+        Score every claim against every source by token coverage in one batched operation.
+        
+        Args:
+            claims (List[str]): The claims to verify
+            sources (List[Source]): The sources to check against
+            
+        Returns:
+            np.ndarray: Coverage matrix indexed by claim, then by source
+        """
+        return self.token_cache.coverage_matrix(claims, [source.snippet for source in sources])
+    
+    def decide_locally(self, claim: str, source: Source, score: Optional[float] = None) -> Optional[Dict]:
+        """
+        Decide a pair with the lexical scorer if it falls outside the ambiguous band.
+        
+        Pairs scoring at least SIMILARITY_CASCADE_SUPPORT_THRESHOLD count as
+        supported, provided the source states the claim's numbers and the same
+        negations (a source saying "X did not do Y" covers every keyword of
+        "X did Y"). Pairs scoring at most SIMILARITY_CASCADE_REJECT_THRESHOLD
+        count as unrelated; everything else needs the LLM.
+        
+        Args:
+            claim (str): The claim to verify
+            source (Source): The source to check against
+            score (Optional[float]): Precomputed lexical score of the pair
+            
+        Returns:
+            Optional[Dict]: Analysis results, or None if the pair must be escalated
+        """
+        if not self.cascade_enabled:
+            return None
+        
+        score = float(self.lexical_score(claim, source) if score is None else score)
+        if score >= self.cascade_support_threshold and self._states_same_facts(claim, source.snippet):
+            explanation = f"来源包含声明中 {score:.0%} 的关键词，本地判定为支持，未调用模型"
+        elif score <= self.cascade_reject_threshold:
+            explanation = f"来源仅包含声明中 {score:.0%} 的关键词，本地判定为无关，未调用模型"
+        else:
+            record_stat("similarity_pairs_escalated")
+            return None
+        
+        record_stat("similarity_pairs_local")
+        logger.info(f"本地相似度判定: 分数={score:.2f}, 来源={source.title}")
+        return {
+            "similarity_score": score,
+            "is_supporting": score > 0.3,
+            "explanation": explanation
+        }
+    
+    @staticmethod
+    def _states_same_facts(claim: str, snippet: str) -> bool:
+        """
+        Check that a snippet contains the claim's numbers and the same negations.
+        
+        Both texts are compared after normalize_claim, which expands English
+        contractions ("don't" to "do not"). A negation anywhere in the snippet
+        that the claim lacks, including a Chinese verb with a negating prefix
+        ("未能", "无法"), counts as a difference, so that the pair is left to
+        the LLM rather than supported locally.
+        """
+        claim_key, snippet_key = normalize_claim(claim), normalize_claim(snippet)
+        if not set(_NUMBER_PATTERN.findall(claim_key)) <= set(_NUMBER_PATTERN.findall(snippet_key)):
+            return False
+        return negation_words(content_tokens(claim_key)) == negation_words(content_tokens(snippet_key))
+    
     async def _analyze_with_gpt(self, claim: str, source: Source) -> Dict:
         """
         Analyze similarity using GPT.
@@ -110,31 +217,298 @@ class SimilarityAnalyzer:
                 else:
                     raise ValueError("No valid JSON object found in response")
 
-            # Validate the required fields
-            required_fields = ["similarity_score", "is_supporting", "explanation"]
-            if not all(field in analysis for field in required_fields):
-                missing = [f for f in required_fields if f not in analysis]
-                raise ValueError(f"Missing required fields: {missing}")
-            
-            # Ensure proper types
-            analysis["similarity_score"] = float(analysis["similarity_score"])
-            analysis["is_supporting"] = bool(analysis["is_supporting"])
-            analysis["explanation"] = str(analysis["explanation"])
-
-            # Ensure score is within bounds
-            analysis["similarity_score"] = max(0.0, min(1.0, analysis["similarity_score"]))
+            analysis = self._validate_analysis(analysis)
 
         except Exception as e:
             logger.error(f"Failed to parse GPT response: {str(e)}")
             logger.error(f"Raw content: {content}")
             return self._analyze_with_basic_methods(claim, source)
         
+        return self._finalize_analysis(claim, source, analysis)
+    
+    async def analyze_similarity_batch(
+        self,
+        claims: List[str],
+        sources: List[Source],
+        semaphore: Optional[asyncio.Semaphore] = None
+    ) -> List[List[Dict]]:
+        """
+        Analyze every claim against every source with packed GPT requests.
+        
+        Pairs the lexical scorer can decide are not sent to GPT. The remaining
+        source snippets are packed into as few requests as the configured
+        token budget allows, and several claims can share one request.
+        Entries that are missing or invalid in a response fall back to
+        basic methods individually.
+        
+        Args:
+            claims (List[str]): The claims to verify
+            sources (List[Source]): The sources to check against
+            semaphore (Optional[asyncio.Semaphore]): Limits the number of in-flight requests
+            
+        Returns:
+            List[List[Dict]]: Analysis results indexed by claim, then by source
+        """
+        results: List[List[Optional[Dict]]] = [[None] * len(sources) for _ in claims]
+        if not claims or not sources:
+            return results
+        
+        pending = set()
+        lexical_scores = self.lexical_scores(claims, sources) if self.cascade_enabled else None
+        for ci, claim in enumerate(claims):
+            for si, source in enumerate(sources):
+                if lexical_scores is not None:
+                    results[ci][si] = self.decide_locally(claim, source, lexical_scores[ci, si])
+                if results[ci][si] is None:
+                    pending.add((ci, si))
+        if not pending:
+            return results
+        
+        batches = self._plan_batches(claims, sources, pending)
+        logger.info(f"批量相似度分析: {len(claims)} 个声明 × {len(sources)} 个来源, 共 {len(batches)} 个请求")
+        
+        async def run_batch(claim_ids: List[int], source_ids: List[int]):
+            if semaphore is None:
+                return await self._analyze_batch_with_gpt(claims, sources, claim_ids, source_ids)
+            async with semaphore:
+                return await self._analyze_batch_with_gpt(claims, sources, claim_ids, source_ids)
+        
+        batch_results = await asyncio.gather(
+            *[run_batch(claim_ids, source_ids) for claim_ids, source_ids in batches],
+            return_exceptions=True
+        )
+        
+        for (claim_ids, source_ids), batch_result in zip(batches, batch_results):
+            if isinstance(batch_result, BaseException):
+                logger.error(f"Error in batched GPT similarity analysis: {str(batch_result)}")
+                batch_result = {}
+            for ci in claim_ids:
+                for si in source_ids:
+                    if (ci, si) not in pending:
+                        continue
+                    analysis = batch_result.get((ci, si))
+                    if analysis is None:
+                        analysis = self._analyze_with_basic_methods(claims[ci], sources[si])
+                    results[ci][si] = analysis
+        
+        return results
+    
+    def _plan_batches(
+        self,
+        claims: List[str],
+        sources: List[Source],
+        pending: Set[Tuple[int, int]]
+    ) -> List[Tuple[List[int], List[int]]]:
+        """
+        Split the claim × source matrix into requests that fit the token budget.
+        
+        Args:
+            claims (List[str]): The claims to verify
+            sources (List[Source]): The sources to check against
+            pending (Set[Tuple[int, int]]): (claim index, source index) pairs that need GPT
+            
+        Returns:
+            List[Tuple[List[int], List[int]]]: Claim indices and source indices for each request
+        """
+        max_claims = max(1, get_settings().SIMILARITY_BATCH_MAX_CLAIMS)
+        
+        batches = []
+        for group_start in range(0, len(claims), max_claims):
+            claim_ids = list(range(group_start, min(group_start + max_claims, len(claims))))
+            # Only sources with at least one undecided pair in the group are sent
+            source_ids = [si for si in range(len(sources)) if any((ci, si) in pending for ci in claim_ids)]
+            for chunk in self.plan_source_chunks([claims[ci] for ci in claim_ids], [sources[si] for si in source_ids]):
+                batches.append((claim_ids, [source_ids[i] for i in chunk]))
+        return batches
+    
+    def plan_source_chunks(self, claims: List[str], sources: List[Source]) -> List[List[int]]:
+        """
+        Split sources into chunks that fit one batched request together with the claims.
+        
+        Args:
+            claims (List[str]): The claims packed into every request
+            sources (List[Source]): The sources to check against, in scoring order
+            
+        Returns:
+            List[List[int]]: Source indices for each request
+        """
+        budget = get_settings().SIMILARITY_BATCH_TOKEN_BUDGET
+        claims_tokens = sum(estimate_tokens(claim) + 8 for claim in claims)
+        available = max(budget - self._BATCH_PROMPT_TOKENS - claims_tokens, self._MIN_SNIPPET_TOKENS)
+        
+        chunks = []
+        source_ids: List[int] = []
+        used = 0
+        for si, source in enumerate(sources):
+            cost = min(estimate_tokens(source.snippet), available) + 8
+            if source_ids and used + cost > available:
+                chunks.append(source_ids)
+                source_ids, used = [], 0
+            source_ids.append(si)
+            used += cost
+        if source_ids:
+            chunks.append(source_ids)
+        return chunks
+    
+    async def _analyze_batch_with_gpt(
+        self,
+        claims: List[str],
+        sources: List[Source],
+        claim_ids: List[int],
+        source_ids: List[int]
+    ) -> Dict[Tuple[int, int], Dict]:
+        """
+        Analyze a packed group of claims and sources with a single GPT request.
+        
+        Args:
+            claims (List[str]): All claims of the request
+            sources (List[Source]): All sources of the request
+            claim_ids (List[int]): Indices of the claims packed into this request
+            source_ids (List[int]): Indices of the sources packed into this request
+            
+        Returns:
+            Dict[Tuple[int, int], Dict]: Valid analysis results keyed by (claim index, source index)
+        """
+        settings = get_settings()
+        claims_tokens = sum(estimate_tokens(claims[ci]) + 8 for ci in claim_ids)
+        snippet_budget = max(
+            settings.SIMILARITY_BATCH_TOKEN_BUDGET - self._BATCH_PROMPT_TOKENS - claims_tokens,
+            self._MIN_SNIPPET_TOKENS
+        )
+        
+        claims_block = "\n".join(f"[C{ci}] {claims[ci]}" for ci in claim_ids)
+        sources_block = "\n".join(
+            f"[S{si}] {truncate_to_tokens(sources[si].snippet, snippet_budget)}" for si in source_ids
+        )
+        prompt = f"""请逐一分析以下每个声明与每个来源文本之间的相似度和关系。
+        请仔细分析以下几个方面：
+        1. 核心信息是否相似（即使表达方式不同）
+        2. 关键词和概念的重叠程度
+        3. 语义上的关联性
+        4. 是否存在支持或反驳关系
+        
+        请返回一个JSON数组，每个声明与每个来源的组合对应一个元素：
+        [
+            {{
+                "claim_id": string,           // 声明编号，例如 "C0"
+                "source_id": string,          // 来源编号，例如 "S0"
+                "similarity_score": float (0-1),
+                "is_supporting": boolean,
+                "explanation": string         // 用中文简要解释相似度评分的原因
+            }}
+        ]
+
+        声明：
+        {claims_block}
+
+        来源：
+        {sources_block}
+
+        请只返回JSON数组，不要包含其他文本。"""
+
+        expected_entries = len(claim_ids) * len(source_ids)
+        response = await self.openai_client.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[
+                {
+                    "role": "system",
+                    "content": "你是一个事实核查助手。请仔细分析文本之间的相似度，即使表达方式不同，只要核心信息相似就应该给出较高的相似度分数。请用中文解释你的分析。请确保返回的是有效的JSON格式。"
+                },
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.3,
+            max_tokens=min(4000, 100 + expected_entries * settings.SIMILARITY_BATCH_TOKENS_PER_ENTRY)
+        )
+        
+        content = response.choices[0].message.content.strip()
+        logger.debug(f"GPT batched similarity analysis response: {content}")
+        
+        if content.startswith('```'):
+            content = content.replace('```json', '').replace('```', '').strip()
+        try:
+            entries = json.loads(content)
+        except json.JSONDecodeError:
+            json_match = re.search(r'\[.*\]', content, re.DOTALL)
+            if not json_match:
+                logger.error(f"No JSON array found in batched GPT response: {content}")
+                return {}
+            entries = json.loads(json_match.group(0))
+        if not isinstance(entries, list):
+            logger.error("Batched GPT response is not a JSON array")
+            return {}
+        
+        wanted = {(ci, si) for ci in claim_ids for si in source_ids}
+        results = {}
+        for entry in entries:
+            try:
+                key = (self._parse_entry_id(entry["claim_id"], "C"), self._parse_entry_id(entry["source_id"], "S"))
+                if key not in wanted or key in results:
+                    continue
+                analysis = self._validate_analysis(entry)
+                results[key] = self._finalize_analysis(claims[key[0]], sources[key[1]], analysis)
+            except Exception as e:
+                logger.warning(f"Skipping invalid batched similarity entry {entry}: {str(e)}")
+                continue
+        
+        if len(results) < expected_entries:
+            logger.warning(f"批量响应缺少 {expected_entries - len(results)} 个有效条目，将使用基本方法补齐")
+        return results
+    
+    @staticmethod
+    def _parse_entry_id(value, prefix: str) -> int:
+        """Parse an id such as "C3" or "S12" from a batched response entry."""
+        text = str(value).strip().strip('[]').upper()
+        if text.startswith(prefix):
+            text = text[len(prefix):]
+        return int(text)
+    
+    @staticmethod
+    def _validate_analysis(analysis: Dict) -> Dict:
+        """
+        Validate the fields of a GPT analysis and coerce them to proper types.
+        
+        Args:
+            analysis (Dict): Parsed analysis object
+            
+        Returns:
+            Dict: Analysis with similarity_score, is_supporting and explanation
+        """
+        if not isinstance(analysis, dict):
+            raise ValueError("Analysis is not a JSON object")
+        
+        # Validate the required fields
+        required_fields = ["similarity_score", "is_supporting", "explanation"]
+        if not all(field in analysis for field in required_fields):
+            missing = [f for f in required_fields if f not in analysis]
+            raise ValueError(f"Missing required fields: {missing}")
+        
+        # Ensure proper types and keep the score within bounds
+        return {
+            "similarity_score": max(0.0, min(1.0, float(analysis["similarity_score"]))),
+            "is_supporting": bool(analysis["is_supporting"]),
+            "explanation": str(analysis["explanation"])
+        }
+    
+    def _finalize_analysis(self, claim: str, source: Source, analysis: Dict) -> Dict:
+        """
+        Apply keyword-overlap adjustments to a validated GPT analysis.
+        
+        Scores below 0.3 are raised by 0.1 per content word the claim shares
+        with the source, up to 0.5. As in _analyze_with_basic_methods, only
+        content words from the token cache count.
+        
+        Args:
+            claim (str): The claim that was verified
+            source (Source): The source it was checked against
+            analysis (Dict): Validated analysis results
+            
+        Returns:
+            Dict: Adjusted analysis results
+        """
         # 如果相似度分数过低，但确实存在相关表达，适当提高分数
         if analysis["similarity_score"] < 0.3:
-            # 使用jieba分词检查关键词重叠
-            claim_words = set(jieba.lcut(claim))
-            source_words = set(jieba.lcut(source.snippet))
-            overlap = len(claim_words.intersection(source_words))
+            # 使用缓存的分词结果检查关键词重叠
+            overlap = self.token_cache.overlap(claim, source.snippet)
             if overlap > 0:
                 # 根据重叠词数量适当提高分数
                 analysis["similarity_score"] = min(0.5, analysis["similarity_score"] + (overlap * 0.1))
@@ -152,6 +526,12 @@ class SimilarityAnalyzer:
         """
         Analyze similarity using basic text comparison methods.
         
+        The score is 0.1 per content word the claim shares with the source,
+        up to 0.5. Content words come from the token cache, so shared
+        punctuation, whitespace and stopwords ("的", "the") no longer count
+        as they did when the raw jieba tokens were compared: a pair sharing
+        only "的" and "。" now scores 0.0 instead of 0.2.
+        
         Args:
             claim (str): The claim to verify
             source (Source): The source to check against
@@ -159,10 +539,8 @@ class SimilarityAnalyzer:
         Returns:
             Dict: Basic analysis results
         """
-        # 使用jieba分词检查关键词重叠
-        claim_words = set(jieba.lcut(claim))
-        source_words = set(jieba.lcut(source.snippet))
-        overlap = len(claim_words.intersection(source_words))
+        # 使用缓存的分词结果检查关键词重叠
+        overlap = self.token_cache.overlap(claim, source.snippet)
         
         # 计算基本相似度分数
         similarity = min(0.5, overlap * 0.1)  # 每个重叠词贡献0.1分，最高0.5分
@@ -174,4 +552,5 @@ class SimilarityAnalyzer:
         }
         
         logger.info(f"使用基本相似度计算的结果: 分数={result['similarity_score']:.2f}, 是否支持={result['is_supporting']}")
-        return result 
\ No newline at end of file
+        return result 
+    
@@ -0,0 +1,223 @@
+"""
+Single-flight request coalescing.
+
+This module lets concurrent callers with the same request key share one
+in-flight call instead of issuing duplicates. Unlike the response caches,
+it takes effect before the first response exists, e.g. when many
+requests check the same viral story at the same moment. The shared call
+is cancelled only once every caller waiting for it has gone away.
+
+CoalescedChatClient puts this layer in front of an AsyncOpenAI client;
+streamed completions are broadcast to every caller, with late joiners
+replaying the chunks received so far.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+from types import SimpleNamespace
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, TypeVar
+from ..core.config import get_settings
+from .request_stats import record_stat
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class _Call:
+    """An in-flight call and the number of callers waiting for it."""
+
+    def __init__(self, task: asyncio.Future):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into one shared call."""
+
+    def __init__(self, name: str):
+        """
+        Initialize a single-flight group.
+
+        Args:
+            name (str): Name of the group, used for the "<name>_coalesced" request stat
+        """
+        self.name = name
+        self._calls: Dict[Hashable, _Call] = {}
+
+    @property
+    def in_flight(self) -> int:
+        """Number of distinct calls currently running."""
+        return len(self._calls)
+
+    async def do(self, key: Hashable, factory: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run a call, or join the in-flight call with the same key.
+
+        The result or exception of the shared call is delivered to every
+        caller. A caller being cancelled only cancels the shared call if
+        no other caller is still waiting for it.
+
+        Args:
+            key (Hashable): Request key; equal keys must mean equivalent calls
+            factory (Callable[[], Awaitable[T]]): Starts the call when none is in flight
+
+        Returns:
+            T: The result of the shared call
+        """
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(factory()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+        else:
+            record_stat(f"{self.name}_coalesced")
+            logger.debug(f"Joined in-flight {self.name} call")
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # Forget the call first so that a new caller starts a fresh one
+                self._forget(key, call)
+                call.task.cancel()
+
+    def _forget(self, key: Hashable, call: _Call) -> None:
+        """Remove a call from the in-flight table if it is still the current one."""
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+
+class _Broadcast:
+    """Fans one streamed chat completion out to several subscribers."""
+
+    def __init__(self, opener: Callable[[], Awaitable[Any]], on_close: Callable[[], None]):
+        """
+        Start pumping a stream.
+
+        Args:
+            opener (Callable[[], Awaitable[Any]]): Opens the upstream stream
+            on_close (Callable[[], None]): Called once new callers must no longer join
+        """
+        self._chunks: List[Any] = []
+        self._error: Optional[BaseException] = None
+        self._done = False
+        self._changed = asyncio.Event()
+        self._subscribers = 0
+        self._on_close = on_close
+        self._task = asyncio.ensure_future(self._pump(opener))
+
+    def subscribe(self):
+        """
+        Subscribe to the stream.
+
+        Returns:
+            An async iterator over every chunk of the stream, starting from the first
+        """
+        self._subscribers += 1
+        return self._iterate()
+
+    async def _pump(self, opener: Callable[[], Awaitable[Any]]) -> None:
+        """Read the upstream stream into the shared chunk buffer."""
+        try:
+            async for chunk in await opener():
+                self._chunks.append(chunk)
+                self._notify()
+        except asyncio.CancelledError:
+            self._error = asyncio.CancelledError()
+            raise
+        except Exception as e:
+            self._error = e
+        finally:
+            self._done = True
+            self._notify()
+            self._on_close()
+
+    def _notify(self) -> None:
+        """Wake the subscribers waiting for the next chunk."""
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def _iterate(self):
+        """Yield the buffered chunks, then the new ones as they arrive."""
+        position = 0
+        try:
+            while True:
+                if position < len(self._chunks):
+                    position += 1
+                    yield self._chunks[position - 1]
+                elif self._done:
+                    if self._error is not None:
+                        raise self._error
+                    return
+                else:
+                    await self._changed.wait()
+        finally:
+            self._subscribers -= 1
+            if self._subscribers == 0 and not self._task.done():
+                # Detach first so that a new caller opens a fresh stream
+                self._on_close()
+                self._task.cancel()
+
+
+class CoalescedChatClient:
+    """AsyncOpenAI-compatible client that coalesces identical in-flight chat completions."""
+
+    def __init__(self, client):
+        """
+        Initialize the coalesced client.
+
+        Args:
+            client (AsyncOpenAI): Client used for the shared calls
+        """
+        self._client = client
+        self._flights = SingleFlight("llm_requests")
+        self._streams: Dict[str, _Broadcast] = {}
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    async def _create(self, **params):
+        """Run chat.completions.create, sharing identical in-flight requests."""
+        key = hashlib.sha256(
+            json.dumps(params, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")
+        ).hexdigest()
+        if not params.get("stream"):
+            return await self._flights.do(key, lambda: self._client.chat.completions.create(**params))
+
+        broadcast = self._streams.get(key)
+        if broadcast is None:
+            broadcast = _Broadcast(
+                lambda: self._client.chat.completions.create(**params),
+                lambda: self._forget_stream(key, broadcast)
+            )
+            self._streams[key] = broadcast
+        else:
+            record_stat("llm_requests_coalesced")
+            logger.debug("Joined in-flight streamed completion")
+        return broadcast.subscribe()
+
+    def _forget_stream(self, key: str, broadcast: _Broadcast) -> None:
+        """Remove a finished broadcast if it is still the current one."""
+        if self._streams.get(key) is broadcast:
+            del self._streams[key]
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+def coalesced_client(client):
+    """
+    Wrap a client with single-flight coalescing if it is enabled.
+
+    Args:
+        client (AsyncOpenAI): Client to wrap
+
+    Returns:
+        The coalesced client, or the original client when coalescing is disabled
+    """
+    if not get_settings().SINGLE_FLIGHT_ENABLED:
+        return client
+    return CoalescedChatClient(client)
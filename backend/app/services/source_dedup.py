@@ -0,0 +1,154 @@
+"""
+Near-duplicate source collapsing.
+
+This module fingerprints candidate sources with 64-bit SimHash over
+character shingles of their snippet and abstract, finds near-duplicates
+(e.g. the same wire story from several outlets) through banded
+locality-sensitive hashing, and keeps one representative per cluster.
+The links of the collapsed sources are attached to the representative.
+"""
+
+import logging
+import re
+import unicodedata
+import zlib
+from typing import Dict, List, Optional, Tuple
+from ..core.config import get_settings
+from ..models.schemas import Source
+from .confidence_calculator import SOURCE_TYPE_MULTIPLIERS
+from .request_stats import record_stat
+
+logger = logging.getLogger(__name__)
+
+FINGERPRINT_BITS = 64
+_MASK = (1 << FINGERPRINT_BITS) - 1
+_WHITESPACE_PATTERN = re.compile(r'\s+')
+
+
+def simhash(text: str, shingle_size: int = 3) -> Optional[int]:
+    """
+    Compute the 64-bit SimHash of a text.
+
+    Args:
+        text (str): Text to fingerprint
+        shingle_size (int): Length of the character shingles
+
+    Returns:
+        Optional[int]: The fingerprint, or None if the text is too short to shingle
+    """
+    text = _WHITESPACE_PATTERN.sub(" ", unicodedata.normalize("NFKC", text or "").lower()).strip()
+    shingles = {text[i:i + shingle_size] for i in range(len(text) - shingle_size + 1)}
+    if not shingles:
+        return None
+
+    weights = [0] * FINGERPRINT_BITS
+    for shingle in shingles:
+        data = shingle.encode("utf-8")
+        # Two 32-bit CRCs with different seeds make one 64-bit shingle hash
+        value = (zlib.crc32(data) << 32 | zlib.crc32(data, 0x9E3779B9)) & _MASK
+        for bit in range(FINGERPRINT_BITS):
+            weights[bit] += 1 if value >> bit & 1 else -1
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+class SourceDeduplicator:
+    """Collapses near-duplicate candidate sources into one representative each."""
+
+    def __init__(self):
+        """Initialize the deduplicator from the application settings."""
+        settings = get_settings()
+        self.enabled = settings.SOURCE_DEDUP_ENABLED
+        self.max_distance = min(max(0, settings.SOURCE_DEDUP_MAX_HAMMING), FINGERPRINT_BITS // 4)
+        self.shingle_size = max(1, settings.SOURCE_DEDUP_SHINGLE_SIZE)
+        # With max_distance + 1 bands, two fingerprints within max_distance bits
+        # agree on at least one whole band (pigeonhole), so no pair is missed
+        self.num_bands = self.max_distance + 1
+
+    def collapse(self, claim_sources: List[List[Source]]) -> List[List[Source]]:
+        """
+        Collapse near-duplicates within each claim's candidate sources.
+
+        Claims sharing a source list keep sharing the collapsed list.
+
+        Args:
+            claim_sources (List[List[Source]]): Candidate sources for each claim
+
+        Returns:
+            List[List[Source]]: Candidate sources for each claim with one
+                representative per near-duplicate cluster, in retrieval order
+        """
+        if not self.enabled:
+            return claim_sources
+
+        collapsed: Dict[int, List[Source]] = {}
+        for sources in claim_sources:
+            if id(sources) not in collapsed:
+                collapsed[id(sources)] = self.collapse_sources(sources)
+        return [collapsed[id(sources)] for sources in claim_sources]
+
+    def collapse_sources(self, sources: List[Source]) -> List[Source]:
+        """
+        Collapse near-duplicates in one list of sources.
+
+        The representative of a cluster is its source with the highest type
+        multiplier (academic, government), then the earliest retrieved one.
+        It is returned as a copy carrying the links of the other members.
+
+        Args:
+            sources (List[Source]): Candidate sources in retrieval order
+
+        Returns:
+            List[Source]: One source per cluster, ordered by its first member
+        """
+        if len(sources) < 2:
+            return sources
+
+        fingerprints = [simhash(self._source_text(source), self.shingle_size) for source in sources]
+        parents = list(range(len(sources)))
+
+        def find(index: int) -> int:
+            while parents[index] != index:
+                parents[index] = parents[parents[index]]
+                index = parents[index]
+            return index
+
+        # Only sources sharing a band are compared, keeping the stage roughly linear
+        band_bits = FINGERPRINT_BITS // self.num_bands
+        buckets: Dict[Tuple[int, int], List[int]] = {}
+        for index, fingerprint in enumerate(fingerprints):
+            if fingerprint is None:
+                continue
+            for band in range(self.num_bands):
+                key = (band, fingerprint >> (band * band_bits) & ((1 << band_bits) - 1))
+                for other in buckets.setdefault(key, []):
+                    if find(other) != find(index) and bin(fingerprint ^ fingerprints[other]).count("1") <= self.max_distance:
+                        parents[find(index)] = find(other)
+                buckets[key].append(index)
+
+        clusters: Dict[int, List[int]] = {}
+        for index in range(len(sources)):
+            clusters.setdefault(find(index), []).append(index)
+        if len(clusters) == len(sources):
+            return sources
+
+        result = []
+        for members in sorted(clusters.values(), key=lambda members: members[0]):
+            representative = max(
+                members, key=lambda index: (SOURCE_TYPE_MULTIPLIERS.get(sources[index].source_type, 1.0), -index)
+            )
+            if len(members) == 1:
+                result.append(sources[representative])
+                continue
+            duplicate_links = [str(sources[index].link) for index in members if index != representative]
+            result.append(sources[representative].model_copy(update={
+                "duplicate_links": (sources[representative].duplicate_links or []) + duplicate_links
+            }))
+
+        record_stat("sources_collapsed", len(sources) - len(result))
+        logger.info(f"Collapsed {len(sources)} candidate sources into {len(result)} distinct sources")
+        return result
+
+    @staticmethod
+    def _source_text(source: Source) -> str:
+        """Get the text a source is fingerprinted on."""
+        return f"{source.snippet} {source.abstract or ''}"
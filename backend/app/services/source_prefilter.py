@@ -0,0 +1,128 @@
+"""
+Vector pre-ranking of candidate sources.
+
+This module scores every claim against its candidate sources with a
+local, network-free vectorizer (hashed character n-gram TF-IDF, which
+works for both Chinese and English) and forwards only the most similar
+sources of each claim to the LLM similarity analysis.
+"""
+
+import logging
+import math
+import re
+import unicodedata
+import zlib
+import numpy as np
+from collections import Counter
+from typing import Dict, List, Tuple
+from ..core.config import get_settings
+from ..models.schemas import Source
+from .request_stats import record_stat
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE_PATTERN = re.compile(r'\s+')
+
+class SourcePrefilter:
+    """Keeps the top-k most similar candidate sources per claim."""
+
+    def __init__(self):
+        """Initialize the prefilter from the application settings."""
+        settings = get_settings()
+        self.enabled = settings.PRERANK_ENABLED
+        self.top_k = max(1, settings.PRERANK_TOP_K)
+        self.floor = settings.PRERANK_MIN_SIMILARITY
+        self.min_sources = max(0, settings.PRERANK_MIN_SOURCES)
+        self.dimensions = max(16, settings.PRERANK_HASH_DIMENSIONS)
+        self.ngram_sizes = (2, 3)
+
+    def vectorize(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed texts as L2-normalized hashed character n-gram TF-IDF vectors.
+
+        The IDF weights are computed over the given texts.
+
+        Args:
+            texts (List[str]): Texts to embed
+
+        Returns:
+            np.ndarray: float32 matrix with one row per text
+        """
+        matrix = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            counts = Counter(zlib.crc32(gram.encode("utf-8")) % self.dimensions for gram in self._ngrams(text))
+            for column, count in counts.items():
+                matrix[row, column] = 1 + math.log(count)
+
+        document_frequency = np.count_nonzero(matrix, axis=0)
+        matrix *= np.log((1 + len(texts)) / (1 + document_frequency)) + 1
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.where(norms == 0, 1, norms)
+
+    def prerank(self, claims: List[str], claim_sources: List[List[Source]]) -> List[List[Source]]:
+        """
+        Keep the candidate sources worth an LLM similarity call for each claim.
+
+        A claim keeps at most PRERANK_TOP_K sources, all with a cosine
+        similarity of at least PRERANK_MIN_SIMILARITY; if none reach the
+        floor, its PRERANK_MIN_SOURCES best sources are kept anyway (e.g.
+        for sources in another language). Claims that shared a source list
+        and keep the same sources still share one list.
+
+        Args:
+            claims (List[str]): Claim texts
+            claim_sources (List[List[Source]]): Candidate sources for each claim
+
+        Returns:
+            List[List[Source]]: Kept sources for each claim, most similar first
+        """
+        if not self.enabled or not claims:
+            return claim_sources
+
+        # Embed each distinct source once, together with the claims
+        source_rows: Dict[int, int] = {}
+        unique_sources: List[Source] = []
+        for sources in claim_sources:
+            for source in sources:
+                if id(source) not in source_rows:
+                    source_rows[id(source)] = len(unique_sources)
+                    unique_sources.append(source)
+        if not unique_sources:
+            return claim_sources
+
+        vectors = self.vectorize(list(claims) + [self._source_text(source) for source in unique_sources])
+        similarity = vectors[:len(claims)] @ vectors[len(claims):].T
+
+        kept_lists: Dict[Tuple[int, Tuple[int, ...]], List[Source]] = {}
+        result = []
+        dropped = 0
+        for claim_index, sources in enumerate(claim_sources):
+            scores = similarity[claim_index, [source_rows[id(source)] for source in sources]]
+            order = [int(i) for i in np.argsort(-scores, kind="stable")]
+            keep = [i for i in order[:self.top_k] if scores[i] >= self.floor]
+            if len(keep) < self.min_sources:
+                keep = order[:self.min_sources]
+            dropped += len(sources) - len(keep)
+            key = (id(sources), tuple(keep))
+            if key not in kept_lists:
+                kept_lists[key] = [sources[i] for i in keep]
+            result.append(kept_lists[key])
+
+        if dropped:
+            record_stat("similarity_pairs_prefiltered", dropped)
+            logger.info(
+                f"Pre-ranking kept {sum(len(sources) for sources in result)} of "
+                f"{sum(len(sources) for sources in claim_sources)} claim-source pairs, "
+                f"avoiding {dropped} LLM similarity evaluations"
+            )
+        return result
+
+    def _ngrams(self, text: str) -> List[str]:
+        """Get the character n-grams of a normalized text."""
+        text = _WHITESPACE_PATTERN.sub(" ", unicodedata.normalize("NFKC", text or "").lower()).strip()
+        return [text[i:i + n] for n in self.ngram_sizes for i in range(len(text) - n + 1)]
+
+    @staticmethod
+    def _source_text(source: Source) -> str:
+        """Get the text a source is compared on."""
+        return f"{source.title} {source.snippet} {source.abstract or ''}"
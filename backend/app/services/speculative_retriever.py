@@ -0,0 +1,191 @@
+"""
+Speculative evidence retrieval.
+
+This module starts source searches from cheap sentence-level claim
+candidates while the LLM claim extraction is still running, and reuses
+or cancels those searches once the real claims are known. Claims that
+are streamed out of the extraction get searches of their own right away,
+before extraction has finished. All searches
+go through the request's ClaimRetrieval stage, so they share its
+concurrency limit and search budget.
+"""
+
+import asyncio
+import logging
+import re
+from typing import Dict, List, Set
+from ..core.config import get_settings
+from ..models.schemas import Source
+from .claim_extractor import ClaimExtractor
+from .claim_retrieval import ClaimRetrieval
+from .token_cache import content_tokens
+
+logger = logging.getLogger(__name__)
+
+# Sentences or clauses containing numbers are the most likely to become claims
+_NUMERIC_PATTERN = re.compile(r'\d')
+# Runs of capitalized words, e.g. "World Health Organization"
+_ENTITY_PATTERN = re.compile(r'\b[A-Z][\w-]*(?:\s+(?:of\s+|the\s+)?[A-Z][\w-]*)+')
+_CLAUSE_PATTERN = re.compile(r'[，,；;：:]')
+
+class SpeculativeRetrieval:
+    """Runs evidence searches ahead of claim extraction for a single request."""
+
+    def __init__(self, retrieval: ClaimRetrieval, claim_extractor: ClaimExtractor):
+        """
+        Initialize the speculative retrieval stage.
+
+        Args:
+            retrieval (ClaimRetrieval): Retrieval stage used to run the searches
+            claim_extractor (ClaimExtractor): Extractor providing the cheap sentence candidates
+        """
+        self.retrieval = retrieval
+        self.claim_extractor = claim_extractor
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._tokens: Dict[str, Set[str]] = {}
+
+    def start(self, text: str) -> None:
+        """
+        Start searches for the cheap claim candidates of a text.
+
+        Must be called from a running event loop. Returns immediately; the
+        searches run in the background. At most half of the search budget
+        is spent on speculation so that unmatched claims can still be searched.
+
+        Args:
+            text (str): Text the claims will be extracted from
+        """
+        max_queries = min(get_settings().SPECULATIVE_MAX_QUERIES, self.retrieval.remaining_budget // 2)
+        for candidate in self._candidates(text)[:max_queries]:
+            self._tasks[candidate] = asyncio.create_task(self.retrieval.search(self.retrieval.build_query(candidate)))
+            self._tokens[candidate] = set(content_tokens(candidate))
+        logger.info(f"Started {len(self._tasks)} speculative searches")
+
+    def add_claim(self, claim: str) -> None:
+        """
+        Start the search for an extracted claim while extraction is still running.
+
+        The claim becomes a candidate of its own, so resolve reuses the search
+        for it, unless a speculative search already covers the claim. Must be
+        called from a running event loop.
+
+        Args:
+            claim (str): Claim text, as soon as it has been streamed
+        """
+        if not claim or claim in self._tasks or len(self._tasks) >= self.retrieval.budget:
+            return
+        # A speculative search already covering the claim will be reused by resolve
+        if self._best_candidate(claim, get_settings().SPECULATIVE_MATCH_THRESHOLD) is not None:
+            return
+        self._tasks[claim] = asyncio.create_task(self.retrieval.search(self.retrieval.build_query(claim)))
+        self._tokens[claim] = set(content_tokens(claim))
+        logger.debug(f"Started search for streamed claim: '{claim}'")
+
+    async def resolve(self, claims: List[str]) -> List[List[Source]]:
+        """
+        Get candidate sources for the extracted claims.
+
+        Claims that match a speculative candidate reuse its search; the
+        rest go through the retrieval stage. Speculative searches that no
+        claim matched are cancelled first to free their slots.
+
+        Args:
+            claims (List[str]): The extracted claim texts
+
+        Returns:
+            List[List[Source]]: Candidate sources for each claim, in claim order
+        """
+        threshold = get_settings().SPECULATIVE_MATCH_THRESHOLD
+        matches = [self._best_candidate(claim, threshold) for claim in claims]
+        used = {candidate for candidate in matches if candidate is not None}
+
+        for candidate, task in self._tasks.items():
+            if candidate not in used:
+                task.cancel()
+        unmatched = [claim_index for claim_index, candidate in enumerate(matches) if candidate is None]
+        logger.info(
+            f"Speculative retrieval: {len(claims) - len(unmatched)}/{len(claims)} claims reused a search, "
+            f"{len(self._tasks) - len(used)} searches cancelled"
+        )
+
+        used_candidates = list(used)
+        results = await asyncio.gather(
+            asyncio.gather(*[self._tasks[candidate] for candidate in used_candidates], return_exceptions=True),
+            self.retrieval.retrieve([claims[claim_index] for claim_index in unmatched])
+        )
+
+        # Claims reusing the same search share one capped source list
+        candidate_sources = {}
+        for candidate, result in zip(used_candidates, results[0]):
+            if isinstance(result, BaseException):
+                logger.error(f"Error retrieving sources for candidate '{candidate}': {str(result)}")
+                result = []
+            candidate_sources[candidate] = self.retrieval.cap(result)
+
+        claim_sources: List[List[Source]] = [
+            candidate_sources[candidate] if candidate is not None else [] for candidate in matches
+        ]
+        for claim_index, sources in zip(unmatched, results[1]):
+            claim_sources[claim_index] = sources
+        return claim_sources
+
+    def cancel(self) -> None:
+        """Cancel any speculative search that is still running."""
+        for task in self._tasks.values():
+            if not task.done():
+                task.cancel()
+
+    def _candidates(self, text: str) -> List[str]:
+        """
+        Build cheap claim candidates from a text.
+
+        Sentences with numbers and their numeric clauses come first, then
+        named-entity spans, then the remaining sentences.
+
+        Args:
+            text (str): Text to build candidates from
+
+        Returns:
+            List[str]: Unique candidates in priority order
+        """
+        sentences = self.claim_extractor.extract_with_basic_methods(text)
+        numeric, entities, others = [], [], []
+        for sentence in sentences:
+            if _NUMERIC_PATTERN.search(sentence):
+                numeric.append(sentence)
+                numeric.extend(
+                    clause.strip() for clause in _CLAUSE_PATTERN.split(sentence)
+                    if _NUMERIC_PATTERN.search(clause) and clause.strip() != sentence
+                    and len(clause.strip()) >= 6
+                )
+            else:
+                others.append(sentence)
+            entities.extend(match.group(0) for match in _ENTITY_PATTERN.finditer(sentence))
+
+        candidates = []
+        for candidate in numeric + entities + others:
+            if candidate and candidate not in candidates:
+                candidates.append(candidate)
+        return candidates
+
+    def _best_candidate(self, claim: str, threshold: float):
+        """
+        Find the speculative candidate that covers a claim best.
+
+        Args:
+            claim (str): Claim text
+            threshold (float): Minimum share of claim tokens the candidate must contain
+
+        Returns:
+            Optional[str]: The matching candidate, or None
+        """
+        claim_tokens = set(content_tokens(claim))
+        if not claim_tokens:
+            return None
+
+        best, best_score = None, 0.0
+        for candidate, tokens in self._tokens.items():
+            score = len(claim_tokens & tokens) / len(claim_tokens)
+            if score > best_score:
+                best, best_score = candidate, score
+        return best if best_score >= threshold else None
@@ -0,0 +1,112 @@
+"""
+Token budgeting helpers.
+
+This module provides a cheap, dependency-free token estimate used to pack
+prompts into a fixed budget without calling a tokenizer, and splits long
+texts into token-budgeted chunks at sentence boundaries.
+"""
+
+import re
+from typing import List
+
+_CJK_PATTERN = re.compile(r'[\u3000-\u303f\u4e00-\u9fff\uff00-\uffef]')
+# Sentence ends: CJK and Latin terminal punctuation (a period only before whitespace) and line breaks
+_SENTENCE_BOUNDARY = re.compile(r'(?<=[。！？!?；;])|(?<=\.)(?=\s)|\n+')
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of model tokens in a text.
+
+    CJK characters are counted as one token each, everything else as
+    roughly four characters per token.
+
+    Args:
+        text (str): Text to estimate
+
+    Returns:
+        int: Estimated token count
+    """
+    if not text:
+        return 0
+    cjk_count = len(_CJK_PATTERN.findall(text))
+    other_count = len(text) - cjk_count
+    return cjk_count + (other_count + 3) // 4
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Truncate a text so that its estimated token count fits a budget.
+
+    Args:
+        text (str): Text to truncate
+        max_tokens (int): Maximum number of estimated tokens
+
+    Returns:
+        str: The text, cut at a character boundary if it was too long
+    """
+    if max_tokens <= 0:
+        return ""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    low, high = 0, len(text)
+    while low < high:
+        mid = (low + high + 1) // 2
+        if estimate_tokens(text[:mid]) <= max_tokens:
+            low = mid
+        else:
+            high = mid - 1
+    return text[:low]
+
+
+def split_sentences(text: str) -> List[str]:
+    """
+    Split a text into sentences, keeping their terminal punctuation.
+
+    Args:
+        text (str): Text to split
+
+    Returns:
+        List[str]: Non-empty, stripped sentences in text order
+    """
+    return [sentence.strip() for sentence in _SENTENCE_BOUNDARY.split(text or "") if sentence.strip()]
+
+
+def chunk_by_tokens(text: str, max_tokens: int, overlap_sentences: int = 1) -> List[str]:
+    """
+    Split a text at sentence boundaries into chunks that fit a token budget.
+
+    Consecutive chunks share their last and first overlap_sentences
+    sentences, as long as the overlap leaves room for new text. A single
+    sentence longer than the budget becomes a chunk of its own.
+
+    Args:
+        text (str): Text to split
+        max_tokens (int): Maximum estimated tokens per chunk
+        overlap_sentences (int): Number of sentences repeated across each seam
+
+    Returns:
+        List[str]: The chunks, or the whole text if it fits the budget
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return [text]
+
+    chunks: List[str] = []
+    current: List[str] = []
+    used = 0
+    has_new = False
+    for sentence in split_sentences(text):
+        cost = estimate_tokens(sentence)
+        if has_new and used + cost > max_tokens:
+            chunks.append(" ".join(current))
+            current = current[-overlap_sentences:] if overlap_sentences > 0 else []
+            used = sum(estimate_tokens(overlap) for overlap in current)
+            if used + cost > max_tokens:
+                current, used = [], 0
+            has_new = False
+        current.append(sentence)
+        used += cost
+        has_new = True
+    if has_new:
+        chunks.append(" ".join(current))
+    return chunks
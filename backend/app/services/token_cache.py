@@ -0,0 +1,167 @@
+"""
+Shared tokenization cache.
+
+This module tokenizes each distinct text once with jieba, interns its
+content words into integer ids and keeps the sorted id arrays in a
+process-wide LRU cache, so that a source compared with many claims (or
+seen again in a later request) is not re-tokenized. Token overlaps for a
+whole claim × source matrix are then computed with one matrix product.
+"""
+
+import logging
+import re
+import numpy as np
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, List
+from ..core.config import get_settings
+from .tokenizer import lcut
+
+logger = logging.getLogger(__name__)
+
+# Function words that say nothing about whether a source covers a claim
+STOPWORDS = frozenset(
+    "的 了 是 在 和 与 及 或 也 都 就 而 被 把 对 等 中 上 有 为 这 那 其 之 于 以 a an the of to in on at by "
+    "for with as and or is are was were be been that this it its from".split()
+)
+_WORD_PATTERN = re.compile(r'\w')
+
+
+def content_tokens(text: str) -> List[str]:
+    """
+    Tokenize a text into lower-cased content words.
+
+    Args:
+        text (str): Text to tokenize
+
+    Returns:
+        List[str]: jieba tokens without punctuation, whitespace and stopwords
+    """
+    return [
+        token for token in (word.lower() for word in lcut(text or ""))
+        if _WORD_PATTERN.search(token) and token not in STOPWORDS
+    ]
+
+
+class TokenCache:
+    """LRU cache of interned content-token ids per text."""
+
+    def __init__(self, max_entries: int, max_vocabulary: int):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries (int): Maximum number of cached texts
+            max_vocabulary (int): Vocabulary size at which the cache starts over
+        """
+        self.max_entries = max(1, max_entries)
+        self.max_vocabulary = max(1, max_vocabulary)
+        self._vocabulary: Dict[str, int] = {}
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._counters = {"hits": 0, "misses": 0, "resets": 0}
+
+    def token_ids(self, text: str) -> np.ndarray:
+        """
+        Get the interned content-token ids of a text.
+
+        Args:
+            text (str): Text to tokenize
+
+        Returns:
+            np.ndarray: Sorted, unique int32 token ids
+        """
+        text = text or ""
+        ids = self._entries.get(text)
+        if ids is not None:
+            self._entries.move_to_end(text)
+            self._counters["hits"] += 1
+            return ids
+
+        self._counters["misses"] += 1
+        if len(self._vocabulary) >= self.max_vocabulary:
+            # Ids are only comparable within one vocabulary, so both start over
+            self._vocabulary.clear()
+            self._entries.clear()
+            self._counters["resets"] += 1
+        ids = np.unique(np.array(
+            [self._vocabulary.setdefault(token, len(self._vocabulary)) for token in content_tokens(text)],
+            dtype=np.int32
+        ))
+        self._entries[text] = ids
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return ids
+
+    def overlap(self, left: str, right: str) -> int:
+        """
+        Count the distinct content tokens two texts share.
+
+        Args:
+            left (str): First text
+            right (str): Second text
+
+        Returns:
+            int: Number of shared content tokens
+        """
+        left_ids, right_ids = self._consistent_ids([left, right])
+        return int(np.intersect1d(left_ids, right_ids, assume_unique=True).size)
+
+    def coverage_matrix(self, left: List[str], right: List[str]) -> np.ndarray:
+        """
+        Compute, for every pair, the share of the left text's tokens found in the right text.
+
+        Args:
+            left (List[str]): Texts whose coverage is measured, e.g. claims
+            right (List[str]): Texts searched for their tokens, e.g. source snippets
+
+        Returns:
+            np.ndarray: float32 matrix of shape (len(left), len(right)); rows of
+                texts without content tokens are zero
+        """
+        ids = self._consistent_ids(list(left) + list(right))
+        left_ids, right_ids = ids[:len(left)], ids[len(left):]
+        coverage = np.zeros((len(left), len(right)), dtype=np.float32)
+        if not left or not right:
+            return coverage
+
+        # Map the token ids of this matrix onto dense columns
+        columns, inverse = np.unique(np.concatenate(left_ids + right_ids), return_inverse=True)
+        left_matrix = self._indicator_matrix(left_ids, inverse[:sum(ids.size for ids in left_ids)], columns.size)
+        right_matrix = self._indicator_matrix(right_ids, inverse[sum(ids.size for ids in left_ids):], columns.size)
+        overlaps = left_matrix @ right_matrix.T
+
+        sizes = np.array([ids.size for ids in left_ids], dtype=np.float32)
+        np.divide(overlaps, sizes[:, None], out=coverage, where=sizes[:, None] > 0)
+        return coverage
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the cache counters.
+
+        Returns:
+            Dict[str, int]: Hit, miss and reset counts, cached texts and vocabulary size
+        """
+        return {**self._counters, "entries": len(self._entries), "vocabulary": len(self._vocabulary)}
+
+    def _consistent_ids(self, texts: List[str]) -> List[np.ndarray]:
+        """Get the token ids of several texts from the same vocabulary."""
+        resets = self._counters["resets"]
+        ids = [self.token_ids(text) for text in texts]
+        if self._counters["resets"] != resets:
+            ids = [self.token_ids(text) for text in texts]
+        return ids
+
+    @staticmethod
+    def _indicator_matrix(row_ids: List[np.ndarray], columns: np.ndarray, width: int) -> np.ndarray:
+        """Build a 0/1 row-per-text matrix from the dense column of each token."""
+        matrix = np.zeros((len(row_ids), width), dtype=np.float32)
+        rows = np.repeat(np.arange(len(row_ids)), [ids.size for ids in row_ids])
+        matrix[rows, columns] = 1
+        return matrix
+
+
+@lru_cache()
+def get_token_cache() -> TokenCache:
+    """Get the process-wide token cache instance."""
+    settings = get_settings()
+    return TokenCache(settings.TOKEN_CACHE_MAX_ENTRIES, settings.TOKEN_CACHE_MAX_VOCABULARY)
@@ -1,3 +1,4 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
@@ -14,13 +15,20 @@ load_dotenv(env_path)
 if not os.getenv("OPENAI_API_KEY"):
     raise ValueError("OPENAI_API_KEY environment variable is not set")
 
-from app.api.endpoints import router as api_router
+from app.api.endpoints import router as api_router, job_manager
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Cancel running fact-check jobs and fail the ones still waiting
+    await job_manager.shutdown()
 
 # Create FastAPI app
 app = FastAPI(
     title="FactGuard API",
     description="AI-powered fact-checking service",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# Run the tests against the backend's "app" package, as main.py does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("OPENAI_API_KEY", "test")
@@ -0,0 +1,47 @@
+from app.services.claim_clusterer import ClaimClusterer
+
+
+def test_clusters_rewordings():
+    clusters = ClaimClusterer().cluster([
+        "The new drug can cure cancer",
+        "The new drug can cure cancer.",
+        "New drug can cure the cancer",
+    ])
+    assert clusters == [[0, 1, 2]]
+
+
+def test_english_negation_splits_clusters():
+    clusterer = ClaimClusterer()
+    assert clusterer.cluster(["The new drug can cure cancer", "The new drug can't cure cancer"]) == [[0], [1]]
+    assert clusterer.cluster(["Vaccines cause autism", "Vaccines don’t cause autism"]) == [[0], [1]]
+    assert clusterer.cluster(["The plan will work", "The plan won't work"]) == [[0], [1]]
+
+
+def test_english_contractions_match_spelled_out_negations():
+    clusters = ClaimClusterer().cluster(["The drug doesn't cure cancer", "The drug does not cure cancer"])
+    assert clusters == [[0, 1]]
+
+
+def test_chinese_negation_splits_clusters():
+    clusterer = ClaimClusterer()
+    assert clusterer.cluster(["公司去年营收实现了增长", "公司去年营收未能实现增长"]) == [[0], [1]]
+    assert clusterer.cluster(["这种新药能够治愈癌症", "这种新药无法治愈癌症"]) == [[0], [1]]
+    assert clusterer.cluster(["公司去年营收增长", "公司去年营收并未增长"]) == [[0], [1]]
+
+
+def test_different_numbers_split_clusters():
+    assert ClaimClusterer().cluster(["营收增长了10%", "营收增长了20%"]) == [[0], [1]]
+
+
+def test_pronoun_claim_joins_named_subject():
+    assert ClaimClusterer().cluster(["他提出了相对论", "爱因斯坦提出了相对论"]) == [[1, 0]]
+
+
+def test_pronoun_claim_does_not_bridge_subjects():
+    clusters = ClaimClusterer().cluster(["爱因斯坦提出了相对论", "他提出了相对论", "居里夫人提出了相对论"])
+    assert clusters == [[0], [1], [2]]
+
+
+def test_pronouns_are_not_resolved_across_documents():
+    clusters = ClaimClusterer().cluster(["爱因斯坦提出了相对论", "他提出了相对论"], documents=[0, 1])
+    assert clusters == [[0], [1]]
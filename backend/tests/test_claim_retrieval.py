@@ -0,0 +1,11 @@
+from app.services.claim_retrieval import ClaimRetrieval
+
+
+def test_merge_queries_ignores_stopwords_and_punctuation():
+    retrieval = ClaimRetrieval(retriever=None)
+    queries = [
+        retrieval.build_query("The Eiffel Tower is 330 metres tall."),
+        retrieval.build_query("Eiffel Tower: 330 metres tall"),
+        retrieval.build_query("埃菲尔铁塔高330米"),
+    ]
+    assert retrieval.merge_queries(queries) == [(queries[0], [0, 1]), (queries[2], [2])]
@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+
+from app.core.config import get_settings
+from app.models.schemas import Source, SourceType
+from app.services.analysis_service import AnalysisService
+from app.services.confidence_calculator import ConfidenceCalculator
+from app.services.early_exit_policy import EarlyExitPolicy, SupportTally
+from app.services.explanation_generator import ExplanationGenerator
+
+CLAIMS = ["Alpha claim about rivers", "Beta claim about rivers", "Gamma claim about rivers"]
+SOURCES = [
+    Source(title=title, snippet=f"{title} rivers", link=f"https://example.com/{title}", source_type=source_type)
+    for title, source_type in [
+        ("A1", SourceType.ACADEMIC), ("A2", SourceType.ACADEMIC), ("A3", SourceType.ACADEMIC),
+        ("A4", SourceType.ACADEMIC), ("N1", SourceType.NEWS), ("N2", SourceType.NEWS),
+    ]
+]
+SCORES = {
+    # Settles as soon as the academic bonus is capped
+    "Alpha": {"A1": 1.0, "A2": 1.0, "A3": 1.0, "A4": 1.0, "N1": 0.7, "N2": 0.7},
+    # Capped, but only a later source reaches 1.0
+    "Beta": {"A1": 0.96, "A2": 0.96, "A3": 0.96, "A4": 0.96, "N1": 1.0, "N2": 0.3},
+    # Never settles
+    "Gamma": {},
+}
+
+
+def make_service(early_exit: bool) -> AnalysisService:
+    service = AnalysisService.__new__(AnalysisService)
+    service.early_exit_policy = EarlyExitPolicy()
+    service.early_exit_policy.enabled = early_exit
+    service.early_exit_policy.wave_size = 1
+    service.confidence_calculator = ConfidenceCalculator()
+    service.explanation_generator = ExplanationGenerator(None)
+    service.evaluated_pairs = 0
+
+    async def evaluate_pair(claim, source, use_deepseek, semaphore):
+        service.evaluated_pairs += 1
+        return SCORES[claim.split()[0]].get(source.title, 0.0), "rationale"
+
+    service._evaluate_pair = evaluate_pair
+    return service
+
+
+async def analyze(service: AnalysisService):
+    sources = list(SOURCES)
+    scores, rationales, tasks = service._start_scoring(CLAIMS, [sources] * len(CLAIMS), False, SupportTally(len(CLAIMS)))
+    await asyncio.gather(*tasks)
+    verdicts = [
+        service._build_verdict(claim, sources, claim_scores, claim_rationales)
+        for claim, claim_scores, claim_rationales in zip(CLAIMS, scores, rationales)
+    ]
+    return await service._build_response("text", CLAIMS, verdicts, False), verdicts
+
+
+def test_early_exit_does_not_change_results(monkeypatch):
+    monkeypatch.setattr(get_settings(), "SIMILARITY_BATCH_ENABLED", False)
+    monkeypatch.setattr(get_settings(), "DEFERRED_EXPLANATION_ENABLED", False)
+    full_service, early_service = make_service(False), make_service(True)
+    full, full_verdicts = asyncio.run(analyze(full_service))
+    early, early_verdicts = asyncio.run(analyze(early_service))
+
+    assert early_service.evaluated_pairs < full_service.evaluated_pairs
+    assert early.confidence == pytest.approx(full.confidence)
+    assert early.is_fact == full.is_fact
+    assert [verdict.score for verdict in early_verdicts] == [verdict.score for verdict in full_verdicts]
@@ -0,0 +1,50 @@
+import asyncio
+
+from app.models.schemas import Source, SourceType
+from app.services.evidence_retriever import EvidenceRetriever
+
+
+def make_source(name: str) -> Source:
+    return Source(title=name, snippet=name, link=f"https://example.com/{name}", source_type=SourceType.OTHER)
+
+
+class StubIndex:
+    def __init__(self, results):
+        self.results = results
+
+    def search(self, query, limit):
+        return self.results[:limit]
+
+
+class StubSearchService:
+    def __init__(self):
+        self.queries = []
+
+    def providers(self):
+        return {"web": self.search}
+
+    async def search(self, query):
+        self.queries.append(query)
+        return [make_source("web")]
+
+
+def retrieve(local_results):
+    service = StubSearchService()
+    retriever = EvidenceRetriever(search_service=service, local_index=StubIndex(local_results))
+    sources = asyncio.run(retriever.search("query"))
+    return [source.title for source in sources], service.queries
+
+
+def test_well_covered_local_results_skip_network():
+    titles, queries = retrieve([(make_source(f"local{i}"), 12.0, 1.0) for i in range(3)])
+    assert titles == ["local0", "local1", "local2"] and queries == []
+
+
+def test_low_scoring_local_results_do_not_skip_network():
+    titles, queries = retrieve([(make_source(f"local{i}"), 0.5, 1.0) for i in range(3)])
+    assert titles[-1] == "web" and queries == ["query"]
+
+
+def test_partially_covering_local_results_do_not_skip_network():
+    titles, queries = retrieve([(make_source(f"local{i}"), 12.0, 0.5) for i in range(3)])
+    assert titles[-1] == "web" and queries == ["query"]
@@ -0,0 +1,33 @@
+import asyncio
+
+from app.models.schemas import JobStatus
+from app.services.job_manager import JobManager
+
+
+class SlowAnalysisService:
+    def __init__(self):
+        self.cancelled = 0
+
+    async def analyze_text_stream(self, text, sources, use_deepseek=False):
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        yield "result", None
+
+
+def test_shutdown_cancels_workers_and_fails_pending_jobs():
+    service = SlowAnalysisService()
+    manager = JobManager(service)
+
+    async def run():
+        jobs = [manager.submit(f"text {i}") for i in range(manager.concurrency + 2)]
+        await asyncio.sleep(0.01)
+        assert any(job.status == JobStatus.RUNNING for job in jobs)
+        await manager.shutdown()
+        return jobs
+
+    jobs = asyncio.run(run())
+    assert all(job.status == JobStatus.FAILED and job.error for job in jobs)
+    assert service.cancelled == manager.concurrency
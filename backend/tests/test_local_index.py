@@ -0,0 +1,63 @@
+import json
+
+from app.services.local_index import LocalEvidenceIndex, build_index
+
+
+def write_corpus(path, lines):
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def document(title, text, url):
+    return json.dumps({"title": title, "text": text, "url": url}, ensure_ascii=False)
+
+
+def test_build_index_skips_invalid_lines(tmp_path):
+    corpus = tmp_path / "corpus.jsonl"
+    write_corpus(corpus, [
+        document("Eiffel Tower", "The Eiffel Tower is 330 metres tall.", "https://example.com/eiffel"),
+        "not json",
+        "[1, 2, 3]",
+        "\"a string\"",
+        "42",
+        json.dumps({"title": "No link", "text": "Missing url"}),
+        document("Great Wall", "The Great Wall of China is over 21,000 km long.", "https://example.com/wall"),
+    ])
+    assert build_index(str(corpus), str(tmp_path / "index")) == 2
+
+    index = LocalEvidenceIndex(str(tmp_path / "index"))
+    try:
+        results = index.search("How tall is the Eiffel Tower?")
+        assert results[0][0].title == "Eiffel Tower"
+    finally:
+        index.close()
+
+
+def build_tower_index(tmp_path):
+    corpus = tmp_path / "corpus.jsonl"
+    lines = [document(f"Tower {i}", f"Tower number {i} stands in town {i}.", f"https://example.com/{i}") for i in range(20)]
+    lines.append(document("Eiffel Tower", "The Eiffel Tower is 330 metres tall.", "https://example.com/eiffel"))
+    write_corpus(corpus, lines)
+    build_index(str(corpus), str(tmp_path / "index"))
+    return str(tmp_path / "index")
+
+
+def test_search_ignores_stopwords(tmp_path):
+    index = LocalEvidenceIndex(build_tower_index(tmp_path))
+    try:
+        assert index.search("the is of") == []
+        source, _, coverage = index.search("the Eiffel tower")[0]
+        assert source.title == "Eiffel Tower" and coverage == 1.0
+    finally:
+        index.close()
+
+
+def test_capped_postings_rank_like_full_scan(tmp_path):
+    index_dir = build_tower_index(tmp_path)
+    full, capped = LocalEvidenceIndex(index_dir), LocalEvidenceIndex(index_dir, max_postings_per_term=2)
+    try:
+        expected = full.search("Eiffel tower", limit=1)
+        assert [(source.title, score, coverage) for source, score, coverage in capped.search("Eiffel tower", limit=1)] == \
+            [(source.title, score, coverage) for source, score, coverage in expected]
+    finally:
+        full.close()
+        capped.close()
@@ -0,0 +1,78 @@
+import asyncio
+
+import pytest
+
+from app.core.config import parse_provider_values
+from app.models.schemas import Source, SourceType
+from app.services.search_cache import SearchCache
+from app.services.search_service import SearchProviderError, SearchService
+
+
+def make_cache() -> SearchCache:
+    return SearchCache(max_entries=10, default_ttl=3600, negative_ttl=300)
+
+
+def test_parse_provider_values():
+    assert parse_provider_values("news=600, wikipedia = 86400,bad=x,=1,") == {"news": 600.0, "wikipedia": 86400.0}
+
+
+def test_failures_are_not_cached():
+    cache = make_cache()
+    calls = []
+
+    async def failing(query):
+        calls.append(query)
+        raise SearchProviderError("news search timed out")
+
+    async def run():
+        assert await cache.fetch("news", "query", failing) == []
+        assert await cache.fetch("news", "query", failing) == []
+
+    asyncio.run(run())
+    assert len(calls) == 2
+    assert cache.stats()["entries"] == 0
+
+
+def test_empty_results_are_cached():
+    cache = make_cache()
+    calls = []
+
+    async def empty(query):
+        calls.append(query)
+        return []
+
+    async def run():
+        await cache.fetch("news", "query", empty)
+        await cache.fetch("news", "query", empty)
+
+    asyncio.run(run())
+    assert len(calls) == 1
+
+
+def test_provider_errors_are_raised():
+    async def run():
+        service = SearchService()
+        try:
+            async def broken():
+                raise RuntimeError("HTTP 500")
+
+            async def slow():
+                await asyncio.sleep(1)
+                return []
+
+            service.timeouts["news"] = 0.01
+            with pytest.raises(SearchProviderError):
+                await service._run_provider("wikipedia", broken())
+            with pytest.raises(SearchProviderError):
+                await service._run_provider("news", slow())
+
+            source = Source(title="t", snippet="s", link="https://example.com", source_type=SourceType.NEWS)
+
+            async def found():
+                return [source]
+
+            assert await service._run_provider("news", found()) == [source]
+        finally:
+            await service.close()
+
+    asyncio.run(run())
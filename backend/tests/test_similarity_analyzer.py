@@ -0,0 +1,55 @@
+import pytest
+
+from app.models.schemas import Source, SourceType
+from app.services.similarity_analyzer import SimilarityAnalyzer
+
+
+def make_source(snippet: str) -> Source:
+    return Source(title="Source", snippet=snippet, link="https://example.com", source_type=SourceType.NEWS)
+
+
+@pytest.fixture
+def analyzer() -> SimilarityAnalyzer:
+    return SimilarityAnalyzer(openai_client=None)
+
+
+@pytest.mark.parametrize("claim, snippet", [
+    ("Vaccines cause autism", "Vaccines don't cause autism"),
+    ("Vaccines cause autism", "Vaccines don’t cause autism"),
+    ("The new drug can cure cancer", "The new drug can't cure cancer"),
+    ("The new drug can't cure cancer", "The new drug can cure cancer"),
+    ("公司去年营收增长", "公司去年营收未能增长"),
+    ("这种新药能治愈癌症", "这种新药不能治愈癌症"),
+])
+def test_negated_source_is_escalated(analyzer, claim, snippet):
+    assert analyzer.decide_locally(claim, make_source(snippet), score=1.0) is None
+
+
+def test_different_numbers_are_escalated(analyzer):
+    source = make_source("公司去年营收增长了20%")
+    assert analyzer.decide_locally("公司去年营收增长了10%", source, score=1.0) is None
+
+
+def test_matching_source_is_supported_locally(analyzer):
+    analysis = analyzer.decide_locally("Vaccines do not cause autism", make_source("Vaccines don't cause autism"), score=1.0)
+    assert analysis is not None and analysis["is_supporting"]
+
+
+def test_unrelated_source_is_rejected_locally(analyzer):
+    analysis = analyzer.decide_locally("Vaccines cause autism", make_source("The Eiffel Tower is in Paris"))
+    assert analysis is not None and not analysis["is_supporting"]
+
+
+@pytest.mark.parametrize("claim, snippet, score, supporting", [
+    # Only content words count, not shared punctuation and stopwords
+    ("他的书。", "我的笔。", 0.0, False),
+    ("The tower is tall.", "The river is long.", 0.0, False),
+    ("埃菲尔铁塔高330米。", "埃菲尔铁塔的高度是330米。", 0.3, True),
+    ("Vaccines cause autism in children", "Studies of vaccines, autism and children", 0.3, True),
+    ("Vaccines cause autism", "Studies of vaccines and children", 0.1, False),
+    ("a b c d e f", "a b c d e f", 0.5, True),
+])
+def test_basic_method_scores(analyzer, claim, snippet, score, supporting):
+    analysis = analyzer._analyze_with_basic_methods(claim, make_source(snippet))
+    assert analysis["similarity_score"] == pytest.approx(score)
+    assert analysis["is_supporting"] == supporting